@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Compatibility request analytics for Reebike Compatibility API
+Version 1.0
+
+Request handlers only append a tuple of raw fields to an in-memory queue
+(see utils.log_compatibility_request). A background flusher drains it in
+batches of up to `batch_size` events, or every `flush_interval` seconds,
+turns them into JSON and hands each batch to the sinks: a rotating JSONL
+file and/or a POST to ANALYTICS_ENDPOINT. When the queue is full, new
+events are dropped and counted. Nothing here may slow down or fail a
+request: sink errors are logged and counted, and the batch is dropped.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Fields of a queued event tuple, in order
+EVENT_FIELDS = ('timestamp', 'brand', 'model', 'status', 'kits_count', 'source', 'ip', 'user_agent')
+
+def event_dict(event):
+    """
+    Build the JSON record of a queued event
+
+    Args:
+        event (tuple): Values in EVENT_FIELDS order, timestamp as epoch seconds
+
+    Returns:
+        dict: Record with an ISO 8601 timestamp
+    """
+    record = dict(zip(EVENT_FIELDS, event))
+    record['timestamp'] = datetime.fromtimestamp(record['timestamp']).isoformat()
+    return record
+
+class JsonlSink:
+    """Append batches to a JSONL file, rotated at max_bytes (path.1 ... path.N)"""
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, lines):
+        """
+        Append encoded records
+
+        Args:
+            lines (list): JSON records, without newlines
+        """
+        data = ('\n'.join(lines) + '\n').encode('utf-8')
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size and self.max_bytes > 0 and size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, 'ab') as f:
+            f.write(data)
+
+    def _rotate(self):
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def __repr__(self):
+        return f"JsonlSink({self.path!r})"
+
+class HttpSink:
+    """POST batches as a JSON array to a collector"""
+
+    def __init__(self, url, timeout=5, session=None):
+        self.url = url
+        self.timeout = timeout
+        self.session = session or requests.Session()
+
+    def write(self, lines):
+        """
+        Send encoded records in one request
+
+        Args:
+            lines (list): JSON records
+
+        Raises:
+            requests.RequestException: Network error or non-2xx answer
+        """
+        body = ('[' + ','.join(lines) + ']').encode('utf-8')
+        response = self.session.post(self.url, data=body, timeout=self.timeout,
+                                     headers={'Content-Type': 'application/json'})
+        response.raise_for_status()
+
+    def __repr__(self):
+        return f"HttpSink({self.url!r})"
+
+class AnalyticsPipeline:
+    """Bounded event queue drained in batches by a background thread"""
+
+    def __init__(self, sinks, max_queue=10000, batch_size=500, flush_interval=5.0):
+        """
+        Args:
+            sinks (list): Objects with write(lines)
+            max_queue (int): Events kept waiting at most; newer ones are dropped
+            batch_size (int): Events per write, also triggers an early flush
+            flush_interval (float): Maximum seconds an event waits in the queue
+        """
+        self.sinks = list(sinks)
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._events = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stats = {'enqueued': 0, 'dropped': 0, 'flushed': 0, 'batches': 0, 'sink_errors': 0}
+
+    def emit(self, event):
+        """
+        Queue one event (never blocks or raises)
+
+        Args:
+            event (tuple): Values in EVENT_FIELDS order
+        """
+        events = self._events
+        if len(events) >= self.max_queue:
+            self._stats['dropped'] += 1
+            return
+        events.append(event)
+        self._stats['enqueued'] += 1
+        if len(events) == self.batch_size:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Write every queued event to the sinks
+
+        Returns:
+            int: Number of events written
+        """
+        flushed = 0
+        with self._flush_lock:
+            while self._events:
+                batch = []
+                while self._events and len(batch) < self.batch_size:
+                    batch.append(self._events.popleft())
+                self._write(batch)
+                flushed += len(batch)
+        return flushed
+
+    def _write(self, batch):
+        try:
+            lines = [json.dumps(event_dict(event), ensure_ascii=False) for event in batch]
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Dropping analytics batch: {str(e)}")
+            self._stats['sink_errors'] += 1
+            return
+        for sink in self.sinks:
+            try:
+                sink.write(lines)
+            except Exception as e:
+                self._stats['sink_errors'] += 1
+                logger.warning(f"Analytics sink {sink!r} failed, {len(lines)} events lost: {str(e)}")
+        self._stats['batches'] += 1
+        self._stats['flushed'] += len(batch)
+
+    def start(self):
+        """Start the background flusher"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='analytics-flusher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the flusher after writing what is left in the queue"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:  # pragma: no cover - keep the flusher alive
+                logger.error(f"Analytics flusher error: {str(e)}")
+
+    def stats(self):
+        """
+        Get pipeline statistics
+
+        Returns:
+            dict: Enqueued/dropped/flushed counters, queue depth and sinks
+        """
+        stats = dict(self._stats)
+        stats['queued'] = len(self._events)
+        stats['max_queue'] = self.max_queue
+        stats['sinks'] = [repr(sink) for sink in self.sinks]
+        return stats
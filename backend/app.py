@@ -6,57 +6,263 @@ Version 1.0 - Mock implementation with local JSON data
 Flask API pour évaluer la compatibilité des vélos avec les kits Reebike
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
+import asyncio
+import atexit
 import json
 import os
 import logging
+import httpx
 import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
 from datetime import datetime
 
+from cache import LookupCache, PersistentCache, MISSING
+from catalog import CatalogIndex
+from config import get_config
+from http_cache import CachePolicy, etag_matches, negotiate_encoding
+from ingest import IngestError, load_catalog
+from logging_setup import configure_logging, sampled_logger
+from metrics import MetricsRegistry
+from results import EncodedResponse, ResultTable, serialize_result
+from rate_limit import SharedRateLimiter, TokenBucketLimiter
+from records import BikeRecord, as_record, to_records
+from reloader import CatalogReloader
+from rules import RuleSet
+from snapshot import open_snapshot
+from analytics import AnalyticsPipeline, HttpSink, JsonlSink
+from async_client import AsyncUpstreamClient
+from http_client import CircuitBreaker, RetryBudget, UpstreamClient, UpstreamUnavailable
+from utils import log_compatibility_request, normalize_bike_name, rate_limit_key
+from warmup import CacheWarmer, TrafficRecorder
+
 # Load environment variables
 load_dotenv()
 
 # Configuration
+app_config = get_config()
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Shopify integration
 
-# Logging setup
-logging.basicConfig(level=logging.INFO)
+cache_policy = CachePolicy.from_config(app_config)
+
+# Prometheus metrics recorded on the request path (see /api/metrics)
+metrics = MetricsRegistry()
+compat_requests = metrics.counter(
+    'compat_requests', 'Compatibility checks by result status and data source', ('status', 'data_source'))
+compat_duration = metrics.histogram(
+    'compat_request_duration_seconds', 'Time to answer a compatibility check')
+stage_duration = metrics.histogram(
+    'compat_stage_duration_seconds', 'Time spent per stage of a compatibility check', ('stage',))
+deadline_exceeded = metrics.counter(
+    'geometrygeeks_deadline_exceeded', 'GeometryGeeks lookups abandoned at the resolve deadline')
+
+def record_compat_request(started, status, data_source):
+    """Count a compatibility check and its total latency"""
+    compat_requests.inc(status, data_source)
+    compat_duration.observe(time.perf_counter() - started)
+
+# Relative file settings (catalog, caches, logs...) are resolved against this directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def backend_path(path):
+    """Resolve a configured file path against the backend directory (absolute paths are kept)"""
+    return os.path.join(BASE_DIR, path)
+
+# Logging setup (handlers installed by init_app)
+logging_setup = None
 logger = logging.getLogger(__name__)
+compat_log = sampled_logger(logger, 'compat')
+lookup_log = sampled_logger(logger, 'lookup')
 
 # Load mock data
-def load_mock_data():
-    """Load mock bike data from JSON file"""
+def catalog_path():
+    """Path of the catalog file (MOCK_DATA_FILE, relative to this module)"""
+    return backend_path(app_config.MOCK_DATA_FILE)
+
+def prepare_catalog(data):
+    """Replace the catalog's bike dicts with compact immutable records (in place)"""
+    data['bikes'] = to_records(data.get('bikes', []))
+    return data
+
+# Outcome of the last catalog ingest (see /api/health)
+ingest_report = None
+
+def read_catalog(path):
+    """Stream a catalog file (JSON document, JSON array or JSON Lines) into records"""
+    global ingest_report
+    data, report = load_catalog(path, chunk_size=app_config.INGEST_CHUNK_SIZE)
+    ingest_report = report.as_dict()
+    return data
+
+def load_mock_data(path=None):
+    """Load mock bike data from the catalog file
+
+    A missing or unreadable file is logged and replaced by minimal
+    fallback data, so the API still starts; the catalog reloader picks
+    the file up once it is fixed.
+    """
+    path = path or catalog_path()
     try:
-        with open('mock_bikes.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_catalog(path)
     except FileNotFoundError:
-        logger.warning("mock_bikes.json not found, using minimal fallback data")
-        return {
-            "bikes": [],
-            "compatibility_matrix": {
-                "default_rules": {
-                    "wheel_axle_front": "QR",
-                    "fork_spacing_mm": 100,
-                    "min_down_tube_length_mm": 300
-                }
+        logger.warning(f"{path} not found, using minimal fallback data")
+    except IngestError as e:
+        logger.error(f"{path} could not be loaded, using minimal fallback data: {str(e)}")
+    return {
+        "bikes": [],
+        "compatibility_matrix": {
+            "default_rules": {
+                "wheel_axle_front": "QR",
+                "fork_spacing_mm": 100,
+                "min_down_tube_length_mm": 300
             }
         }
+    }
+
+def snapshot_path():
+    """Path of the compiled catalog snapshot (CATALOG_SNAPSHOT_FILE, relative to this module)"""
+    if not app_config.CATALOG_SNAPSHOT_FILE:
+        return None
+    return backend_path(app_config.CATALOG_SNAPSHOT_FILE)
 
-# Global data
-mock_data = load_mock_data()
+# Global data: the mapped snapshot when one is up to date, JSON otherwise
+catalog_snapshot = open_snapshot(snapshot_path(), catalog_path())
+mock_data = catalog_snapshot.document if catalog_snapshot is not None else load_mock_data()
+
+def create_persistent_cache():
+    """Open the shared on-disk cache if one is configured (path relative to this module)"""
+    if not app_config.PERSISTENT_CACHE_FILE:
+        return None
+    try:
+        return PersistentCache(
+            backend_path(app_config.PERSISTENT_CACHE_FILE),
+            max_entries=app_config.PERSISTENT_CACHE_MAX_ENTRIES
+        )
+    except Exception as e:
+        logger.warning(f"Persistent cache disabled: {str(e)}")
+        return None
+
+persistent_cache = create_persistent_cache()
+
+GEOMETRY_GEEKS_URL = "https://geometrygeeks.bike/api"
+
+def create_upstream_client(client_class, pool_size, max_concurrent, shared_with=None):
+    """Build a GeometryGeeks client (UpstreamClient or AsyncUpstreamClient) from the settings
+
+    With `shared_with` (another client) its circuit breaker and retry
+    budget are reused, so the sync and async clients see one upstream health.
+    """
+    if shared_with is not None:
+        breaker, retry_budget = shared_with.breaker, shared_with.retry_budget
+    else:
+        breaker = CircuitBreaker(
+            window=app_config.BREAKER_WINDOW,
+            min_calls=app_config.BREAKER_MIN_CALLS,
+            failure_threshold=app_config.BREAKER_FAILURE_THRESHOLD,
+            latency_threshold=app_config.BREAKER_LATENCY_THRESHOLD,
+            cooldown=app_config.BREAKER_COOLDOWN
+        )
+        retry_budget = RetryBudget(ratio=app_config.UPSTREAM_RETRY_BUDGET_RATIO)
+    return client_class(
+        GEOMETRY_GEEKS_URL,
+        timeout=app_config.GEOMETRY_GEEKS_TIMEOUT,
+        pool_size=pool_size,
+        max_concurrent=max_concurrent,
+        queue_timeout=app_config.UPSTREAM_QUEUE_TIMEOUT,
+        max_retries=app_config.UPSTREAM_MAX_RETRIES,
+        retry_budget=retry_budget,
+        breaker=breaker,
+        headers={'User-Agent': 'Reebike-Compatibility-Widget/1.0'}
+    )
 
 class GeometryGeeksAPI:
     """Interface with GeometryGeeks API"""
     
-    def __init__(self):
-        self.base_url = "https://geometrygeeks.bike/api"
-        self.timeout = 5  # seconds
+    def __init__(self, cache=None, persistent_cache=None, client=None, shared_with=None):
+        self.base_url = GEOMETRY_GEEKS_URL
+        self.timeout = app_config.GEOMETRY_GEEKS_TIMEOUT  # seconds
+        self.client = client if client is not None else self._create_client(shared_with)
+        self.cache = cache if cache is not None else LookupCache(
+            max_entries=app_config.CACHE_MAX_ENTRIES,
+            ttl=app_config.CACHE_TIMEOUT,
+            negative_ttl=app_config.CACHE_NEGATIVE_TIMEOUT,
+            stale_ttl=app_config.CACHE_STALE_TIMEOUT
+        )
+        self.persistent_cache = persistent_cache
+    
+    def _create_client(self, shared_with=None):
+        return create_upstream_client(UpstreamClient, app_config.UPSTREAM_POOL_SIZE,
+                                      app_config.UPSTREAM_MAX_CONCURRENT, shared_with)
+        
+    @staticmethod
+    def cache_key(brand, model):
+        """Build the lookup cache key from normalized brand and model"""
+        return (normalize_bike_name(brand), normalize_bike_name(model))
+    
+    def available(self):
+        """Check whether GeometryGeeks may be called (enabled, breaker not open)"""
+        return app_config.ENABLE_GEOMETRY_GEEKS and self.client.available()
+    
+    def search_cached(self, brand, model):
+        """Return a cached GeometryGeeks result without calling upstream
+
+        Stale entries are served and refreshed in the background.
+        Returns MISSING when nothing usable is cached.
+        """
+        key = self.cache_key(brand, model)
+        if not self.available():
+            return self.cache.get(key)
+        return self.cache.peek(key, lambda: self._load_bike(key, brand, model))
+    
+    def search_bike(self, brand, model, refused=None):
+        """Search for bike data on GeometryGeeks (cached)
+
+        Concurrent lookups of the same normalized brand/model share one
+        upstream call. While the circuit breaker is open only cached
+        results are served. `refused` is returned instead when there is no
+        GeometryGeeks answer at all (breaker open and nothing cached, or
+        the call refused locally).
+        """
+        key = self.cache_key(brand, model)
+        if not self.available():
+            cached = self.cache.get(key)
+            return refused if cached is MISSING else cached
         
-    def search_bike(self, brand, model):
-        """Search for bike data on GeometryGeeks"""
+        try:
+            return self.cache.get_or_load(key, lambda: self._load_bike(key, brand, model))
+        except UpstreamUnavailable as e:
+            # Refused locally: not an upstream answer, so nothing is cached
+            logger.info(f"GeometryGeeks skipped: {str(e)}")
+            return refused
+    
+    def _load_bike(self, key, brand, model):
+        """Load bike data from the shared on-disk cache, then GeometryGeeks"""
+        if self.persistent_cache is None:
+            return as_record(self.fetch_bike(brand, model))
+        
+        bike = self.persistent_cache.get('geometrygeeks', key)
+        if bike is not MISSING:
+            return as_record(bike)
+        
+        bike = as_record(self.fetch_bike(brand, model))
+        self._persist_bike(key, bike)
+        return bike
+    
+    def _persist_bike(self, key, bike):
+        """Share a GeometryGeeks outcome (None for a miss) through the on-disk cache"""
+        ttl = self.cache.ttl if bike else self.cache.negative_ttl
+        self.persistent_cache.set('geometrygeeks', key, bike.to_dict() if bike else None, ttl)
+    
+    def fetch_bike(self, brand, model):
+        """Fetch bike data from GeometryGeeks, bypassing the cache
+
+        Raises UpstreamUnavailable when the call is refused locally
+        (breaker open or bulkhead full); other errors return None.
+        """
         try:
             # Try to search for the bike
             params = {
@@ -64,12 +270,7 @@ class GeometryGeeksAPI:
                 'model': model
             }
             
-            response = requests.get(
-                f"{self.base_url}/bikes",
-                params=params,
-                timeout=self.timeout,
-                headers={'User-Agent': 'Reebike-Compatibility-Widget/1.0'}
-            )
+            response = self.client.get('/bikes', params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -78,6 +279,8 @@ class GeometryGeeksAPI:
                 logger.warning(f"GeometryGeeks API returned {response.status_code}")
                 return None
                 
+        except UpstreamUnavailable:
+            raise
         except requests.exceptions.RequestException as e:
             logger.warning(f"GeometryGeeks API error: {str(e)}")
             return None
@@ -96,7 +299,7 @@ class GeometryGeeksAPI:
                 if (bike.get('brand', '').lower() == brand.lower() and 
                     model.lower() in bike.get('model', '').lower()):
                     
-                    return {
+                    return BikeRecord({
                         'brand': bike.get('brand'),
                         'model': bike.get('model'),
                         'year': bike.get('year'),
@@ -106,134 +309,311 @@ class GeometryGeeksAPI:
                         'seat_tube_length_mm': bike.get('seat_tube_length_mm'),
                         'brake_type': bike.get('brake_type'),
                         'source': 'geometrygeeks'
-                    }
+                    })
             
             return None
             
         except Exception as e:
             logger.error(f"Error parsing GeometryGeeks data: {str(e)}")
             return None
+
+class AsyncGeometryGeeksAPI(GeometryGeeksAPI):
+    """asyncio interface with GeometryGeeks API (for the ASGI endpoints)
+
+    Shares the lookup caches of the synchronous API, so both entry points
+    see the same GeometryGeeks results; lookups are coroutines, and
+    on-disk cache accesses (blocking SQLite calls) run in worker threads.
+    """
+
+    def __init__(self, cache=None, persistent_cache=None, client=None, shared_with=None):
+        super().__init__(cache=cache, persistent_cache=persistent_cache, client=client, shared_with=shared_with)
+        # Strong references to lookups left running after their request answered
+        self._tasks = set()
+
+    def _create_client(self, shared_with=None):
+        return create_upstream_client(AsyncUpstreamClient, app_config.ASYNC_UPSTREAM_POOL_SIZE,
+                                      app_config.ASYNC_UPSTREAM_MAX_CONCURRENT, shared_with)
+
+    def search_cached(self, brand, model):
+        """Return a cached GeometryGeeks result without calling upstream
+
+        Stale entries are served; the cache refreshes them from its
+        background thread, which runs the lookup on this event loop (no
+        refresh when called from a worker thread, as by the batch first
+        pass). Returns MISSING when nothing usable is cached.
+        """
+        key = self.cache_key(brand, model)
+        if not self.available():
+            return self.cache.get(key)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.cache.peek(key)
+
+        def refresh():
+            future = asyncio.run_coroutine_threadsafe(self._load_bike(key, brand, model), loop)
+            return future.result(timeout=self.client.timeout + 1)
+
+        return self.cache.peek(key, refresh)
+
+    def search_task(self, brand, model, refused=None):
+        """Start search_bike() as a task that runs on even if nobody awaits it"""
+        task = asyncio.ensure_future(self.search_bike(brand, model, refused))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def search_bike(self, brand, model, refused=None):
+        """Search for bike data on GeometryGeeks (cached)
+
+        Concurrent lookups of the same normalized brand/model share one
+        upstream call. While the circuit breaker is open only cached
+        results are served. `refused` is returned instead when there is no
+        GeometryGeeks answer at all.
+        """
+        cached = self.search_cached(brand, model)
+        if cached is not MISSING or not self.available():
+            return refused if cached is MISSING else cached
+
+        key = self.cache_key(brand, model)
+        try:
+            return await self.cache.get_or_load_async(key, lambda: self._load_bike(key, brand, model))
+        except UpstreamUnavailable as e:
+            # Refused locally: not an upstream answer, so nothing is cached
+            logger.info(f"GeometryGeeks skipped: {str(e)}")
+            return refused
+
+    async def _load_bike(self, key, brand, model):
+        """Load bike data from the shared on-disk cache, then GeometryGeeks"""
+        if self.persistent_cache is None:
+            return as_record(await self.fetch_bike(brand, model))
+
+        bike = await asyncio.to_thread(self.persistent_cache.get, 'geometrygeeks', key)
+        if bike is not MISSING:
+            return as_record(bike)
+
+        bike = as_record(await self.fetch_bike(brand, model))
+        await asyncio.to_thread(self._persist_bike, key, bike)
+        return bike
+
+    async def fetch_bike(self, brand, model):
+        """Fetch bike data from GeometryGeeks, bypassing the cache
+
+        Raises UpstreamUnavailable when the call is refused locally
+        (breaker open or bulkhead full); other errors return None.
+        """
+        try:
+            response = await self.client.get('/bikes', params={'brand': brand, 'model': model})
+
+            if response.status_code == 200:
+                return self.parse_geometry_geeks_data(response.json(), brand, model)
+            logger.warning(f"GeometryGeeks API returned {response.status_code}")
+            return None
+
+        except UpstreamUnavailable:
+            raise
+        except httpx.HTTPError as e:
+            logger.warning(f"GeometryGeeks API error: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error calling GeometryGeeks: {str(e)}")
+            return None
+
+# Specs needed for a conclusive answer: all required fields and at least one tube
+REQUIRED_FIELDS = ('wheel_axle_front', 'fork_spacing_mm')
+TUBE_FIELDS = ('down_tube_length_mm', 'seat_tube_length_mm')
+
+class ResolvedBike:
+    """Outcome of resolving a brand/model pair to bike specs
+
+    Computed once per request and shared by analyze() and the route so
+    upstream and local lookups are never repeated for the same query.
+    """
+
+    __slots__ = ('brand', 'model', 'bike', 'source', 'elapsed_ms', 'timings', 'confidence')
+
+    def __init__(self, brand, model, bike, source, elapsed_ms, timings=None, confidence=None):
+        self.brand = brand
+        self.model = model
+        self.bike = bike
+        self.source = source
+        self.elapsed_ms = elapsed_ms
+        self.timings = timings or {}
+        self.confidence = confidence
+
+    @property
+    def found(self):
+        return self.bike is not None
+
 class CompatibilityAnalyzer:
     """Analyze bike compatibility with Reebike kits"""
     
-    def __init__(self, data):
+    def __init__(self, data, persistent_cache=None, previous=None, snapshot=None):
+        """Build the analyzer and all catalog indexes
+
+        With `previous` (the analyzer of an older catalog version) the
+        GeometryGeeks client, its cache and the worker pool are shared, and
+        precomputed results of unchanged bikes are reused. With `snapshot`
+        (a mapped CatalogSnapshot) the catalog, its indexes and the results
+        come from the snapshot and `data` is ignored.
+        """
+        if snapshot is not None:
+            data = snapshot.document
+            self.catalog = snapshot.catalog_index(fuzzy_threshold=app_config.FUZZY_MATCH_THRESHOLD)
+        else:
+            self.catalog = CatalogIndex(to_records(data.get('bikes', [])), fuzzy_threshold=app_config.FUZZY_MATCH_THRESHOLD)
         self.data = data
-        self.geometry_geeks = GeometryGeeksAPI()
-        self.kits = {
-            'Cosmopolit': {
-                'requirements': {
-                    'wheel_axle_front': 'QR',
-                    'fork_spacing_mm': 100
-                }
-            },
-            'Urban': {
-                'requirements': {
-                    'wheel_axle_front': 'QR',
-                    'fork_spacing_mm': 100,
-                    'min_tube_length_mm': 300  # down_tube OR seat_tube
-                }
-            },
-            'Explorer': {
-                'requirements': {
-                    'wheel_axle_front': 'QR',
-                    'fork_spacing_mm': 100,
-                    'min_tube_length_mm': 300  # down_tube OR seat_tube
-                }
-            }
-        }
-    
-    def find_bike(self, brand, model):
-        """Find bike in database"""
-        # First try GeometryGeeks API
-        geometry_bike = self.geometry_geeks.search_bike(brand, model)
-        if geometry_bike:
-            logger.info(f"Found bike data from GeometryGeeks: {brand} {model}")
-            return geometry_bike
+        self.persistent_cache = persistent_cache
+        self.deadline = app_config.RESOLVE_DEADLINE_MS / 1000
+        self.rules = RuleSet.from_data(data)
+        self.kits = self.rules.kits
         
-        # Fallback to local data
-        logger.info(f"Falling back to local data for: {brand} {model}")
-        brand_lower = brand.lower().strip()
-        model_lower = model.lower().strip()
+        if previous is not None:
+            self.geometry_geeks = previous.geometry_geeks
+            self.async_geometry_geeks = previous.async_geometry_geeks
+            self._executor = previous._executor
+        else:
+            self.geometry_geeks = GeometryGeeksAPI(persistent_cache=persistent_cache)
+            self.async_geometry_geeks = AsyncGeometryGeeksAPI(
+                cache=self.geometry_geeks.cache,
+                persistent_cache=persistent_cache,
+                shared_with=self.geometry_geeks.client
+            )
+            self._executor = ThreadPoolExecutor(
+                max_workers=app_config.UPSTREAM_MAX_CONCURRENT,
+                thread_name_prefix='geometrygeeks'
+            )
         
-        for bike in self.data.get('bikes', []):
-            if (bike.get('brand', '').lower() == brand_lower and 
-                model_lower in bike.get('model', '').lower()):
-                bike['source'] = 'local'
-                return bike
+        # key -> (GeometryGeeks record, result, EncodedResponse); rebuilt with every catalog version
+        self.responses = LookupCache(max_entries=app_config.CACHE_MAX_ENTRIES, ttl=app_config.CACHE_TIMEOUT)
+        self._brands_response = None
         
+        self.rules_changed = previous is None or previous.kits != self.kits
+        if snapshot is not None:
+            self.results = snapshot.results_table()
+        elif self.rules_changed:
+            self.results = ResultTable(self._analyze_catalog_bike)
+            self.results.build(self.catalog.bikes)
+        else:
+            self.results = previous.results.derive(self.catalog.bikes, self._analyze_catalog_bike)
+    
+    def resolve_bike(self, brand, model):
+        """Resolve bike specs once, recording the source and lookup timings
+
+        One precedence rule for every entry point: the local catalog (exact,
+        then fuzzy match) always wins and never touches GeometryGeeks, so a
+        query gets the same answer on every request. Only on a catalog miss
+        is a cached GeometryGeeks result used, then upstream called and
+        waited for until the resolve deadline. A late upstream answer still
+        lands in the cache for the next request.
+        """
+        started = time.perf_counter()
+        timings = {}
+        resolved = self._resolve_local(brand, model, started, timings)
+        if resolved is None:
+            resolved = self._resolve_upstream(brand, model, started, timings)
+        return resolved
+    
+    def _resolve_local(self, brand, model, started, timings):
+        """Catalog step of resolve_bike(); None when the catalog has no match"""
+        bike, confidence = self._find_local_bike(brand, model)
+        timings['local_ms'] = (time.perf_counter() - started) * 1000
+        if bike is None:
+            return None
+        return ResolvedBike(brand, model, bike, 'local', timings['local_ms'], timings, confidence)
+    
+    def _resolve_upstream(self, brand, model, started, timings):
+        """GeometryGeeks step of resolve_bike(): cached result, else a lookup bounded by the deadline"""
+        upstream_started = time.perf_counter()
+        geometry_bike = self.geometry_geeks.search_cached(brand, model)
+        looked_up = geometry_bike is MISSING and self.geometry_geeks.available()
+        if looked_up:
+            upstream = self._executor.submit(self.geometry_geeks.search_bike, brand, model, refused=MISSING)
+            try:
+                geometry_bike = upstream.result(timeout=self._remaining(started))
+            except FutureTimeoutError:
+                geometry_bike = self._deadline_exceeded(brand, model, timings)
+        return self._upstream_outcome(brand, model, geometry_bike, looked_up, started, upstream_started, timings)
+    
+    def _remaining(self, started):
+        """Seconds left of the resolve deadline"""
+        return max(self.deadline - (time.perf_counter() - started), 0)
+    
+    def _deadline_exceeded(self, brand, model, timings):
+        """Record a lookup still running at the resolve deadline; it is answered as a miss"""
+        logger.warning(f"GeometryGeeks lookup exceeded deadline for: {brand} {model}")
+        timings['deadline_exceeded'] = True
         return None
     
-    def check_compatibility(self, bike_specs):
-        """Check which kits are compatible with given bike specs"""
-        compatible_kits = []
-        
-        # Check basic requirements first (blocking criteria)
-        if not self._meets_basic_requirements(bike_specs):
-            return []
+    def _upstream_outcome(self, brand, model, geometry_bike, looked_up, started, upstream_started, timings):
+        """ResolvedBike of the GeometryGeeks step (sync and async resolutions alike)"""
+        if geometry_bike is MISSING:
+            # No GeometryGeeks answer: breaker open or call refused locally
+            timings['upstream_refused'] = True
+            geometry_bike = None
+        elif geometry_bike:
+            origin = 'GeometryGeeks' if looked_up else 'GeometryGeeks cache'
+            lookup_log.info("Found bike data from %s: %s %s", origin, brand, model)
+        timings['geometrygeeks_ms'] = (time.perf_counter() - upstream_started) * 1000
         
-        # Cosmopolit is always compatible if basic requirements are met
-        compatible_kits.append('Cosmopolit')
-        
-        # Check for Urban and Explorer compatibility
-        if self._meets_advanced_requirements(bike_specs):
-            compatible_kits.extend(['Urban', 'Explorer'])
-        
-        return compatible_kits
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if geometry_bike:
+            return ResolvedBike(brand, model, geometry_bike, 'geometrygeeks', elapsed_ms, timings)
+        return ResolvedBike(brand, model, None, 'not_found', elapsed_ms, timings)
     
-    def _meets_basic_requirements(self, bike_specs):
-        """Check if bike meets basic requirements (blocking criteria)"""
-        wheel_axle = bike_specs.get('wheel_axle_front')
-        fork_spacing = bike_specs.get('fork_spacing_mm')
-        
-        # Missing critical data
-        if wheel_axle is None or fork_spacing is None:
-            return False
-        
-        # Check blocking criteria
-        if wheel_axle != 'QR' or fork_spacing != 100:
-            return False
-        
-        return True
+    def _find_local_bike(self, brand, model):
+        """Find bike in local catalog, falling back to fuzzy matching
+
+        Returns a (bike, confidence) tuple; exact matches have confidence 1.0.
+        """
+        bike = self.catalog.find(brand, model)
+        confidence = 1.0
+        if bike is None:
+            bike, confidence = self.catalog.find_fuzzy(brand, model)
+            if bike:
+                lookup_log.info("Fuzzy match for %s %s: %s (%s)", brand, model, bike.get('model'), confidence)
+        return bike, confidence
     
-    def _meets_advanced_requirements(self, bike_specs):
-        """Check if bike meets advanced requirements for Urban/Explorer"""
-        down_tube = bike_specs.get('down_tube_length_mm')
-        seat_tube = bike_specs.get('seat_tube_length_mm')
-        
-        # Need at least one tube measurement
-        if down_tube is None and seat_tube is None:
-            return False
-        
-        # Check if either tube is long enough (300mm minimum)
-        if down_tube is not None and down_tube >= 300:
-            return True
-        if seat_tube is not None and seat_tube >= 300:
-            return True
-        
-        return False
+    def find_bike(self, brand, model):
+        """Find bike in database"""
+        return self.resolve_bike(brand, model).bike
+    
+    def check_compatibility(self, bike_specs):
+        """Check which kits are compatible with given bike specs"""
+        return self.rules.compatible_kits(bike_specs)
     
     def _has_missing_data(self, bike_specs):
         """Check if bike has missing critical data"""
-        required_fields = ['wheel_axle_front', 'fork_spacing_mm']
-        optional_fields = ['down_tube_length_mm', 'seat_tube_length_mm']
-        
         # Check required fields
-        for field in required_fields:
+        for field in REQUIRED_FIELDS:
             if bike_specs.get(field) is None:
                 return True
         
         # Check if we have at least one tube measurement
-        has_tube_data = any(bike_specs.get(field) is not None for field in optional_fields)
+        has_tube_data = any(bike_specs.get(field) is not None for field in TUBE_FIELDS)
         return not has_tube_data
     
-    def analyze(self, brand, model):
-        """Main analysis method"""
+    def analyze(self, brand, model, resolved=None):
+        """Main analysis method
+
+        Pass the ResolvedBike from resolve_bike() to reuse an existing
+        lookup instead of resolving the bike again.
+        """
         # Find bike in database
-        bike = self.find_bike(brand, model)
+        if resolved is None:
+            resolved = self.resolve_bike(brand, model)
+        bike = resolved.bike
         
         if not bike:
             return self._handle_unknown_bike(brand, model)
-        
+        return self._analyze_bike(bike, brand, model)
+    
+    def _analyze_bike(self, bike, brand='', model=''):
+        """Analyze known bike specs
+
+        The result only depends on the specs; brand and model are fallbacks
+        for records that do not carry their own names.
+        """
         # Check for missing data
         if self._has_missing_data(bike):
             return {
@@ -247,11 +627,12 @@ class CompatibilityAnalyzer:
         compatible_kits = self.check_compatibility(bike)
         
         if not compatible_kits:
+            name = f"{bike.get('brand') or brand} {bike.get('model') or model}"
             return {
                 'status': 'incompatible',
                 'kits': [],
                 'recommendation_url': None,
-                'notes': f"Le {brand} {model} n'est pas compatible avec nos kits actuels (axe traversant ou entraxe non standard)."
+                'notes': f"Le {name} n'est pas compatible avec nos kits actuels (axe traversant ou entraxe non standard)."
             }
         
         # Generate recommendation URL
@@ -268,12 +649,398 @@ class CompatibilityAnalyzer:
             'notes': notes
         }
     
+    def _analyze_catalog_bike(self, bike):
+        """Full /api/compat result of a local catalog bike (for the result table)"""
+        result = self._analyze_bike(bike)
+        result['data_source'] = 'local'
+        return result
+    
+    def evaluate(self, brand, model):
+        """Resolve and analyze a bike, adding its data source to the result
+
+        Outcomes of catalog misses are shared with other workers through
+        the persistent cache when one is configured; catalog hits never
+        read it, so the catalog keeps precedence as in resolve_bike().
+        """
+        key = GeometryGeeksAPI.cache_key(brand, model)
+        started = time.perf_counter()
+        timings = {}
+        resolved = self._resolve_local(brand, model, started, timings)
+        if resolved is None:
+            cached = self._cached_analysis(key)
+            if cached is not MISSING:
+                return cached
+            resolved = self._resolve_upstream(brand, model, started, timings)
+        return self._finish_analysis(key, brand, model, resolved)
+    
+    def evaluate_serialized(self, brand, model):
+        """Evaluate a bike and return (result, JSON body)
+
+        Local catalog hits use the precomputed body, so no serialization
+        happens on that path.
+        """
+        result, response = self.evaluate_response(brand, model)
+        return result, response.body
+    
+    def evaluate_response(self, brand, model):
+        """Evaluate a bike and return (result, EncodedResponse)
+
+        Catalog bikes use their precomputed entry and GeometryGeeks answers
+        are kept encoded while their cached record is unchanged, so
+        repeated requests for a hot bike are served from ready bytes.
+        """
+        key = GeometryGeeksAPI.cache_key(brand, model)
+        started = time.perf_counter()
+        timings = {}
+        resolved = self._resolve_local(brand, model, started, timings)
+        if resolved is None:
+            cached = self._cached_analysis(key)
+            if cached is not MISSING:
+                return cached, EncodedResponse(serialize_result(cached))
+            resolved = self._resolve_upstream(brand, model, started, timings)
+        return self._respond(key, brand, model, resolved)
+    
+    def _respond(self, key, brand, model, resolved):
+        """Get (result, EncodedResponse) of a resolved bike"""
+        response = self._ready_response(key, resolved)
+        if response is None:
+            response = self._new_response(key, brand, model, resolved)
+            self._persist_analysis(key, response[0], resolved)
+        return response
+    
+    def _ready_response(self, key, resolved):
+        """Record the resolve timings and get a precomputed or kept (result, EncodedResponse), if any"""
+        timings = resolved.timings
+        if 'local_ms' in timings:
+            stage_duration.observe(timings['local_ms'] / 1000, 'local_lookup')
+        if 'geometrygeeks_ms' in timings:
+            stage_duration.observe(timings['geometrygeeks_ms'] / 1000, 'geometrygeeks')
+        if timings.get('deadline_exceeded'):
+            deadline_exceeded.inc()
+        
+        entry = self._precomputed(resolved)
+        if entry is not None:
+            return entry.result, entry.response
+        
+        if resolved.source == 'geometrygeeks':
+            kept = self.responses.get(key)
+            # Only valid for the very record the lookup cache returned
+            if kept is not MISSING and kept[0] is resolved.bike:
+                return kept[1], kept[2]
+        return None
+    
+    def _new_response(self, key, brand, model, resolved):
+        """Analyze and encode a resolved bike (not persisted)"""
+        started = time.perf_counter()
+        result = self._analyze_resolved(brand, model, resolved)
+        analyzed = time.perf_counter()
+        encoded = EncodedResponse(serialize_result(result))
+        stage_duration.observe(analyzed - started, 'analysis')
+        stage_duration.observe(time.perf_counter() - analyzed, 'serialization')
+        if resolved.source == 'geometrygeeks':
+            self.responses.set(key, (resolved.bike, result, encoded))
+        return result, encoded
+    
+    def _precomputed(self, resolved):
+        """Precomputed table entry of a resolved local bike, if any"""
+        if resolved.source != 'local':
+            return None
+        return self.results.get(resolved.bike)
+    
+    def _cached_analysis(self, key):
+        """Get a previously computed outcome from the persistent cache"""
+        if self.persistent_cache is None:
+            return MISSING
+        return self.persistent_cache.get('analysis', key)
+    
+    def _finish_analysis(self, key, brand, model, resolved):
+        """Analyze a resolved bike, add its data source and persist the outcome
+
+        Catalog bikes come straight from the precomputed table and are not
+        persisted. Returned results may be shared and must not be mutated.
+        """
+        entry = self._precomputed(resolved)
+        if entry is not None:
+            return entry.result
+        
+        result = self._analyze_resolved(brand, model, resolved)
+        self._persist_analysis(key, result, resolved)
+        return result
+    
+    def _analyze_resolved(self, brand, model, resolved):
+        """Analyze a resolved bike and add its data source"""
+        result = self.analyze(brand, model, resolved=resolved)
+        result['data_source'] = resolved.source
+        return result
+    
+    def _persist_analysis(self, key, result, resolved):
+        """Share an analysis with other workers through the persistent cache, if any
+
+        A miss that GeometryGeeks did not answer (resolve deadline exceeded,
+        call refused locally) is not persisted: the late or next lookup must
+        be able to fill the caches for the following requests.
+        """
+        if self.persistent_cache is None:
+            return
+        if resolved.timings.get('deadline_exceeded') or resolved.timings.get('upstream_refused'):
+            return
+        cache = self.geometry_geeks.cache
+        ttl = cache.ttl if resolved.found else cache.negative_ttl
+        self.persistent_cache.set('analysis', key, result, ttl)
+    
+    def _resolve_cached_upstream(self, brand, model, geometry_geeks=None):
+        """GeometryGeeks step of resolve_bike() from the cache only
+
+        Returns None when only an upstream call could still find the bike.
+        """
+        geometry_geeks = geometry_geeks or self.geometry_geeks
+        cached = geometry_geeks.search_cached(brand, model)
+        if cached is not MISSING and cached:
+            return ResolvedBike(brand, model, cached, 'geometrygeeks', 0.0)
+        if cached is MISSING and geometry_geeks.available():
+            return None
+        return ResolvedBike(brand, model, None, 'not_found', 0.0)
+    
+    def _batch_first_pass(self, pairs, geometry_geeks=None):
+        """Deduplicate batch pairs and answer those needing no upstream call
+
+        Pairs are grouped on GeometryGeeksAPI.cache_key(), the key of the
+        lookup and analysis caches, and resolved with the precedence of
+        resolve_bike(): catalog, then persisted outcome and GeometryGeeks
+        cache. Returns (groups, answered, pending): groups maps each key to
+        its input indexes, answered is a list of (key, result) and pending
+        a list of (key, brand, model) left for GeometryGeeks. Blocking, so
+        the async batch runs it in a worker thread.
+        """
+        groups = {}
+        for index, (brand, model) in enumerate(pairs):
+            groups.setdefault(GeometryGeeksAPI.cache_key(brand, model), []).append(index)
+        
+        answered = []
+        pending = []
+        for key, indexes in groups.items():
+            brand, model = pairs[indexes[0]]
+            resolved = self._resolve_local(brand, model, time.perf_counter(), {})
+            if resolved is None:
+                cached = self._cached_analysis(key)
+                if cached is not MISSING:
+                    answered.append((key, cached))
+                    continue
+                resolved = self._resolve_cached_upstream(brand, model, geometry_geeks)
+            if resolved is None:
+                pending.append((key, brand, model))
+            else:
+                answered.append((key, self._finish_analysis(key, brand, model, resolved)))
+        return groups, answered, pending
+    
+    def _finish_upstream(self, brand, model, bike):
+        """Analyze the outcome of a batch GeometryGeeks lookup"""
+        source = 'geometrygeeks' if bike else 'not_found'
+        resolved = ResolvedBike(brand, model, bike, source, 0.0)
+        return self._finish_analysis(GeometryGeeksAPI.cache_key(brand, model), brand, model, resolved)
+    
+    def _unanswered(self, brand, model):
+        """Result of a batch lookup still pending at the batch deadline (not persisted)"""
+        result = self._handle_unknown_bike(brand, model)
+        result['data_source'] = 'not_found'
+        return result
+    
+    def evaluate_batch(self, pairs, max_workers=4, deadline=None):
+        """Evaluate many brand/model pairs, yielding (index, pair, result) as they complete
+
+        Pairs are deduplicated on their cache key. Cached and local answers
+        are produced in a first pass; the remaining pairs go to GeometryGeeks
+        with at most `max_workers` concurrent lookups. Lookups still pending
+        `deadline` seconds after the start get an unknown result; those
+        already running finish in the background and fill the cache.
+        """
+        started = time.perf_counter()
+        groups, answered, pending = self._batch_first_pass(pairs)
+        
+        def emit(key, result):
+            for index in groups[key]:
+                yield index, pairs[index], result
+        
+        for key, result in answered:
+            yield from emit(key, result)
+        
+        if not pending:
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch')
+        try:
+            futures = {
+                executor.submit(self.geometry_geeks.search_bike, brand, model): (key, brand, model)
+                for key, brand, model in pending
+            }
+            remaining = None if deadline is None else max(deadline - (time.perf_counter() - started), 0)
+            try:
+                for future in as_completed(list(futures), timeout=remaining):
+                    key, brand, model = futures.pop(future)
+                    yield from emit(key, self._finish_upstream(brand, model, future.result()))
+            except FutureTimeoutError:
+                logger.warning(f"Batch deadline exceeded: {len(futures)} lookups unanswered")
+                for key, brand, model in futures.values():
+                    yield from emit(key, self._unanswered(brand, model))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def resolve_bike_async(self, brand, model):
+        """Coroutine version of resolve_bike() for the ASGI endpoints
+
+        Same precedence and deadline, but the GeometryGeeks call is a task
+        on the event loop instead of a pool thread.
+        """
+        started = time.perf_counter()
+        timings = {}
+        resolved = self._resolve_local(brand, model, started, timings)
+        if resolved is None:
+            resolved = await self._resolve_upstream_async(brand, model, started, timings)
+        return resolved
+    
+    async def _resolve_upstream_async(self, brand, model, started, timings):
+        """Coroutine version of _resolve_upstream()"""
+        geometry_geeks = self.async_geometry_geeks
+        upstream_started = time.perf_counter()
+        geometry_bike = geometry_geeks.search_cached(brand, model)
+        looked_up = geometry_bike is MISSING and geometry_geeks.available()
+        if looked_up:
+            upstream = geometry_geeks.search_task(brand, model, refused=MISSING)
+            try:
+                # Shielded: a late answer still lands in the cache
+                geometry_bike = await asyncio.wait_for(asyncio.shield(upstream), self._remaining(started))
+            except asyncio.TimeoutError:
+                geometry_bike = self._deadline_exceeded(brand, model, timings)
+        return self._upstream_outcome(brand, model, geometry_bike, looked_up, started, upstream_started, timings)
+    
+    async def _off_loop(self, func, *args):
+        """Call func in a worker thread when a persistent cache is set (its SQLite calls block)"""
+        if self.persistent_cache is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+    
+    async def evaluate_response_async(self, brand, model):
+        """Coroutine version of evaluate_response()"""
+        key = GeometryGeeksAPI.cache_key(brand, model)
+        started = time.perf_counter()
+        timings = {}
+        resolved = self._resolve_local(brand, model, started, timings)
+        if resolved is None:
+            cached = await self._off_loop(self._cached_analysis, key)
+            if cached is not MISSING:
+                return cached, EncodedResponse(serialize_result(cached))
+            resolved = await self._resolve_upstream_async(brand, model, started, timings)
+        
+        response = self._ready_response(key, resolved)
+        if response is None:
+            response = self._new_response(key, brand, model, resolved)
+            await self._off_loop(self._persist_analysis, key, response[0], resolved)
+        return response
+    
+    async def evaluate_batch_async(self, pairs, max_concurrency=100, deadline=None):
+        """Coroutine version of evaluate_batch(), as an async generator
+
+        Pending pairs are looked up as event loop tasks, at most
+        `max_concurrency` at a time, until `deadline`.
+        """
+        started = time.perf_counter()
+        geometry_geeks = self.async_geometry_geeks
+        groups, answered, pending = await self._off_loop(self._batch_first_pass, pairs, geometry_geeks)
+        
+        for key, result in answered:
+            for index in groups[key]:
+                yield index, pairs[index], result
+        
+        if not pending:
+            return
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def lookup(key, brand, model):
+            async with semaphore:
+                return key, brand, model, await geometry_geeks.search_bike(brand, model)
+        
+        tasks = [asyncio.ensure_future(lookup(*item)) for item in pending]
+        unanswered = {key: (brand, model) for key, brand, model in pending}
+        remaining = None if deadline is None else max(deadline - (time.perf_counter() - started), 0)
+        try:
+            try:
+                for next_done in asyncio.as_completed(tasks, timeout=remaining):
+                    key, brand, model, bike = await next_done
+                    del unanswered[key]
+                    result = await self._off_loop(self._finish_upstream, brand, model, bike)
+                    for index in groups[key]:
+                        yield index, pairs[index], result
+            except asyncio.TimeoutError:
+                logger.warning(f"Batch deadline exceeded: {len(unanswered)} lookups unanswered")
+                for key, (brand, model) in unanswered.items():
+                    result = self._unanswered(brand, model)
+                    for index in groups[key]:
+                        yield index, pairs[index], result
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def brands_response(self):
+        """EncodedResponse of the full /api/brands list (built once per catalog version)"""
+        if self._brands_response is None:
+            brands = self.catalog.brands
+            self._brands_response = EncodedResponse(serialize_result({'brands': brands, 'count': len(brands)}))
+        return self._brands_response
+    
+    def catalog_report(self):
+        """Count catalog bikes per status and per kit
+
+        Uses one vectorized pass over the columnar specs when NumPy is
+        available, otherwise the per-bike path.
+        """
+        columns = self.catalog.columns
+        if columns is not None:
+            missing = columns.missing_data_mask(REQUIRED_FIELDS, TUBE_FIELDS)
+            eligibility = columns.kit_eligibility(self.rules)
+            kits = {kit: int((mask & ~missing).sum()) for kit, mask in eligibility.items()}
+            any_kit = ~columns.all_rows()
+            for mask in eligibility.values():
+                any_kit = any_kit | mask
+            by_status = {
+                'compatible': int((any_kit & ~missing).sum()),
+                'incompatible': int((~any_kit & ~missing).sum()),
+                'unknown': int(missing.sum())
+            }
+        else:
+            kits = {kit: 0 for kit in self.kits}
+            by_status = {'compatible': 0, 'incompatible': 0, 'unknown': 0}
+            for bike in self.catalog.bikes:
+                if self._has_missing_data(bike):
+                    by_status['unknown'] += 1
+                    continue
+                compatible_kits = self.check_compatibility(bike)
+                by_status['compatible' if compatible_kits else 'incompatible'] += 1
+                for kit in compatible_kits:
+                    kits[kit] += 1
+        
+        return {
+            'bikes_count': len(self.catalog),
+            'statuses': by_status,
+            'kits': kits
+        }
+    
+    def bikes_for_kit(self, kit):
+        """List catalog bikes compatible with a kit (vectorized when possible)"""
+        columns = self.catalog.columns
+        if columns is not None:
+            missing = columns.missing_data_mask(REQUIRED_FIELDS, TUBE_FIELDS)
+            mask = columns.kit_eligibility(self.rules)[kit] & ~missing
+            return [self.catalog.bikes[row] for row in mask.nonzero()[0]]
+        return [
+            bike for bike in self.catalog.bikes
+            if not self._has_missing_data(bike) and kit in self.check_compatibility(bike)
+        ]
+    
     def _handle_unknown_bike(self, brand, model):
         """Handle unknown bike models"""
         # Check if we know the brand
-        known_brands = set(bike.get('brand', '').lower() for bike in self.data.get('bikes', []))
-        
-        if brand.lower() in known_brands:
+        if self.catalog.has_brand(brand):
             notes = f"Nous connaissons la marque {brand} mais pas ce modèle spécifique ({model}). Certaines données sont manquantes, contactez notre équipe."
         else:
             notes = "Certaines données sont manquantes, contactez notre équipe."
@@ -301,12 +1068,294 @@ class CompatibilityAnalyzer:
         
         return " ".join(notes)
 
+# Autocomplete limits
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+
 # Initialize analyzer
-analyzer = CompatibilityAnalyzer(mock_data)
+analyzer = CompatibilityAnalyzer(mock_data, persistent_cache=persistent_cache, snapshot=catalog_snapshot)
+
+def swap_catalog(data):
+    """Build an analyzer for a new catalog version and swap it in
+
+    Everything is built before the single global assignment, so requests
+    keep using the previous analyzer until the new one is complete.
+    Persisted analyses are dropped for bikes that changed, plus every
+    not_found outcome when bikes were added or removed (a query may now
+    match a new bike by substring or fuzzily), or all of them when the
+    kit rules changed.
+    """
+    global analyzer, mock_data
+    
+    prepare_catalog(data)
+    new_analyzer = CompatibilityAnalyzer(data, persistent_cache=persistent_cache, previous=analyzer)
+    if persistent_cache is not None:
+        if new_analyzer.rules_changed:
+            persistent_cache.clear('analysis')
+        else:
+            for brand, model in new_analyzer.results.changed:
+                persistent_cache.delete('analysis', GeometryGeeksAPI.cache_key(brand, model))
+            if new_analyzer.results.added or new_analyzer.results.removed:
+                persistent_cache.delete_matching('analysis', 'data_source', 'not_found')
+    
+    analyzer, mock_data = new_analyzer, data
+    logger.info(f"Catalog swapped: {len(new_analyzer.catalog)} bikes, {len(new_analyzer.results.changed)} changed")
+    return new_analyzer
+
+# Reload the catalog when its file changes, or on SIGHUP if enabled (watcher started by init_app)
+catalog_reloader = CatalogReloader(
+    catalog_path(), swap_catalog, interval=app_config.CATALOG_RELOAD_INTERVAL, loader=read_catalog
+)
+
+# Prefetch the most requested GeometryGeeks bikes on startup and periodically (see init_app)
+traffic_recorder = TrafficRecorder(
+    max_keys=app_config.WARMUP_MAX_KEYS,
+    path=backend_path(app_config.WARMUP_FILE) if app_config.WARMUP_FILE else None
+)
+
+def warm_lookup(brand, model):
+    """Load one bike into the GeometryGeeks cache (cache warmer callback)"""
+    return analyzer.geometry_geeks.search_bike(brand, model)
+
+def is_warm(brand, model):
+    """Check for a fresh GeometryGeeks cache entry (cache warmer callback)"""
+    return analyzer.geometry_geeks.cache.get(GeometryGeeksAPI.cache_key(brand, model)) is not MISSING
+
+cache_warmer = CacheWarmer(
+    traffic_recorder, warm_lookup, is_warm,
+    top_n=app_config.WARMUP_TOP_KEYS,
+    rate=app_config.WARMUP_RATE,
+    interval=app_config.WARMUP_INTERVAL
+)
+
+def create_analytics():
+    """Start the analytics pipeline if enabled, with its configured sinks"""
+    if not app_config.ENABLE_ANALYTICS:
+        return None
+    sinks = []
+    if app_config.ANALYTICS_FILE:
+        path = backend_path(app_config.ANALYTICS_FILE)
+        try:
+            sinks.append(JsonlSink(path, max_bytes=app_config.ANALYTICS_FILE_MAX_BYTES,
+                                   backup_count=app_config.ANALYTICS_FILE_BACKUPS))
+        except OSError as e:
+            logger.warning(f"Analytics file disabled: {str(e)}")
+    if app_config.ANALYTICS_ENDPOINT:
+        sinks.append(HttpSink(app_config.ANALYTICS_ENDPOINT, timeout=app_config.ANALYTICS_TIMEOUT))
+    if not sinks:
+        logger.warning("Analytics enabled without ANALYTICS_FILE or ANALYTICS_ENDPOINT, disabled")
+        return None
+    pipeline = AnalyticsPipeline(
+        sinks,
+        max_queue=app_config.ANALYTICS_QUEUE_SIZE,
+        batch_size=app_config.ANALYTICS_BATCH_SIZE,
+        flush_interval=app_config.ANALYTICS_FLUSH_INTERVAL
+    )
+    pipeline.start()
+    atexit.register(pipeline.stop)
+    return pipeline
+
+# Set by init_app()
+analytics = None
+
+def create_rate_limiter():
+    """Build the per-client rate limiter, None when disabled"""
+    if not app_config.RATE_LIMIT_ENABLED or app_config.RATE_LIMIT <= 0:
+        return None
+    burst = app_config.RATE_LIMIT_BURST or app_config.RATE_LIMIT
+    if app_config.RATE_LIMIT_FILE:
+        try:
+            return SharedRateLimiter(backend_path(app_config.RATE_LIMIT_FILE), app_config.RATE_LIMIT, burst=burst,
+                                     max_keys=app_config.RATE_LIMIT_MAX_KEYS)
+        except Exception as e:
+            logger.warning(f"Shared rate limiter disabled, limiting per worker: {str(e)}")
+    return TokenBucketLimiter(app_config.RATE_LIMIT, burst=burst, shards=app_config.RATE_LIMIT_SHARDS,
+                              max_keys=app_config.RATE_LIMIT_MAX_KEYS)
+
+# Set by init_app()
+rate_limiter = None
+
+_initialized = False
+
+def init_app():
+    """Start the background work and shared resources of a serving process
+
+    Called by the server entry points (wsgi.py, start_api.py, the ASGI
+    lifespan), not on import: tests and tools importing this module (such
+    as compile_catalog.py) get no logging threads, rate limiter or
+    analytics files, catalog watcher, traffic file nor GeometryGeeks
+    calls. Only the first call has an effect.
+    """
+    global _initialized, logging_setup, analytics, rate_limiter
+    if _initialized:
+        return
+    _initialized = True
+    logging_setup = configure_logging(app_config, BASE_DIR)
+    atexit.register(logging_setup.stop)
+    rate_limiter = create_rate_limiter()
+    analytics = create_analytics()
+    if app_config.CATALOG_RELOAD_ON_SIGHUP:
+        catalog_reloader.install_signal_handler()
+    catalog_reloader.start()
+    traffic_recorder.load()
+    atexit.register(traffic_recorder.save)
+    cache_warmer.start()
+
+# Load balancer health checks, metric scrapes and the cached brand/model lists used by
+# the widget's autocomplete are never limited (nor CORS preflights)
+RATE_LIMIT_EXEMPT = frozenset({'/api/health', '/api/metrics', '/api/brands', '/api/models'})
+
+# Charged by their route once the body is parsed, one token per item (see batch_rate_limit_cost)
+RATE_LIMIT_PER_ITEM = frozenset({'/api/compat/batch'})
+
+RATE_LIMITED = {
+    'error': 'Too many requests',
+    'message': 'Rate limit exceeded, please retry later'
+}
+
+def check_rate_limit(method, path, remote_addr, cost=1):
+    """
+    Count a request against its client's rate limit
+
+    Args:
+        method (str): HTTP method
+        path (str): Request path
+        remote_addr (str): Client address ('unknown' when the server has none)
+        cost (int): Tokens taken by the request
+
+    Returns:
+        RateLimitDecision: Outcome, or None when the request is not limited
+    """
+    if rate_limiter is None or method == 'OPTIONS' or path in RATE_LIMIT_EXEMPT:
+        return None
+    return rate_limiter.hit(rate_limit_key(remote_addr), cost)
+
+def batch_rate_limit_cost(items):
+    """Tokens charged for a batch: one per item (parse_batch_items refuses batches over a full bucket)"""
+    if rate_limiter is None or not items:
+        return 1
+    return len(items)
+
+def rate_limit_headers(decision, cache_control):
+    """
+    Rate limit headers to add to a response
+
+    Publicly cacheable responses get none: a shared cache would replay one
+    client's quota to every other client. Refusals always carry them.
+
+    Args:
+        decision (RateLimitDecision): Outcome of the request's check
+        cache_control (str): Cache-Control header of the response
+
+    Returns:
+        list: (name, value) pairs
+    """
+    if decision.allowed and 'public' in cache_control.lower():
+        return []
+    return decision.headers()
+
+def apply_rate_limit(cost=1):
+    """Charge the current Flask request, returning a 429 response when it is over the limit"""
+    decision = check_rate_limit(request.method, request.path, request.remote_addr or 'unknown', cost)
+    if decision is None:
+        return None
+    g.rate_limit = decision
+    if not decision.allowed:
+        return jsonify(RATE_LIMITED), 429
+    return None
+
+@app.before_request
+def enforce_rate_limit():
+    """Refuse requests over the client's rate limit with 429"""
+    if request.path in RATE_LIMIT_PER_ITEM:
+        return None
+    return apply_rate_limit()
+
+@app.after_request
+def add_rate_limit_headers(response):
+    """Tell clients their remaining quota"""
+    decision = g.pop('rate_limit', None)
+    if decision is not None:
+        response.headers.extend(rate_limit_headers(decision, response.headers.get('Cache-Control', '')))
+    return response
+
+def send_encoded(encoded, cache_control):
+    """Write an EncodedResponse with ETag and Cache-Control
+
+    The content coding is negotiated from Accept-Encoding (compressed
+    variants are kept on the EncodedResponse), and a matching
+    If-None-Match gets 304 Not Modified.
+    """
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''), len(encoded.body),
+                                  app_config.RESPONSE_COMPRESS_MIN_BYTES)
+    etag = encoded.etag_for(encoding)
+    if etag_matches(request.headers.get('If-None-Match', ''), etag):
+        response = Response(status=304)
+    else:
+        response = Response(encoded.variant(encoding), mimetype='application/json')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+def parse_batch_items(payload):
+    """Extract the item list of a batch request body
+
+    Returns (items, None), or (None, (error body, status)) when the
+    request is rejected as a whole.
+    """
+    items = payload.get('bikes') if isinstance(payload, dict) else payload
+    
+    if not isinstance(items, list) or not items:
+        return None, ({
+            'error': 'Invalid request body',
+            'message': 'Expected a JSON object with a non-empty "bikes" list'
+        }, 400)
+    
+    if len(items) > app_config.BATCH_MAX_ITEMS:
+        return None, ({
+            'error': 'Batch too large',
+            'message': f'A batch may contain at most {app_config.BATCH_MAX_ITEMS} bikes'
+        }, 413)
+    
+    # Each item takes a token: a batch larger than the bucket could never be allowed
+    if rate_limiter is not None and len(items) > rate_limiter.limit:
+        return None, ({
+            'error': 'Batch too large',
+            'message': f'A batch may contain at most {rate_limiter.limit} bikes (rate limit burst)'
+        }, 413)
+    return items, None
+
+def validate_batch_items(items):
+    """Validate batch items; invalid ones get an error entry and are not analyzed
+
+    Returns (pairs, positions, errors): the cleaned (brand, model) pairs,
+    the input index of each pair and the error entries by input index.
+    """
+    pairs = []
+    positions = []
+    errors = {}
+    for index, item in enumerate(items):
+        brand = item.get('brand') if isinstance(item, dict) else None
+        model = item.get('model') if isinstance(item, dict) else None
+        if not isinstance(brand, str) or not isinstance(model, str) or not brand.strip() or not model.strip():
+            errors[index] = {
+                'brand': brand,
+                'model': model,
+                'error': 'Missing required parameters',
+                'message': 'Both brand and model are required'
+            }
+            continue
+        positions.append(index)
+        pairs.append((brand.strip(), model.strip()))
+    return pairs, positions, errors
 
 @app.route('/api/compat', methods=['GET'])
 def check_compatibility():
     """Main compatibility check endpoint"""
+    started = time.perf_counter()
     try:
         # Get parameters
         brand = request.args.get('brand', '').strip()
@@ -320,28 +1369,113 @@ def check_compatibility():
             }), 400
         
         # Log request
-        logger.info(f"Compatibility check: {brand} {model}")
-        
-        # Add source info to response
-        bike = analyzer.find_bike(brand, model)
-        source = bike.get('source', 'unknown') if bike else 'not_found'
+        compat_log.info("Compatibility check: %s %s", brand, model)
         
-        # Analyze compatibility
-        result = analyzer.analyze(brand, model)
-        result['data_source'] = source
+        # Resolve the bike once and analyze compatibility
+        result, encoded = analyzer.evaluate_response(brand, model)
+        source = result['data_source']
+        if source == 'geometrygeeks':
+            traffic_recorder.record(brand, model)
+        if analytics is not None:
+            log_compatibility_request(analytics, brand, model, result)
         
         # Log result
-        logger.info(f"Result: {result['status']} - {len(result['kits'])} kits - Source: {source}")
+        compat_log.info("Result: %s - %d kits - Source: %s", result['status'], len(result['kits']), source)
         
-        return jsonify(result)
+        response = send_encoded(encoded, cache_policy.compat(result['status']))
+        record_compat_request(started, result['status'], source)
+        return response
     
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
+        record_compat_request(started, 'error', 'none')
         return jsonify({
             'error': 'Internal server error',
             'message': 'An error occurred while processing your request'
         }), 500
 
+@app.route('/api/compat/batch', methods=['POST'])
+def check_compatibility_batch():
+    """Bulk compatibility check
+
+    Body: {"bikes": [{"brand": ..., "model": ...}, ...]}. Results keep the
+    /api/compat shape plus the echoed brand/model, in input order. With
+    ?stream=true (or Accept: application/x-ndjson) one JSON line per item
+    is streamed as soon as it is ready, with its input `index`.
+    """
+    items, problem = parse_batch_items(request.get_json(silent=True))
+    refused = apply_rate_limit(batch_rate_limit_cost(items))
+    if refused is not None:
+        return refused
+    if problem is not None:
+        body, status = problem
+        return jsonify(body), status
+    pairs, positions, errors = validate_batch_items(items)
+    
+    logger.info(f"Batch compatibility check: {len(items)} bikes ({len(errors)} invalid)")
+    
+    def results():
+        for index, error in errors.items():
+            yield index, error
+        for pair_index, (brand, model), result in analyzer.evaluate_batch(
+                pairs, max_workers=app_config.BATCH_UPSTREAM_CONCURRENCY,
+                deadline=app_config.BATCH_DEADLINE_MS / 1000):
+            yield positions[pair_index], dict(result, brand=brand, model=model)
+    
+    stream = (request.args.get('stream', '').lower() in ('1', 'true')
+              or 'application/x-ndjson' in request.headers.get('Accept', ''))
+    if stream:
+        def ndjson():
+            try:
+                for index, result in results():
+                    yield json.dumps(dict(result, index=index), ensure_ascii=False) + '\n'
+            except Exception as e:
+                logger.error(f"Error streaming batch results: {str(e)}")
+                yield json.dumps({'error': 'Internal server error'}) + '\n'
+        return Response(ndjson(), mimetype='application/x-ndjson')
+    
+    try:
+        ordered = [None] * len(items)
+        for index, result in results():
+            ordered[index] = result
+    except Exception as e:
+        logger.error(f"Error processing batch request: {str(e)}")
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'An error occurred while processing your request'
+        }), 500
+    
+    return jsonify({
+        'results': ordered,
+        'count': len(ordered)
+    })
+
+@app.route('/api/catalog/report', methods=['GET'])
+def catalog_report():
+    """Catalog-wide compatibility counts per status and per kit"""
+    return jsonify(analyzer.catalog_report())
+
+@app.route('/api/kits/<kit_name>/bikes', methods=['GET'])
+def get_kit_bikes(kit_name):
+    """List catalog bikes compatible with a kit"""
+    kit = next((name for name in analyzer.kits if name.lower() == kit_name.lower()), None)
+    if kit is None:
+        return jsonify({
+            'error': 'Not found',
+            'message': f'Unknown kit: {kit_name}'
+        }), 404
+    
+    bikes = [
+        {'brand': bike.get('brand'), 'model': bike.get('model')}
+        for bike in analyzer.bikes_for_kit(kit)
+    ]
+    
+    return jsonify({
+        'kit': kit,
+        'bikes': bikes,
+        'count': len(bikes)
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -349,20 +1483,121 @@ def health_check():
         'status': 'healthy',
         'version': '1.0',
         'timestamp': datetime.now().isoformat(),
-        'bikes_count': len(mock_data.get('bikes', []))
+        'bikes_count': len(analyzer.catalog),
+        'catalog_reload': catalog_reloader.stats(),
+        'catalog_ingest': ingest_report,
+        'catalog_snapshot': catalog_snapshot.path if catalog_snapshot is not None else None,
+        'warmup': cache_warmer.stats(),
+        'rate_limit': rate_limiter.stats() if rate_limiter is not None else None,
+        'analytics': analytics.stats() if analytics is not None else None,
+        'logging': logging_setup.stats() if logging_setup is not None else None,
+        'geometrygeeks': {
+            'available': analyzer.geometry_geeks.available(),
+            'client': analyzer.geometry_geeks.client.stats(),
+            'async_client': analyzer.async_geometry_geeks.client.stats(),
+            'cache': analyzer.geometry_geeks.cache.stats()
+        }
     })
 
+@metrics.collector
+def collect_runtime_metrics():
+    """Catalog, cache and upstream counters read from their stats() at scrape time"""
+    current = analyzer
+    yield 'catalog_bikes', 'gauge', 'Bikes in the local catalog', [({}, len(current.catalog))]
+    
+    caches = {
+        'geometrygeeks': current.geometry_geeks.cache.stats(),
+        'responses': current.responses.stats()
+    }
+    if persistent_cache is not None:
+        caches['persistent'] = persistent_cache.stats()
+    for stat, help_text in (('hits', 'Cache hits'), ('misses', 'Cache misses'), ('evictions', 'Cache evictions')):
+        yield f'cache_{stat}', 'counter', help_text, [
+            ({'cache': name}, stats.get(stat, 0)) for name, stats in caches.items()
+        ]
+    
+    clients = {
+        'sync': current.geometry_geeks.client.stats(),
+        'async': current.async_geometry_geeks.client.stats()
+    }
+    for stat, help_text in (('requests', 'GeometryGeeks HTTP attempts'),
+                            ('retries', 'GeometryGeeks retried attempts'),
+                            ('errors', 'GeometryGeeks calls failed after retries'),
+                            ('timeouts', 'GeometryGeeks calls failed on a timeout')):
+        yield f'upstream_{stat}', 'counter', help_text, [
+            ({'client': name}, stats[stat]) for name, stats in clients.items()
+        ]
+    yield 'upstream_circuit_open', 'gauge', 'GeometryGeeks circuit breaker not closed', [
+        ({'client': name}, int(stats['breaker']['state'] != CircuitBreaker.CLOSED)) for name, stats in clients.items()
+    ]
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Metrics in Prometheus text format"""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/brands', methods=['GET'])
 def get_brands():
-    """Get list of available brands (for future autocomplete)"""
-    brands = list(set(bike.get('brand', '') for bike in mock_data.get('bikes', []) if bike.get('brand')))
-    brands.sort()
+    """Get list of available brands, optionally filtered by prefix (autocomplete)"""
+    prefix = request.args.get('prefix')
+    if prefix is None:
+        return send_encoded(analyzer.brands_response(), cache_policy.brands())
     
-    return jsonify({
+    limit = _parse_suggestion_limit()
+    if limit is None:
+        return _invalid_limit_response()
+    brands = analyzer.catalog.suggest_brands(prefix, limit)
+    
+    encoded = EncodedResponse(serialize_result({
         'brands': brands,
         'count': len(brands)
+    }))
+    return send_encoded(encoded, cache_policy.brands())
+
+@app.route('/api/models', methods=['GET'])
+def get_models():
+    """Autocomplete catalog models of a brand from a typed prefix"""
+    brand = request.args.get('brand', '').strip()
+    prefix = request.args.get('prefix', '')
+    
+    if not brand:
+        return jsonify({
+            'error': 'Missing required parameters',
+            'message': 'The brand parameter is required'
+        }), 400
+    
+    limit = _parse_suggestion_limit()
+    if limit is None:
+        return _invalid_limit_response()
+    
+    models = [
+        {'brand': bike.get('brand'), 'model': bike.get('model')}
+        for bike in analyzer.catalog.suggest_models(brand, prefix, limit)
+    ]
+    
+    return jsonify({
+        'brand': brand,
+        'prefix': prefix,
+        'models': models,
+        'count': len(models)
     })
 
+def _parse_suggestion_limit():
+    """Read the optional `limit` query parameter (1-50, default 10)"""
+    try:
+        limit = int(request.args.get('limit', DEFAULT_SUGGESTIONS))
+    except ValueError:
+        return None
+    if limit < 1 or limit > MAX_SUGGESTIONS:
+        return None
+    return limit
+
+def _invalid_limit_response():
+    return jsonify({
+        'error': 'Invalid parameter',
+        'message': f'limit must be an integer between 1 and {MAX_SUGGESTIONS}'
+    }), 400
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
@@ -379,4 +1614,5 @@ def internal_error(error):
 
 if __name__ == '__main__':
     # Development server
+    init_app()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point with asyncio compatibility endpoints
+
+    uvicorn asgi:application --workers 4
+
+GET /api/compat and POST /api/compat/batch run as coroutines on the event
+loop, with GeometryGeeks lookups through the async client: a request
+waiting on upstream costs a suspended task, not a worker thread. Every
+other route (and CORS preflights) is served by the Flask app through a
+WSGI adapter. The async routes apply the Flask app's rate limiter too.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+import app as app_module
+from app import app, app_config, parse_batch_items, validate_batch_items
+from http_cache import etag_matches, negotiate_encoding
+from logging_setup import sampled_logger
+from rate_limit import SharedRateLimiter
+from utils import log_compatibility_request
+
+logger = logging.getLogger(__name__)
+compat_log = sampled_logger(logger, 'compat')
+
+wsgi_application = WSGIMiddleware(app)
+
+INTERNAL_ERROR = {
+    'error': 'Internal server error',
+    'message': 'An error occurred while processing your request'
+}
+
+def _encode_headers(headers):
+    return [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+async def _send_response(send, status, body, content_type='application/json', headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': _encode_headers([
+            ('content-type', content_type),
+            ('content-length', str(len(body))),
+            ('access-control-allow-origin', '*'),
+            *headers
+        ])
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def _send_encoded(scope, send, encoded, cache_control):
+    """Send an EncodedResponse in the negotiated coding, or 304 if If-None-Match matches"""
+    encoding = negotiate_encoding(_header(scope, 'accept-encoding'), len(encoded.body),
+                                  app_config.RESPONSE_COMPRESS_MIN_BYTES)
+    etag = encoded.etag_for(encoding)
+    headers = [('etag', f'"{etag}"'), ('cache-control', cache_control), ('vary', 'Accept-Encoding')]
+    if not etag_matches(_header(scope, 'if-none-match'), etag):
+        if encoding is not None:
+            headers.append(('content-encoding', encoding))
+        await _send_response(send, 200, encoded.variant(encoding), headers=headers)
+        return
+    await send({
+        'type': 'http.response.start',
+        'status': 304,
+        'headers': _encode_headers([('access-control-allow-origin', '*'), *headers])
+    })
+    await send({'type': 'http.response.body', 'body': b''})
+
+def _with_rate_limit_headers(send, decision):
+    """Wrap send to add the rate limit headers to the response start message"""
+    async def send_with_headers(message):
+        if message['type'] == 'http.response.start':
+            headers = message.get('headers', [])
+            cache_control = next((value.decode('latin-1') for name, value in headers if name == b'cache-control'), '')
+            added = app_module.rate_limit_headers(decision, cache_control)
+            if added:
+                message = dict(message, headers=[*headers, *_encode_headers([(n.lower(), v) for n, v in added])])
+        await send(message)
+    return send_with_headers
+
+async def _send_json(send, status, data):
+    await _send_response(send, status, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+def _header(scope, name):
+    for key, value in scope.get('headers', []):
+        if key.decode('latin-1').lower() == name:
+            return value.decode('latin-1')
+    return ''
+
+def _query(scope):
+    return {key: values[0] for key, values in parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+
+async def check_compatibility(scope, receive, send):
+    """Async /api/compat (same contract as the Flask route)"""
+    started = time.perf_counter()
+    try:
+        query = _query(scope)
+        brand = query.get('brand', '').strip()
+        model = query.get('model', '').strip()
+
+        if not brand or not model:
+            await _send_json(send, 400, {
+                'error': 'Missing required parameters',
+                'message': 'Both brand and model are required'
+            })
+            return
+
+        compat_log.info("Compatibility check: %s %s", brand, model)
+        result, encoded = await app_module.analyzer.evaluate_response_async(brand, model)
+        if result['data_source'] == 'geometrygeeks':
+            app_module.traffic_recorder.record(brand, model)
+        if app_module.analytics is not None:
+            client = scope.get('client')
+            log_compatibility_request(app_module.analytics, brand, model, result,
+                                      remote_addr=client[0] if client else '', user_agent=_header(scope, 'user-agent'))
+        compat_log.info("Result: %s - %d kits - Source: %s", result['status'], len(result['kits']),
+                        result['data_source'])
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}")
+        app_module.record_compat_request(started, 'error', 'none')
+        await _send_json(send, 500, INTERNAL_ERROR)
+        return
+    await _send_encoded(scope, send, encoded, app_module.cache_policy.compat(result['status']))
+    app_module.record_compat_request(started, result['status'], result['data_source'])
+
+async def check_compatibility_batch(scope, receive, send):
+    """Async /api/compat/batch (same contract as the Flask route)"""
+    body = await _read_body(receive)
+    mimetype = _header(scope, 'content-type').split(';')[0].strip().lower()
+    payload = None
+    if mimetype == 'application/json' or mimetype.endswith('+json'):
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+
+    items, problem = parse_batch_items(payload)
+    send, allowed = await _apply_rate_limit(scope, send, app_module.batch_rate_limit_cost(items))
+    if not allowed:
+        return
+    if problem is not None:
+        await _send_json(send, problem[1], problem[0])
+        return
+    pairs, positions, errors = validate_batch_items(items)
+    logger.info(f"Batch compatibility check: {len(items)} bikes ({len(errors)} invalid)")
+
+    analyzer = app_module.analyzer
+
+    async def results():
+        for index, error in errors.items():
+            yield index, error
+        async for pair_index, (brand, model), result in analyzer.evaluate_batch_async(
+                pairs, max_concurrency=app_config.ASYNC_BATCH_UPSTREAM_CONCURRENCY,
+                deadline=app_config.BATCH_DEADLINE_MS / 1000):
+            yield positions[pair_index], dict(result, brand=brand, model=model)
+
+    stream = (_query(scope).get('stream', '').lower() in ('1', 'true')
+              or 'application/x-ndjson' in _header(scope, 'accept'))
+    if stream:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'application/x-ndjson'), (b'access-control-allow-origin', b'*')]
+        })
+        try:
+            async for index, result in results():
+                line = json.dumps(dict(result, index=index), ensure_ascii=False) + '\n'
+                await send({'type': 'http.response.body', 'body': line.encode('utf-8'), 'more_body': True})
+        except Exception as e:
+            logger.error(f"Error streaming batch results: {str(e)}")
+            line = json.dumps({'error': 'Internal server error'}) + '\n'
+            await send({'type': 'http.response.body', 'body': line.encode('utf-8'), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    try:
+        ordered = [None] * len(items)
+        async for index, result in results():
+            ordered[index] = result
+    except Exception as e:
+        logger.error(f"Error processing batch request: {str(e)}")
+        await _send_json(send, 500, INTERNAL_ERROR)
+        return
+    await _send_json(send, 200, {'results': ordered, 'count': len(ordered)})
+
+ROUTES = {
+    ('GET', '/api/compat'): check_compatibility,
+    ('POST', '/api/compat/batch'): check_compatibility_batch
+}
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            app_module.init_app()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await app_module.analyzer.async_geometry_geeks.client.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def _check_rate_limit(scope, cost):
+    """Rate limit decision for an async route (the shared limiter's SQLite update runs in a thread)"""
+    client = scope.get('client')
+    args = (scope['method'], scope['path'], client[0] if client else 'unknown', cost)
+    if isinstance(app_module.rate_limiter, SharedRateLimiter):
+        return await asyncio.to_thread(app_module.check_rate_limit, *args)
+    return app_module.check_rate_limit(*args)
+
+async def _apply_rate_limit(scope, send, cost=1):
+    """
+    Charge an async route's request
+
+    Returns:
+        tuple: (send adding the rate limit headers, allowed); the 429 is
+        already sent when not allowed
+    """
+    decision = await _check_rate_limit(scope, cost)
+    if decision is None:
+        return send, True
+    send = _with_rate_limit_headers(send, decision)
+    if not decision.allowed:
+        await _send_json(send, 429, app_module.RATE_LIMITED)
+        return send, False
+    return send, True
+
+async def application(scope, receive, send):
+    """ASGI application: async compat endpoints, Flask for the rest"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    handler = None
+    if scope['type'] == 'http':
+        handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        await wsgi_application(scope, receive, send)
+        return
+
+    if scope['path'] not in app_module.RATE_LIMIT_PER_ITEM:
+        send, allowed = await _apply_rate_limit(scope, send)
+        if not allowed:
+            return
+    await handler(scope, receive, send)
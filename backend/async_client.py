@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+asyncio HTTP client for upstream APIs (GeometryGeeks)
+Version 1.0
+
+Async counterpart of http_client.UpstreamClient built on httpx: the same
+circuit breaker, retry budget and single per-call deadline (the retry
+decisions come from http_client.RetryingClient), with an asyncio
+semaphore as bulkhead. A pending upstream call is a suspended
+coroutine instead of a blocked worker thread, so thousands of them can
+wait at once.
+"""
+
+import asyncio
+import logging
+import time
+
+import httpx
+
+from http_client import RetryingClient, UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+class AsyncUpstreamClient(RetryingClient):
+    """Pooled keep-alive async HTTP client with bulkhead, retries and circuit breaker"""
+
+    TIMEOUT_ERROR = httpx.TimeoutException
+
+    def __init__(self, base_url, timeout=5, pool_size=100, max_concurrent=1000,
+                 queue_timeout=0.1, max_retries=2, backoff=0.1,
+                 retry_budget=None, breaker=None, headers=None, transport=None):
+        super().__init__(base_url, timeout, pool_size, max_concurrent, queue_timeout,
+                         max_retries, backoff, retry_budget, breaker)
+        self.headers = headers or {}
+        self._transport = transport
+
+        # Created on first use: an httpx pool belongs to the event loop that opened it
+        self._session = None
+        self._bulkhead = None
+        self._loop = None
+        self._closer = None
+
+    def _ensure_session(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._release_session()
+            self._session = httpx.AsyncClient(
+                headers=self.headers,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                transport=self._transport
+            )
+            self._bulkhead = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+            # Sockets can only be closed by their own loop: asyncio.run() and the
+            # servers cancel the tasks left on a loop before closing it
+            self._closer = loop.create_task(self._close_when_cancelled(self._session))
+        return self._session
+
+    @staticmethod
+    async def _close_when_cancelled(session):
+        """Wait until cancelled, then close the session's connections"""
+        try:
+            await asyncio.Future()
+        finally:
+            await session.aclose()
+
+    def _release_session(self):
+        """Forget the current session and have its own loop close it"""
+        loop, closer = self._loop, self._closer
+        self._session = self._bulkhead = self._loop = self._closer = None
+        # A closed loop already ran the closer
+        if closer is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(closer.cancel)
+
+    async def get(self, path, params=None):
+        """
+        Perform a GET request against the upstream
+
+        All attempts share a single deadline of `timeout` seconds, so retries
+        never extend the worst-case latency of a lookup.
+
+        Args:
+            path (str): Path relative to base_url
+            params (dict): Query parameters
+
+        Returns:
+            httpx.Response: Final response
+
+        Raises:
+            UpstreamUnavailable: Breaker open or bulkhead full
+            httpx.HTTPError: Transport error after retries
+        """
+        session = self._ensure_session()
+        if not self.breaker.allow():
+            raise UpstreamUnavailable("Circuit breaker open")
+        try:
+            await asyncio.wait_for(self._bulkhead.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._count('bulkhead_rejected')
+            self.breaker.cancel_probe()
+            raise UpstreamUnavailable("Too many concurrent upstream calls")
+
+        self._in_flight += 1
+        try:
+            return await self._get_with_retries(session, f"{self.base_url}{path}", params)
+        finally:
+            self._in_flight -= 1
+            self._bulkhead.release()
+
+    async def _get_with_retries(self, session, url, params):
+        deadline = time.monotonic() + self.timeout
+        self.retry_budget.deposit()
+        attempt = 0
+
+        while True:
+            self._count('requests')
+            started = time.monotonic()
+            try:
+                response = await session.get(url, params=params, timeout=max(deadline - started, 0.001))
+                error = None
+            except httpx.HTTPError as e:
+                response = None
+                error = e
+
+            delay = self._retry_delay(attempt, deadline, response, error, time.monotonic() - started)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        """Close the pooled connections (from another loop, they are closed by their own)"""
+        closer = self._closer
+        if closer is None:
+            return
+        if self._loop is not asyncio.get_running_loop():
+            self._release_session()
+            return
+        self._session = self._bulkhead = self._loop = self._closer = None
+        closer.cancel()
+        await asyncio.wait([closer])
+
+    def stats(self):
+        """
+        Get client statistics for the health endpoint
+
+        Returns:
+            dict: Breaker state, bulkhead and retry counters
+        """
+        stats = super().stats()
+        stats['pool_size'] = self.pool_size
+        return stats
@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Lookup caches for Reebike Compatibility API
+Version 1.0
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Sentinel distinguishing "not cached" from a cached None (negative entry)
+MISSING = object()
+
+class _Entry:
+    """Single cached value with its expiry timestamps"""
+
+    __slots__ = ('value', 'expires_at', 'stale_until')
+
+    def __init__(self, value, expires_at, stale_until):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+class _Call:
+    """In-flight load shared by coalesced callers"""
+
+    __slots__ = ('done', 'value', 'error', 'waiters', 'task')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = []  # (loop, future) of coroutines waiting for the outcome
+        self.task = None
+
+    def outcome(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+def _settle(future, call):
+    """Pass a finished call's outcome to an async waiter (runs on its loop)"""
+    if future.done():
+        return
+    if isinstance(call.error, asyncio.CancelledError):
+        future.cancel()
+    elif call.error is not None:
+        future.set_exception(call.error)
+    else:
+        future.set_result(call.value)
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time
+
+    Callers arriving while a call for the same key is in flight wait for
+    it and share its result or exception instead of starting their own.
+    Threads (do) and coroutines (do_async) share the same calls, so a
+    blocking lookup and an async one for the same key also coalesce.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def _join(self, key):
+        """Get the in-flight call for key, creating it if needed; returns (call, leader)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _finish(self, key, call, value=None, error=None):
+        """Publish the outcome to thread and coroutine waiters"""
+        with self._lock:
+            call.value = value
+            call.error = error
+            del self._calls[key]
+            call.done.set()
+            waiters, call.waiters = call.waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_settle, future, call)
+
+    def do(self, key, fn):
+        """
+        Call fn() unless a call for key is already running, then share its outcome
+
+        Args:
+            key: Deduplication key
+            fn (callable): Zero-argument function
+
+        Returns:
+            Result of the (possibly shared) call
+        """
+        call, leader = self._join(key)
+        if not leader:
+            call.done.wait()
+            return call.outcome()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, value=value)
+        return value
+
+    async def do_async(self, key, fn):
+        """
+        Await fn() unless a call for key is already running, then share its outcome
+
+        The call runs as a task: a cancelled waiter, the first one included,
+        does not cancel the call the others wait on.
+
+        Args:
+            key: Deduplication key
+            fn (callable): Zero-argument coroutine function
+
+        Returns:
+            Result of the (possibly shared) call
+        """
+        call, leader = self._join(key)
+        if leader:
+            call.task = asyncio.ensure_future(fn())
+            call.task.add_done_callback(lambda task: self._finish_task(key, call, task))
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            waiting = not call.done.is_set()
+            if waiting:
+                call.waiters.append((loop, future))
+        if not waiting:
+            return call.outcome()
+        return await future
+
+    def _finish_task(self, key, call, task):
+        if task.cancelled():
+            self._finish(key, call, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(key, call, error=task.exception())
+        else:
+            self._finish(key, call, value=task.result())
+
+    def in_flight(self):
+        """Number of keys currently being loaded"""
+        return len(self._calls)
+
+class LookupCache:
+    """
+    Thread-safe bounded cache with TTL, LRU eviction and negative caching
+
+    Positive entries live for `ttl` seconds and may then be served stale for
+    up to `stale_ttl` more seconds while a background refresh runs.
+    Negative entries (None values: misses and upstream errors) live for the
+    shorter `negative_ttl` and are never served stale.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300, negative_ttl=60, stale_ttl=0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'negative_hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'refreshes': 0
+        }
+
+    def get(self, key):
+        """
+        Return the fresh cached value for key
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value (possibly None for negative entries) or MISSING
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= self._clock():
+                return MISSING
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def set(self, key, value):
+        """
+        Store value under key, evicting least recently used entries
+
+        Args:
+            key: Cache key
+            value: Value to cache; None is stored as a negative entry
+        """
+        now = self._clock()
+        if value is None:
+            entry = _Entry(None, now + self.negative_ttl, now + self.negative_ttl)
+        else:
+            expires_at = now + self.ttl
+            entry = _Entry(value, expires_at, expires_at + self.stale_ttl)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_or_load(self, key, loader):
+        """
+        Return cached value for key, calling loader() on a miss
+
+        Stale positive entries are returned immediately and refreshed in a
+        background thread, so callers never block on a revalidation.
+        Concurrent misses on the same key share a single loader() call
+        (and its exception, if it raises).
+
+        Args:
+            key: Cache key
+            loader (callable): Zero-argument function producing the value
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        value = self.peek(key, loader)
+        if value is not MISSING:
+            return value
+        return self._flight.do(key, lambda: self._load(key, loader))
+
+    def _load(self, key, loader):
+        """Load and store a missing key (runs once per coalesced miss)"""
+        # A call that just finished may have filled the entry
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        with self._lock:
+            self._stats['misses'] += 1
+        value = loader()
+        self.set(key, value)
+        return value
+
+    async def get_or_load_async(self, key, loader):
+        """
+        Coroutine version of get_or_load() for an async loader
+
+        Stale entries are served without refresh here; callers wanting a
+        background refresh peek() first. A miss joins a load already in
+        flight for the key, whether started here or by get_or_load().
+
+        Args:
+            key: Cache key
+            loader (callable): Zero-argument coroutine function producing the value
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        value = self.peek(key)
+        if value is not MISSING:
+            return value
+        return await self._flight.do_async(key, lambda: self._load_async(key, loader))
+
+    async def _load_async(self, key, loader):
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        with self._lock:
+            self._stats['misses'] += 1
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def peek(self, key, loader=None):
+        """
+        Return the cached value for key without ever blocking on a load
+
+        Like get_or_load(), stale positive entries are served and, when a
+        loader is given, refreshed in the background.
+
+        Args:
+            key: Cache key
+            loader (callable): Optional loader used for background refresh
+
+        Returns:
+            Cached value (possibly None for negative entries) or MISSING
+        """
+        now = self._clock()
+        refresh = False
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self._stats['negative_hits' if entry.value is None else 'hits'] += 1
+                return entry.value
+            if entry.stale_until <= now or entry.value is None:
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            self._stats['stale_hits'] += 1
+            if loader is not None and key not in self._refreshing:
+                self._refreshing.add(key)
+                refresh = True
+            value = entry.value
+
+        if refresh:
+            threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+        return value
+
+    def _refresh(self, key, loader):
+        """Reload key in the background, keeping the stale value on failure"""
+        try:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+            with self._lock:
+                self._stats['refreshes'] += 1
+        except Exception as e:
+            logger.warning(f"Background cache refresh failed for {key}: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, key):
+        """Remove key from the cache"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            dict: Counters plus current size and capacity
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        stats['coalesced'] = self._flight.coalesced
+        stats['loads_in_flight'] = self._flight.in_flight()
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
+
+class PersistentCache:
+    """
+    SQLite-backed cache shared by every worker process on the host
+
+    The database runs in WAL mode so readers in other workers never block
+    on a writer. Entries expire after their TTL and the table is trimmed to
+    `max_entries` (soonest-expiring first) every `trim_interval` writes.
+    Any SQLite error is logged and treated as a miss: the cache must never
+    fail a request.
+    """
+
+    def __init__(self, path, max_entries=100000, trim_interval=500, busy_timeout_ms=200):
+        self.path = path
+        self.max_entries = max_entries
+        self.trim_interval = trim_interval
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'errors': 0}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection()
+
+    def _connection(self):
+        """Get this thread's connection, creating the schema on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                'namespace TEXT NOT NULL, '
+                'key TEXT NOT NULL, '
+                'value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, '
+                'PRIMARY KEY (namespace, key))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries (expires_at)')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode_key(key):
+        return json.dumps(key, separators=(',', ':'))
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def get(self, namespace, key):
+        """
+        Return the unexpired value stored under namespace/key
+
+        Args:
+            namespace (str): Logical cache name (e.g. 'geometrygeeks')
+            key: JSON-serializable key
+
+        Returns:
+            Cached value (possibly None for negative entries) or MISSING
+        """
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?',
+                (namespace, self._encode_key(key), time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache read failed: {str(e)}")
+            self._count('errors')
+            return MISSING
+
+        if row is None:
+            self._count('misses')
+            return MISSING
+        self._count('hits')
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl):
+        """
+        Store a JSON-serializable value for ttl seconds
+
+        Args:
+            namespace (str): Logical cache name
+            key: JSON-serializable key
+            value: JSON-serializable value; None is stored as a negative entry
+            ttl (float): Time to live in seconds
+        """
+        try:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                (namespace, self._encode_key(key), json.dumps(value), time.time() + ttl)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache write failed: {str(e)}")
+            self._count('errors')
+            return
+
+        with self._lock:
+            self._writes += 1
+            should_trim = self._writes % self.trim_interval == 0
+        if should_trim:
+            self.trim()
+
+    def delete(self, namespace, key):
+        """Remove a single entry"""
+        try:
+            self._connection().execute(
+                'DELETE FROM cache_entries WHERE namespace = ? AND key = ?',
+                (namespace, self._encode_key(key))
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache delete failed: {str(e)}")
+            self._count('errors')
+
+    def delete_matching(self, namespace, field, value):
+        """
+        Remove the entries of a namespace whose JSON object value has field == value
+
+        Args:
+            namespace (str): Logical cache name
+            field (str): Top-level key of the stored objects
+            value: Scalar to match
+        """
+        try:
+            self._connection().execute(
+                'DELETE FROM cache_entries WHERE namespace = ? AND json_extract(value, ?) = ?',
+                (namespace, f'$.{field}', value)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache delete failed: {str(e)}")
+            self._count('errors')
+
+    def clear(self, namespace=None):
+        """Remove all entries, or only those of one namespace"""
+        try:
+            if namespace is None:
+                self._connection().execute('DELETE FROM cache_entries')
+            else:
+                self._connection().execute('DELETE FROM cache_entries WHERE namespace = ?', (namespace,))
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache clear failed: {str(e)}")
+            self._count('errors')
+
+    def trim(self):
+        """Drop expired entries, then the soonest-expiring ones above max_entries"""
+        try:
+            conn = self._connection()
+            removed = conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (time.time(),)).rowcount
+            overflow = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0] - self.max_entries
+            if overflow > 0:
+                removed += conn.execute(
+                    'DELETE FROM cache_entries WHERE rowid IN '
+                    '(SELECT rowid FROM cache_entries ORDER BY expires_at LIMIT ?)',
+                    (overflow,)
+                ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache trim failed: {str(e)}")
+            self._count('errors')
+            return
+        self._count('evictions', removed)
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            dict: Hit/miss/eviction/error counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['path'] = self.path
+        stats['max_entries'] = self.max_entries
+        return stats
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Indexed local bike catalog for Reebike Compatibility API
+Version 1.0
+
+Indexes are built once when the catalog is loaded so lookups never scan
+the full bike list.
+"""
+
+import logging
+from bisect import bisect_left
+from collections import defaultdict
+
+import columnar
+from matching import FuzzyMatcher
+
+logger = logging.getLogger(__name__)
+
+def tokenize_model(model):
+    """
+    Split a lowercased model name into whitespace-separated tokens
+
+    Args:
+        model (str): Model name
+
+    Returns:
+        list: Lowercased tokens
+    """
+    return model.lower().split()
+
+def normalize_search_key(name):
+    """
+    Normalize a name for prefix search (lowercase, single spaces)
+
+    Unlike utils.normalize_bike_name the year is kept, so typing
+    "domane sl 20" still narrows down to "Domane SL 2023".
+
+    Args:
+        name (str): Brand or model name
+
+    Returns:
+        str: Search key
+    """
+    return ' '.join(name.lower().split())
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index
+
+    Keys are kept in one sorted list; a prefix query is two binary searches
+    plus a slice, so it costs O(log n + limit) whatever the catalog size.
+    """
+
+    def __init__(self, entries):
+        pairs = sorted(entries, key=lambda pair: pair[0])
+        self._keys = [key for key, _ in pairs]
+        self._values = [value for _, value in pairs]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, prefix, limit=10):
+        """
+        Get distinct values whose key starts with prefix, in key order
+
+        Args:
+            prefix (str): Normalized prefix
+            limit (int): Maximum number of values
+
+        Returns:
+            list: Matching values
+        """
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + '\uffff', start)
+        results = []
+        seen = set()
+        for value in self._values[start:end]:
+            if value not in seen:
+                seen.add(value)
+                results.append(value)
+                if len(results) >= limit:
+                    break
+        return results
+
+class CatalogIndex:
+    """
+    Read-only lookup structures over the local bike list
+
+    - brand map: lowercased brand -> bike ids, in catalog order
+    - model token index: lowercased brand -> {model token: bike ids}
+    - per brand, a prefix index over every suffix of its model tokens, so
+      the tokens containing a string are found without scanning them
+    - sorted list of distinct brand names
+    - prefix indexes over brand names and, per brand, over every word
+      start of the model names (for autocomplete)
+    - columnar NumPy specs for catalog-wide evaluation (None without NumPy)
+
+    Lookups keep the original matching rule (same brand, query model is a
+    substring of the catalog model, first catalog entry wins). In any such
+    match a query token between two others is a whole model token, and
+    every query token lies inside one of the bike's model tokens, so
+    candidates come from exact token postings or from the brand's tokens
+    containing the longest query token; only those candidates get the
+    full substring test.
+    """
+
+    def __init__(self, bikes, fuzzy_threshold=0.7):
+        self.bikes = list(bikes)
+        brand_bikes = defaultdict(list)
+        brand_tokens = defaultdict(lambda: defaultdict(list))
+
+        for bike_id, bike in enumerate(self.bikes):
+            brand_lower = bike.get('brand', '').lower()
+            brand_bikes[brand_lower].append(bike_id)
+            for token in set(tokenize_model(bike.get('model', ''))):
+                brand_tokens[brand_lower][token].append(bike_id)
+
+        self._brand_bikes = {brand: tuple(ids) for brand, ids in brand_bikes.items()}
+        self._brand_tokens = {
+            brand: {token: tuple(ids) for token, ids in tokens.items()}
+            for brand, tokens in brand_tokens.items()
+        }
+        # A token contains a string when one of its suffixes starts with it
+        self._token_suffixes = {
+            brand: PrefixIndex((token[start:], token) for token in tokens for start in range(len(token)))
+            for brand, tokens in self._brand_tokens.items()
+        }
+        self.brands = sorted(set(bike.get('brand') for bike in self.bikes if bike.get('brand')))
+        self.matcher = FuzzyMatcher(self.bikes, threshold=fuzzy_threshold)
+        self._brand_prefix = PrefixIndex((normalize_search_key(brand), brand) for brand in self.brands)
+        self._model_prefix = {}
+        self._word_prefix = {}
+        for brand, bike_ids in self._brand_bikes.items():
+            keys = [(normalize_search_key(self.bikes[bike_id].get('model', '')), bike_id) for bike_id in bike_ids]
+            self._model_prefix[brand] = PrefixIndex(keys)
+            self._word_prefix[brand] = PrefixIndex(
+                (key[position + 1:], bike_id)
+                for key, bike_id in keys
+                for position, char in enumerate(key) if char == ' '
+            )
+        self.columns = columnar.ColumnarSpecs(self.bikes) if columnar.available() else None
+        logger.info(f"Catalog indexed: {len(self.bikes)} bikes, {len(self.brands)} brands")
+
+    def state(self):
+        """
+        Get the lookup structures (everything but the bikes) for a snapshot
+
+        Returns:
+            dict: Picklable index structures
+        """
+        return {
+            'brand_bikes': self._brand_bikes,
+            'brand_tokens': self._brand_tokens,
+            'token_suffixes': self._token_suffixes,
+            'brands': self.brands,
+            'brand_prefix': self._brand_prefix,
+            'model_prefix': self._model_prefix,
+            'word_prefix': self._word_prefix,
+            'matcher': self.matcher.state()
+        }
+
+    @classmethod
+    def from_state(cls, bikes, state, columns=None, fuzzy_threshold=0.7):
+        """
+        Rebuild a catalog index from state() output without re-indexing
+
+        Args:
+            bikes (sequence): Same bikes, in the same order, as when indexed
+            state (dict): Output of state()
+            columns (ColumnarSpecs): Prebuilt columnar specs, if any
+            fuzzy_threshold (float): Fuzzy match acceptance threshold
+
+        Returns:
+            CatalogIndex: Index
+        """
+        index = cls.__new__(cls)
+        index.bikes = bikes
+        index._brand_bikes = state['brand_bikes']
+        index._brand_tokens = state['brand_tokens']
+        index._token_suffixes = state['token_suffixes']
+        index.brands = state['brands']
+        index._brand_prefix = state['brand_prefix']
+        index._model_prefix = state['model_prefix']
+        index._word_prefix = state['word_prefix']
+        index.matcher = FuzzyMatcher.from_state(bikes, state['matcher'], threshold=fuzzy_threshold)
+        index.columns = columns
+        return index
+
+    def __len__(self):
+        return len(self.bikes)
+
+    def has_brand(self, brand):
+        """
+        Check whether any bike of this brand exists (case-insensitive)
+
+        Args:
+            brand (str): Brand name
+
+        Returns:
+            bool: True if the brand is known
+        """
+        return brand.lower() in self._brand_bikes
+
+    def brand_bikes(self, brand):
+        """
+        Get all bikes of a brand in catalog order
+
+        Args:
+            brand (str): Brand name (case-insensitive)
+
+        Returns:
+            list: Bike records
+        """
+        return [self.bikes[bike_id] for bike_id in self._brand_bikes.get(brand.lower(), ())]
+
+    def _candidates(self, brand_lower, tokens):
+        """Bike ids of this brand that may contain the query tokens, in catalog order"""
+        vocabulary = self._brand_tokens.get(brand_lower)
+        if not vocabulary:
+            return []
+
+        if len(tokens) > 2:
+            # Inner tokens match whole model tokens: exact postings of the rarest one
+            return min((vocabulary.get(token, ()) for token in tokens[1:-1]), key=len)
+
+        query_token = max(tokens, key=len)
+        suffixes = self._token_suffixes[brand_lower]
+        ids = set()
+        for token in suffixes.search(query_token, limit=len(suffixes)):
+            ids.update(vocabulary[token])
+        return sorted(ids)
+
+    def find(self, brand, model):
+        """
+        Find the first bike matching brand and model
+
+        Args:
+            brand (str): Brand name (case-insensitive, surrounding spaces ignored)
+            model (str): Model name or part of it (case-insensitive)
+
+        Returns:
+            dict: Bike record or None
+        """
+        brand_lower = brand.lower().strip()
+        model_lower = model.lower().strip()
+
+        tokens = model_lower.split()
+        if not tokens:
+            bike_ids = self._brand_bikes.get(brand_lower, ())
+            return self.bikes[bike_ids[0]] if bike_ids else None
+
+        for bike_id in self._candidates(brand_lower, tokens):
+            bike = self.bikes[bike_id]
+            if model_lower in bike.get('model', '').lower():
+                return bike
+        return None
+
+    def find_fuzzy(self, brand, model):
+        """
+        Find the best fuzzy match for a model the exact lookup missed
+
+        Args:
+            brand (str): Brand name (case-insensitive)
+            model (str): Model name as typed by the user
+
+        Returns:
+            tuple: (bike or None, confidence score)
+        """
+        return self.matcher.match(brand, model)
+
+    def suggest_brands(self, prefix, limit=10):
+        """
+        Autocomplete brand names
+
+        Args:
+            prefix (str): Typed prefix (case-insensitive)
+            limit (int): Maximum number of suggestions
+
+        Returns:
+            list: Brand names in alphabetical order
+        """
+        return self._brand_prefix.search(normalize_search_key(prefix), limit)
+
+    def suggest_models(self, brand, prefix, limit=10):
+        """
+        Autocomplete model names of a brand
+
+        Models whose name starts with the prefix come first, then models
+        with a later word starting with it ("sl" -> "Domane SL 2023").
+
+        Args:
+            brand (str): Brand name (case-insensitive)
+            prefix (str): Typed prefix (case-insensitive)
+            limit (int): Maximum number of suggestions
+
+        Returns:
+            list: Bike records
+        """
+        index = self._model_prefix.get(brand.lower().strip())
+        if index is None:
+            return []
+
+        key = normalize_search_key(prefix)
+        bike_ids = index.search(key, limit)
+        if len(bike_ids) < limit:
+            for bike_id in self._word_prefix[brand.lower().strip()].search(key, limit):
+                if bike_id not in bike_ids:
+                    bike_ids.append(bike_id)
+                    if len(bike_ids) >= limit:
+                        break
+        return [self.bikes[bike_id] for bike_id in bike_ids]
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Columnar (NumPy) compatibility evaluation over the whole catalog
+Version 1.0
+
+NumPy is optional: without it `available()` is False and callers fall back
+to the per-bike CompatibilityAnalyzer path.
+"""
+
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+logger = logging.getLogger(__name__)
+
+def available():
+    """Check whether NumPy is installed"""
+    return np is not None
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+class ColumnarSpecs:
+    """
+    Struct-of-arrays view of catalog specs with explicit missing masks
+
+    Columns are built on first use and kept:
+    - numeric: float64 values plus `valid` (is a number) and `missing`
+      (None/absent) masks; NaN marks anything that is not a number
+    - categorical: int32 codes into a list of distinct values (-1 missing)
+
+    Comparisons mirror the per-bike rules exactly for well-formed data;
+    malformed (non-numeric) measurements never qualify.
+    """
+
+    def __init__(self, bikes):
+        if np is None:
+            raise RuntimeError("NumPy is required for columnar evaluation")
+        self._bikes = bikes
+        self.size = len(bikes)
+        self._numeric = {}
+        self._categorical = {}
+
+    @classmethod
+    def from_columns(cls, size, numeric=None, categorical=None, bikes=None):
+        """
+        Build columnar specs from prebuilt columns (e.g. views on a snapshot)
+
+        Columns not provided are still built from `bikes` on first use.
+
+        Args:
+            size (int): Number of bikes
+            numeric (dict): Field -> (values, valid, missing)
+            categorical (dict): Field -> (codes, categories)
+            bikes (sequence): Bikes for any other field
+
+        Returns:
+            ColumnarSpecs: Columnar specs
+        """
+        columns = cls(bikes if bikes is not None else [])
+        columns.size = size
+        columns._numeric.update(numeric or {})
+        columns._categorical.update(categorical or {})
+        return columns
+
+    def numeric(self, field):
+        """
+        Get a numeric column
+
+        Args:
+            field (str): Spec field name
+
+        Returns:
+            tuple: (float64 values, valid mask, missing mask)
+        """
+        column = self._numeric.get(field)
+        if column is None:
+            raw = [bike.get(field) for bike in self._bikes]
+            missing = np.fromiter((value is None for value in raw), dtype=bool, count=self.size)
+            valid = np.fromiter((_is_number(value) for value in raw), dtype=bool, count=self.size)
+            values = np.fromiter(
+                (float(value) if _is_number(value) else np.nan for value in raw),
+                dtype=np.float64, count=self.size
+            )
+            column = self._numeric[field] = (values, valid, missing)
+        return column
+
+    def categorical(self, field):
+        """
+        Get a categorical column
+
+        Args:
+            field (str): Spec field name
+
+        Returns:
+            tuple: (int32 codes, list of distinct string values)
+        """
+        column = self._categorical.get(field)
+        if column is None:
+            categories = []
+            category_codes = {}
+            codes = np.full(self.size, -1, dtype=np.int32)
+            for row, bike in enumerate(self._bikes):
+                value = bike.get(field)
+                if isinstance(value, str):
+                    if value not in category_codes:
+                        category_codes[value] = len(categories)
+                        categories.append(value)
+                    codes[row] = category_codes[value]
+            column = self._categorical[field] = (codes, categories)
+        return column
+
+    def all_rows(self):
+        return np.ones(self.size, dtype=bool)
+
+    def missing(self, field):
+        """Mask of bikes without a value for field"""
+        return self.numeric(field)[2]
+
+    def equals(self, field, value):
+        """Mask of bikes whose field equals value"""
+        if isinstance(value, str):
+            codes, categories = self.categorical(field)
+            if value not in categories:
+                return np.zeros(self.size, dtype=bool)
+            return codes == categories.index(value)
+        values, valid, _ = self.numeric(field)
+        return valid & (values == value)
+
+    def at_least(self, field, threshold):
+        """Mask of bikes whose field is a number >= threshold (NaN compares False)"""
+        return self.numeric(field)[0] >= threshold
+
+    def at_most(self, field, threshold):
+        """Mask of bikes whose field is a number <= threshold (NaN compares False)"""
+        return self.numeric(field)[0] <= threshold
+
+    def missing_data_mask(self, required_fields, any_of_fields):
+        """
+        Bikes that CompatibilityAnalyzer reports as having missing data
+
+        Args:
+            required_fields (iterable): Fields that must all be present
+            any_of_fields (iterable): Fields of which at least one must be present
+
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        mask = np.zeros(self.size, dtype=bool)
+        for field in required_fields:
+            mask |= self.missing(field)
+        none_present = self.all_rows()
+        for field in any_of_fields:
+            none_present &= self.missing(field)
+        return mask | none_present
+
+    def kit_eligibility(self, rules):
+        """
+        Compute kit eligibility for every bike in one vectorized pass
+
+        Args:
+            rules (RuleSet): Compiled kit rules
+
+        Returns:
+            dict: Kit name -> boolean array
+        """
+        return rules.masks(self)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Compilation du catalogue JSON en snapshot binaire pour l'API Reebike
+Construit le catalogue, ses index et les résultats précalculés une fois,
+hors ligne ; les workers n'ont plus qu'à mapper le fichier au démarrage.
+
+Usage : python compile_catalog.py [catalogue.json] [sortie.snapshot]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# init_app() is not called: no logging threads, catalog watcher or upstream calls for a build
+from app import CompatibilityAnalyzer, catalog_path, read_catalog, snapshot_path
+from ingest import IngestError
+from snapshot import CatalogSnapshot, write_snapshot
+
+def main():
+    """Compile le catalogue et vérifie le snapshot produit"""
+    parser = argparse.ArgumentParser(description="Compile le catalogue JSON en snapshot binaire")
+    parser.add_argument('source', nargs='?', default=catalog_path(), help="catalogue JSON (MOCK_DATA_FILE par défaut)")
+    parser.add_argument('output', nargs='?', default=snapshot_path(), help="snapshot (CATALOG_SNAPSHOT_FILE par défaut)")
+    args = parser.parse_args()
+    
+    if not args.output:
+        parser.error("aucun fichier de sortie (CATALOG_SNAPSHOT_FILE est vide)")
+    if not os.path.exists(args.source):
+        print(f"❌ Catalogue introuvable : {args.source}")
+        sys.exit(1)
+    
+    started = time.perf_counter()
+    try:
+        # Not load_mock_data(): a broken catalog must not compile to an empty snapshot
+        data = read_catalog(args.source)
+    except IngestError as e:
+        print(f"❌ Catalogue invalide : {args.source} ({str(e)})")
+        sys.exit(1)
+    analyzer = CompatibilityAnalyzer(data)
+    write_snapshot(args.output, analyzer.catalog, analyzer.results, data, source_path=args.source)
+    
+    snapshot = CatalogSnapshot(args.output)
+    print(f"✅ Snapshot écrit : {args.output}")
+    print(f"   {snapshot.count} vélos, {snapshot.results_count} résultats précalculés, "
+          f"{os.path.getsize(args.output)} octets en {time.perf_counter() - started:.2f} s")
+
+if __name__ == '__main__':
+    main()
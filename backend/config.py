@@ -6,6 +6,10 @@ Version 1.0
 
 import os
 from datetime import timedelta
+from dotenv import load_dotenv
+
+# Load .env before the class attributes below read the environment
+load_dotenv()
 
 class Config:
     """Base configuration class"""
@@ -21,40 +25,123 @@ class Config:
     # CORS settings
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
     
-    # Rate limiting (requests per minute)
+    # Rate limiting (requests per minute, per client; see rate_limit.py)
     RATE_LIMIT = int(os.environ.get('RATE_LIMIT', '60'))
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', '0'))  # 0 = RATE_LIMIT
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '100000'))
+    RATE_LIMIT_SHARDS = int(os.environ.get('RATE_LIMIT_SHARDS', '16'))
+    RATE_LIMIT_FILE = os.environ.get('RATE_LIMIT_FILE')  # SQLite file shared by workers (relative to the backend directory); in-process when unset
     
     # Cache settings
     CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', '300'))  # 5 minutes
+    CACHE_NEGATIVE_TIMEOUT = int(os.environ.get('CACHE_NEGATIVE_TIMEOUT', '60'))  # misses and errors
+    CACHE_STALE_TIMEOUT = int(os.environ.get('CACHE_STALE_TIMEOUT', '600'))  # serve stale while refreshing
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', '2048'))
+    
+    # Shared on-disk cache (SQLite, WAL mode), relative to the backend directory; disabled when no file is set
+    PERSISTENT_CACHE_FILE = os.environ.get('PERSISTENT_CACHE_FILE')
+    PERSISTENT_CACHE_MAX_ENTRIES = int(os.environ.get('PERSISTENT_CACHE_MAX_ENTRIES', '100000'))
     
-    # Logging
+    # Logging (see logging_setup.py); LOG_FILE is relative to the backend directory, empty = console only
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FILE = os.environ.get('LOG_FILE', 'logs/app.log')
+    LOG_FILE_MAX_BYTES = int(os.environ.get('LOG_FILE_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_FILE_BACKUPS = int(os.environ.get('LOG_FILE_BACKUPS', '5'))
+    LOG_ASYNC = os.environ.get('LOG_ASYNC', 'True').lower() == 'true'  # queue + background writer
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))  # records dropped beyond
+    # Fraction of hot-path INFO records kept, per message type (warnings and errors are always kept)
+    LOG_SAMPLE_RATES = {
+        'compat': float(os.environ.get('LOG_SAMPLE_COMPAT', '1')),  # successful compat requests
+        'lookup': float(os.environ.get('LOG_SAMPLE_LOOKUP', '1'))   # bike resolution details
+    }
     
     # Database
     MOCK_DATA_FILE = os.environ.get('MOCK_DATA_FILE', 'mock_bikes.json')
+    CATALOG_SNAPSHOT_FILE = os.environ.get('CATALOG_SNAPSHOT_FILE', 'catalog.snapshot')  # see compile_catalog.py
+    CATALOG_RELOAD_INTERVAL = float(os.environ.get('CATALOG_RELOAD_INTERVAL', '5'))  # seconds, 0 = no polling
+    # Also reload on SIGHUP; off by default, as gunicorn's master uses SIGHUP for its own reloads
+    CATALOG_RELOAD_ON_SIGHUP = os.environ.get('CATALOG_RELOAD_ON_SIGHUP', 'False').lower() == 'true'
+    INGEST_CHUNK_SIZE = int(os.environ.get('INGEST_CHUNK_SIZE', '10000'))  # records parsed per chunk
     
     # External APIs
     GEOMETRY_GEEKS_BASE_URL = 'https://api.geometrygeeks.bike/v1'
     GEOMETRY_GEEKS_TIMEOUT = int(os.environ.get('GEOMETRY_GEEKS_TIMEOUT', '5'))
     ENABLE_GEOMETRY_GEEKS = os.environ.get('ENABLE_GEOMETRY_GEEKS', 'True').lower() == 'true'
     
+    # Minimum score (0-1) for accepting a fuzzy model match from the local catalog
+    FUZZY_MATCH_THRESHOLD = float(os.environ.get('FUZZY_MATCH_THRESHOLD', '0.7'))
+    
+    # Per-request budget for resolving a bike (local + GeometryGeeks)
+    RESOLVE_DEADLINE_MS = int(os.environ.get('RESOLVE_DEADLINE_MS', '1000'))
+    
+    # HTTP caching of GET responses (browsers and CDN), in seconds
+    COMPAT_CACHE_MAX_AGE = int(os.environ.get('COMPAT_CACHE_MAX_AGE', '3600'))
+    COMPAT_UNKNOWN_CACHE_MAX_AGE = int(os.environ.get('COMPAT_UNKNOWN_CACHE_MAX_AGE', '300'))
+    BRANDS_CACHE_MAX_AGE = int(os.environ.get('BRANDS_CACHE_MAX_AGE', '3600'))
+    CACHE_STALE_WHILE_REVALIDATE = int(os.environ.get('CACHE_STALE_WHILE_REVALIDATE', '86400'))
+    RESPONSE_COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', '512'))  # smaller bodies sent as is
+    
+    # GeometryGeeks cache warmup from recorded traffic (see warmup.py)
+    WARMUP_TOP_KEYS = int(os.environ.get('WARMUP_TOP_KEYS', '200'))  # 0 = disabled
+    WARMUP_RATE = float(os.environ.get('WARMUP_RATE', '2'))  # upstream lookups per second
+    WARMUP_INTERVAL = float(os.environ.get('WARMUP_INTERVAL', '900'))  # seconds between runs
+    WARMUP_MAX_KEYS = int(os.environ.get('WARMUP_MAX_KEYS', '10000'))
+    # Traffic counts kept across restarts and merged by workers, relative to the backend directory; empty (default) = in memory
+    WARMUP_FILE = os.environ.get('WARMUP_FILE', '')
+    
+    # Batch compatibility endpoint
+    BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', '5000'))
+    BATCH_UPSTREAM_CONCURRENCY = int(os.environ.get('BATCH_UPSTREAM_CONCURRENCY', '4'))
+    BATCH_DEADLINE_MS = int(os.environ.get('BATCH_DEADLINE_MS', '20000'))  # pending items then answer unknown
+    
+    # Upstream HTTP client (keep-alive pool, bulkhead and retry budget)
+    UPSTREAM_POOL_SIZE = int(os.environ.get('UPSTREAM_POOL_SIZE', '10'))
+    UPSTREAM_MAX_CONCURRENT = int(os.environ.get('UPSTREAM_MAX_CONCURRENT', '8'))
+    UPSTREAM_QUEUE_TIMEOUT = float(os.environ.get('UPSTREAM_QUEUE_TIMEOUT', '0.1'))  # seconds
+    UPSTREAM_MAX_RETRIES = int(os.environ.get('UPSTREAM_MAX_RETRIES', '2'))
+    UPSTREAM_RETRY_BUDGET_RATIO = float(os.environ.get('UPSTREAM_RETRY_BUDGET_RATIO', '0.1'))
+    
+    # asyncio upstream client (ASGI endpoints, see asgi.py)
+    ASYNC_UPSTREAM_POOL_SIZE = int(os.environ.get('ASYNC_UPSTREAM_POOL_SIZE', '100'))
+    ASYNC_UPSTREAM_MAX_CONCURRENT = int(os.environ.get('ASYNC_UPSTREAM_MAX_CONCURRENT', '1000'))
+    ASYNC_BATCH_UPSTREAM_CONCURRENCY = int(os.environ.get('ASYNC_BATCH_UPSTREAM_CONCURRENCY', '100'))
+    
+    # Circuit breaker (switches lookups to local data only)
+    BREAKER_WINDOW = int(os.environ.get('BREAKER_WINDOW', '20'))
+    BREAKER_MIN_CALLS = int(os.environ.get('BREAKER_MIN_CALLS', '5'))
+    BREAKER_FAILURE_THRESHOLD = float(os.environ.get('BREAKER_FAILURE_THRESHOLD', '0.5'))
+    BREAKER_LATENCY_THRESHOLD = float(os.environ.get('BREAKER_LATENCY_THRESHOLD', '2.0'))  # seconds
+    BREAKER_COOLDOWN = int(os.environ.get('BREAKER_COOLDOWN', '30'))  # seconds
+    
     # Shopify integration
     SHOPIFY_WEBHOOK_SECRET = os.environ.get('SHOPIFY_WEBHOOK_SECRET')
     
     # Analytics
     ENABLE_ANALYTICS = os.environ.get('ENABLE_ANALYTICS', 'False').lower() == 'true'
-    ANALYTICS_ENDPOINT = os.environ.get('ANALYTICS_ENDPOINT')
+    ANALYTICS_ENDPOINT = os.environ.get('ANALYTICS_ENDPOINT')  # collector receiving POSTed JSON batches
+    ANALYTICS_FILE = os.environ.get('ANALYTICS_FILE', 'logs/analytics.jsonl')  # empty = no local file
+    ANALYTICS_FILE_MAX_BYTES = int(os.environ.get('ANALYTICS_FILE_MAX_BYTES', str(10 * 1024 * 1024)))
+    ANALYTICS_FILE_BACKUPS = int(os.environ.get('ANALYTICS_FILE_BACKUPS', '5'))
+    ANALYTICS_QUEUE_SIZE = int(os.environ.get('ANALYTICS_QUEUE_SIZE', '10000'))  # events dropped beyond
+    ANALYTICS_BATCH_SIZE = int(os.environ.get('ANALYTICS_BATCH_SIZE', '500'))
+    ANALYTICS_FLUSH_INTERVAL = float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', '5'))  # seconds
+    ANALYTICS_TIMEOUT = int(os.environ.get('ANALYTICS_TIMEOUT', '5'))
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
-    LOG_LEVEL = 'DEBUG'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG')
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'False').lower() == 'true'
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
-    LOG_LEVEL = 'WARNING'
+    # INFO stays on: the hot-path records are sampled instead of dropped
+    LOG_SAMPLE_RATES = {
+        'compat': float(os.environ.get('LOG_SAMPLE_COMPAT', '0.01')),
+        'lookup': float(os.environ.get('LOG_SAMPLE_LOOKUP', '0.01'))
+    }
     
     # Security headers
     SECURE_HEADERS = True
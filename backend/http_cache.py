@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+HTTP caching helpers for Reebike Compatibility API
+Version 1.0
+
+Strong ETags are a hash of the exact response body: the same catalog
+version and normalized query always produce the same bytes (and so the
+same tag on every worker), and the tag also changes whenever the body
+does. That holds for GeometryGeeks answers too, which do not depend on
+the catalog version. Cache-Control lets browsers and the CDN reuse
+answers, with a shorter lifetime for `unknown` results. Bodies above a
+size threshold are compressed (gzip, or brotli when installed) according
+to Accept-Encoding; each coding gets its own tag.
+"""
+
+import gzip
+import hashlib
+
+from werkzeug.http import parse_accept_header, parse_etags
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Content codings we can produce, in order of preference
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def body_etag(body):
+    """
+    Get the strong ETag of a response body
+
+    Args:
+        body (bytes): Response body
+
+    Returns:
+        str: Unquoted tag
+    """
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def etag_matches(if_none_match, etag):
+    """
+    Check an If-None-Match header against a tag (weak comparison, RFC 9110)
+
+    Args:
+        if_none_match (str): Header value, may be empty
+        etag (str): Unquoted tag of the current representation
+
+    Returns:
+        bool: True if a 304 should be sent
+    """
+    if not if_none_match:
+        return False
+    return parse_etags(if_none_match).contains_weak(etag)
+
+def negotiate_encoding(accept_encoding, size, min_size=512):
+    """
+    Pick the content coding of a response from Accept-Encoding
+
+    Args:
+        accept_encoding (str): Request header value, may be empty
+        size (int): Uncompressed body size
+        min_size (int): Smaller bodies are sent as is
+
+    Returns:
+        str: 'br' or 'gzip', or None for identity
+    """
+    if not accept_encoding or size < min_size:
+        return None
+    accepted = parse_accept_header(accept_encoding)
+    for encoding in ENCODINGS:
+        if accepted.quality(encoding) > 0:
+            return encoding
+    return None
+
+def compress_body(body, encoding):
+    """
+    Compress a body with a content coding from ENCODINGS
+
+    Args:
+        body (bytes): Uncompressed body
+        encoding (str): 'br' or 'gzip'
+
+    Returns:
+        bytes: Encoded body
+    """
+    if encoding == 'br':
+        return brotli.compress(body)
+    # Fixed mtime: the same body always gives the same bytes
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+def cache_control(max_age, stale_while_revalidate=0):
+    """
+    Build a public Cache-Control value
+
+    Args:
+        max_age (int): Freshness lifetime in seconds, 0 to always revalidate
+        stale_while_revalidate (int): Extra seconds a stale copy may be served
+
+    Returns:
+        str: Header value
+    """
+    if max_age <= 0:
+        return 'no-cache'
+    value = f'public, max-age={max_age}'
+    if stale_while_revalidate > 0:
+        value += f', stale-while-revalidate={stale_while_revalidate}'
+    return value
+
+class CachePolicy:
+    """Cache-Control values per endpoint and compatibility status"""
+
+    def __init__(self, compat_max_age=3600, unknown_max_age=300, brands_max_age=3600,
+                 stale_while_revalidate=86400):
+        self._compat = cache_control(compat_max_age, stale_while_revalidate)
+        # Unknown answers may become conclusive soon (new data, upstream back)
+        self._unknown = cache_control(unknown_max_age, min(stale_while_revalidate, unknown_max_age))
+        self._brands = cache_control(brands_max_age, stale_while_revalidate)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build the policy from the app configuration
+
+        Args:
+            config: Config object (COMPAT_/BRANDS_ cache settings)
+
+        Returns:
+            CachePolicy: Policy
+        """
+        return cls(
+            compat_max_age=config.COMPAT_CACHE_MAX_AGE,
+            unknown_max_age=config.COMPAT_UNKNOWN_CACHE_MAX_AGE,
+            brands_max_age=config.BRANDS_CACHE_MAX_AGE,
+            stale_while_revalidate=config.CACHE_STALE_WHILE_REVALIDATE
+        )
+
+    def compat(self, status):
+        """Cache-Control of a /api/compat answer with the given status"""
+        return self._unknown if status == 'unknown' else self._compat
+
+    def brands(self):
+        """Cache-Control of /api/brands"""
+        return self._brands
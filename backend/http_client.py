@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Resilient HTTP client for upstream APIs (GeometryGeeks)
+Version 1.0
+
+Pooled keep-alive session guarded by a concurrency bulkhead, jittered
+retries drawn from a global retry budget, and a circuit breaker.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+class UpstreamUnavailable(requests.exceptions.RequestException):
+    """Raised when a call is refused locally (open breaker or full bulkhead)"""
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a rolling window of upstream call outcomes
+
+    The breaker opens when, over the last `window` calls (and at least
+    `min_calls`), the share of failed or slow calls reaches
+    `failure_threshold`. After `cooldown` seconds it lets a single probe
+    through (half-open); the probe's outcome closes or re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, window=20, min_calls=5, failure_threshold=0.5,
+                 latency_threshold=2.0, cooldown=30, clock=time.monotonic):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'rejected': 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """
+        Check whether a call may go upstream now
+
+        Returns:
+            bool: True if the call is allowed
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats['rejected'] += 1
+            return False
+
+    def record(self, success, latency):
+        """
+        Record the outcome of an upstream call
+
+        Args:
+            success (bool): Whether the call succeeded
+            latency (float): Call duration in seconds
+        """
+        failed = not success or latency >= self.latency_threshold
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._trip()
+                else:
+                    logger.info("GeometryGeeks circuit breaker closed")
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append(failed)
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                failure_rate = sum(self._outcomes) / len(self._outcomes)
+                if failure_rate >= self.failure_threshold:
+                    self._trip()
+
+    def cancel_probe(self):
+        """Release a half-open probe slot that was granted but never used"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _trip(self):
+        """Open the breaker (caller holds the lock)"""
+        if self._state != self.OPEN:
+            logger.warning("GeometryGeeks circuit breaker opened, using local data only")
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self._stats['opened'] += 1
+
+    def stats(self):
+        """
+        Get breaker statistics
+
+        Returns:
+            dict: State, recent failure rate and counters
+        """
+        state = self.state
+        with self._lock:
+            outcomes = list(self._outcomes)
+            stats = dict(self._stats)
+        stats['state'] = state
+        stats['recent_calls'] = len(outcomes)
+        stats['recent_failure_rate'] = round(sum(outcomes) / len(outcomes), 3) if outcomes else 0.0
+        return stats
+
+class RetryBudget:
+    """
+    Global retry budget shared by all outbound calls
+
+    Every first attempt deposits `ratio` tokens (capped at `max_tokens`) and
+    every retry spends one, so retries stay a bounded fraction of traffic
+    and cannot amplify an upstream outage.
+    """
+
+    def __init__(self, ratio=0.1, max_tokens=10.0, initial_tokens=None):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens if initial_tokens is None else initial_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self):
+        """
+        Spend one token for a retry
+
+        Returns:
+            bool: True if the retry is allowed
+        """
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    @property
+    def tokens(self):
+        return self._tokens
+
+class RetryingClient:
+    """
+    Retry, breaker and budget accounting shared by the sync and async clients
+
+    Subclasses perform the attempts (blocking or awaited) and ask
+    _retry_delay() after each one whether and when to try again.
+    """
+
+    RETRY_STATUSES = (429, 502, 503, 504)
+    # Transport exception counted as a timeout when it ends the call
+    TIMEOUT_ERROR = requests.exceptions.Timeout
+
+    def __init__(self, base_url, timeout, pool_size, max_concurrent, queue_timeout,
+                 max_retries, backoff, retry_budget, breaker):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retry_budget = retry_budget or RetryBudget()
+        self.breaker = breaker or CircuitBreaker()
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {'requests': 0, 'retries': 0, 'errors': 0, 'timeouts': 0, 'bulkhead_rejected': 0,
+                       'budget_exhausted': 0}
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def available(self):
+        """Check whether the upstream is usable (breaker not open)"""
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def _retry_delay(self, attempt, deadline, response, error, latency):
+        """
+        Record an attempt's outcome and decide whether to retry it
+
+        Args:
+            attempt (int): Number of retries already made
+            deadline (float): time.monotonic() deadline of the whole call
+            response: Response of the attempt, None on a transport error
+            error (Exception): Transport error of the attempt, or None
+            latency (float): Attempt duration in seconds
+
+        Returns:
+            float: Seconds to wait before retrying, or None to stop (the
+            caller then returns the response or raises the error)
+        """
+        retryable = error is not None or response.status_code in self.RETRY_STATUSES
+        self.breaker.record(not retryable, latency)
+        if not retryable:
+            return None
+
+        # Full jitter backoff, only if it fits in the remaining deadline
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        can_retry = (
+            attempt < self.max_retries
+            and self.breaker.state == CircuitBreaker.CLOSED
+            and time.monotonic() + delay < deadline
+        )
+        if can_retry and not self.retry_budget.withdraw():
+            self._count('budget_exhausted')
+            can_retry = False
+        if not can_retry:
+            if error is not None:
+                self._count('errors')
+                if isinstance(error, self.TIMEOUT_ERROR):
+                    self._count('timeouts')
+            return None
+
+        self._count('retries')
+        return delay
+
+    def stats(self):
+        """
+        Get client statistics for the health endpoint
+
+        Returns:
+            dict: Breaker state, bulkhead and retry counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = self._in_flight
+        stats['max_concurrent'] = self.max_concurrent
+        stats['retry_budget_tokens'] = round(self.retry_budget.tokens, 2)
+        stats['breaker'] = self.breaker.stats()
+        return stats
+
+class UpstreamClient(RetryingClient):
+    """Pooled keep-alive HTTP client with bulkhead, retries and circuit breaker"""
+
+    def __init__(self, base_url, timeout=5, pool_size=10, max_concurrent=8,
+                 queue_timeout=0.1, max_retries=2, backoff=0.1,
+                 retry_budget=None, breaker=None, headers=None):
+        super().__init__(base_url, timeout, pool_size, max_concurrent, queue_timeout,
+                         max_retries, backoff, retry_budget, breaker)
+
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        self._bulkhead = threading.BoundedSemaphore(max_concurrent)
+
+    def get(self, path, params=None):
+        """
+        Perform a GET request against the upstream
+
+        All attempts share a single deadline of `timeout` seconds, so retries
+        never extend the worst-case latency of a lookup.
+
+        Args:
+            path (str): Path relative to base_url
+            params (dict): Query parameters
+
+        Returns:
+            requests.Response: Final response
+
+        Raises:
+            UpstreamUnavailable: Breaker open or bulkhead full
+            requests.exceptions.RequestException: Transport error after retries
+        """
+        if not self.breaker.allow():
+            raise UpstreamUnavailable("Circuit breaker open")
+        if not self._bulkhead.acquire(timeout=self.queue_timeout):
+            self._count('bulkhead_rejected')
+            self.breaker.cancel_probe()
+            raise UpstreamUnavailable("Too many concurrent upstream calls")
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._get_with_retries(f"{self.base_url}{path}", params)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._bulkhead.release()
+
+    def _get_with_retries(self, url, params):
+        deadline = time.monotonic() + self.timeout
+        self.retry_budget.deposit()
+        attempt = 0
+
+        while True:
+            self._count('requests')
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, timeout=max(deadline - started, 0.001))
+                error = None
+            except requests.exceptions.RequestException as e:
+                response = None
+                error = e
+
+            delay = self._retry_delay(attempt, deadline, response, error, time.monotonic() - started)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            attempt += 1
+            time.sleep(delay)
+
+    def pool_stats(self):
+        """
+        Get connection pool statistics
+
+        Returns:
+            dict: Pool sizing plus connections opened and requests sent
+        """
+        pools = list(self._adapter.poolmanager.pools._container.values())
+        return {
+            'pool_size': self.pool_size,
+            'host_pools': len(pools),
+            'connections_opened': sum(getattr(pool, 'num_connections', 0) for pool in pools),
+            'requests_sent': sum(getattr(pool, 'num_requests', 0) for pool in pools),
+            'idle_connections': sum(pool.pool.qsize() for pool in pools if getattr(pool, 'pool', None))
+        }
+
+    def stats(self):
+        """
+        Get client statistics for the health endpoint
+
+        Returns:
+            dict: Breaker state, pool stats, bulkhead and retry counters
+        """
+        stats = super().stats()
+        stats['pool'] = self.pool_stats()
+        return stats
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Streaming catalog ingest for Reebike Compatibility API
+Version 1.0
+
+Catalogs are read incrementally instead of with json.load, in one of
+three shapes:
+- JSON Lines (.jsonl / .ndjson): one bike object per line; a line with a
+  `compatibility_matrix` key and no brand/model carries the document data
+- JSON array of bike objects
+- the mock_bikes.json document: {"bikes": [...], ...other keys}
+
+Each record is normalized and validated on its own and handed out in
+chunks of compact BikeRecords, so the parser never holds more than one
+chunk of raw dicts. Invalid records are counted and skipped; only a
+syntax error inside a JSON array/document stops the load, since the rest
+of it cannot be located reliably.
+"""
+
+import json
+import logging
+import math
+import time
+
+from records import BikeRecord
+
+logger = logging.getLogger(__name__)
+
+JSON_LINES_SUFFIXES = ('.jsonl', '.ndjson')
+NUMERIC_FIELDS = ('year', 'fork_spacing_mm', 'down_tube_length_mm', 'seat_tube_length_mm')
+REQUIRED_TEXT_FIELDS = ('brand', 'model')
+_NUMERIC_SET = frozenset(NUMERIC_FIELDS)
+READ_SIZE = 64 * 1024
+MAX_ERROR_SAMPLES = 20
+
+class IngestError(Exception):
+    """Raised when a catalog file cannot be parsed any further"""
+
+class InvalidRecord(ValueError):
+    """Raised by normalize_bike for a record that cannot be used"""
+
+class IngestReport:
+    """Progress and outcome of a catalog load"""
+
+    __slots__ = ('path', 'format', 'records', 'bad', 'errors', 'started', 'elapsed')
+
+    def __init__(self, path, format):
+        self.path = path
+        self.format = format
+        self.records = 0
+        self.bad = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def reject(self, position, reason):
+        """Count a bad record, keeping the first few reasons"""
+        self.bad += 1
+        if len(self.errors) < MAX_ERROR_SAMPLES:
+            self.errors.append({'position': position, 'reason': reason})
+
+    def as_dict(self):
+        """
+        Get the report as a JSON-serializable dict
+
+        Returns:
+            dict: Counts, sample errors and duration
+        """
+        return {
+            'path': self.path,
+            'format': self.format,
+            'records': self.records,
+            'bad_records': self.bad,
+            'errors': list(self.errors),
+            'elapsed_s': round(self.elapsed, 3)
+        }
+
+def _number(field, value):
+    """Coerce a measurement to int/float, accepting numeric strings"""
+    if isinstance(value, bool):
+        raise InvalidRecord(f"{field} is not a number: {value!r}")
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            value = int(text)
+        except ValueError:
+            try:
+                value = float(text)
+            except ValueError:
+                raise InvalidRecord(f"{field} is not a number: {value!r}")
+    if not isinstance(value, (int, float)) or (isinstance(value, float) and not math.isfinite(value)):
+        raise InvalidRecord(f"{field} is not a number: {value!r}")
+    return value
+
+def normalize_bike(raw):
+    """
+    Normalize and validate one catalog record
+
+    Text values are stripped (empty text counts as missing), measurements
+    are coerced to numbers and brand/model are required.
+
+    Args:
+        raw (dict): Record as parsed from the file
+
+    Returns:
+        BikeRecord: Normalized record
+
+    Raises:
+        InvalidRecord: If the record cannot be used
+    """
+    if not isinstance(raw, dict):
+        raise InvalidRecord(f"expected an object, got {type(raw).__name__}")
+
+    bike = {}
+    for field, value in raw.items():
+        kind = type(value)
+        if kind is str:
+            value = value.strip() or None
+        if value is not None and field in _NUMERIC_SET and kind is not int:
+            value = _number(field, value)
+        bike[field] = value
+
+    for field in REQUIRED_TEXT_FIELDS:
+        if not isinstance(bike.get(field), str):
+            raise InvalidRecord(f"missing {field}")
+    return BikeRecord(bike)
+
+class _StreamReader:
+    """Incremental JSON value reader over a text file"""
+
+    def __init__(self, f, read_size=None):
+        self._file = f
+        self._read_size = read_size or READ_SIZE
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Read more text, dropping what was consumed; False at end of file"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._read_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        """Consume one of the expected structural characters"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise IngestError(f"expected {' or '.join(repr(c) for c in chars)}, found {char or 'end of file'!r}")
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise IngestError(f"invalid JSON: {e.msg}")
+            # A value ending exactly at the buffer end may be a truncated number
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array(self):
+        """Yield the elements of the JSON array starting here"""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+def _iter_json(f, document):
+    """Yield raw bike values from a JSON array or catalog document"""
+    reader = _StreamReader(f)
+    first = reader.peek()
+    if first == '[':
+        yield from reader.array()
+    elif first == '{':
+        reader.expect('{')
+        while reader.peek() != '}':
+            key = reader.value()
+            reader.expect(':')
+            if key == 'bikes' and reader.peek() == '[':
+                yield from reader.array()
+            else:
+                document[key] = reader.value()
+            if reader.expect(',}') == '}':
+                break
+        else:
+            reader.expect('}')
+    else:
+        raise IngestError(f"expected a JSON array or object, found {first or 'end of file'!r}")
+
+def _iter_json_lines(f, document, report):
+    """Yield raw bike values from a JSON Lines file, skipping unparsable lines"""
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            report.reject(number, f"invalid JSON: {e.msg}")
+            continue
+        if isinstance(value, dict) and 'compatibility_matrix' in value and not any(k in value for k in REQUIRED_TEXT_FIELDS):
+            document.update(value)
+            continue
+        yield number, value
+
+def iter_chunks(path, chunk_size=10000, document=None, report=None, on_progress=None):
+    """
+    Stream a catalog file as chunks of normalized records
+
+    Args:
+        path (str): Catalog file (JSON Lines, JSON array or catalog document)
+        chunk_size (int): Records per chunk
+        document (dict): Filled with the non-bike keys of the catalog
+        report (IngestReport): Filled with counts and errors
+        on_progress (callable): Called with the report after each chunk
+
+    Yields:
+        list: Up to chunk_size BikeRecords
+
+    Raises:
+        IngestError: If the file structure is broken
+    """
+    document = {} if document is None else document
+    json_lines = path.lower().endswith(JSON_LINES_SUFFIXES)
+    report = report or IngestReport(path, 'jsonl' if json_lines else 'json')
+
+    with open(path, 'r', encoding='utf-8') as f:
+        if json_lines:
+            values = _iter_json_lines(f, document, report)
+        else:
+            values = enumerate(_iter_json(f, document))
+
+        chunk = []
+        for position, value in values:
+            try:
+                chunk.append(normalize_bike(value))
+            except InvalidRecord as e:
+                report.reject(position, str(e))
+                continue
+            if len(chunk) >= chunk_size:
+                report.records += len(chunk)
+                yield chunk
+                chunk = []
+                if on_progress is not None:
+                    on_progress(report)
+        if chunk:
+            report.records += len(chunk)
+            yield chunk
+    report.elapsed = time.perf_counter() - report.started
+    if on_progress is not None:
+        on_progress(report)
+
+def log_progress(report):
+    """Default progress callback: one log line per chunk"""
+    logger.info(f"Catalog ingest {report.path}: {report.records} records, {report.bad} rejected")
+
+def load_catalog(path, chunk_size=10000, on_progress=log_progress):
+    """
+    Load a whole catalog through the streaming reader
+
+    Args:
+        path (str): Catalog file
+        chunk_size (int): Records per chunk
+        on_progress (callable): Progress callback (see iter_chunks)
+
+    Returns:
+        tuple: (catalog document with `bikes` as BikeRecords, IngestReport)
+
+    Raises:
+        IngestError: If the file structure is broken
+    """
+    document = {}
+    json_lines = path.lower().endswith(JSON_LINES_SUFFIXES)
+    report = IngestReport(path, 'jsonl' if json_lines else 'json')
+    bikes = []
+    for chunk in iter_chunks(path, chunk_size, document, report, on_progress):
+        bikes.extend(chunk)
+    document['bikes'] = bikes
+    if report.bad:
+        logger.warning(f"Catalog {path}: {report.bad} invalid records skipped, e.g. {report.errors[:3]}")
+    return document, report
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Logging configuration for Reebike Compatibility API
+Version 1.0
+
+Applies Config.LOG_LEVEL and LOG_FILE. In async mode (LOG_ASYNC) request
+threads only put the LogRecord on a bounded queue; a QueueListener thread
+formats it and does the console/file I/O. Records are not formatted before
+being queued, so hot-path calls should use lazy %-style arguments. When
+the queue is full, records are dropped and counted instead of blocking.
+
+Hot-path messages go through a SampledLogger of one sample type (e.g.
+'compat') and only a LOG_SAMPLE_RATES fraction of them is kept; WARNING
+and above are never sampled out.
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import random
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the records of each sample type"""
+
+    def __init__(self, rates, random_fn=random.random):
+        """
+        Args:
+            rates (dict): Sample type -> fraction kept (0-1); other types are all kept
+            random_fn (callable): Source of uniform numbers in [0, 1)
+        """
+        super().__init__()
+        self.rates = dict(rates)
+        self.random_fn = random_fn
+        self.sampled_out = 0
+
+    def keep(self, sample_type):
+        """
+        Decide whether one INFO message of a type is logged
+
+        Args:
+            sample_type (str): Key of the rates
+
+        Returns:
+            bool: False if the message is sampled out
+        """
+        rate = self.rates.get(sample_type, 1.0)
+        if rate >= 1.0 or self.random_fn() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+    def filter(self, record):
+        # Records marked with extra={'sample_type': ...}; SampledLogger decides earlier
+        if record.levelno >= logging.WARNING:
+            return True
+        sample_type = getattr(record, 'sample_type', None)
+        return sample_type is None or self.keep(sample_type)
+
+# Sampling installed by configure_logging(); everything is kept until then
+_sampling = SamplingFilter({})
+
+# LoggingSetup of the last configure_logging() call, replaced by the next one
+_installed = None
+
+class SampledLogger:
+    """
+    Logger wrapper for hot-path INFO/DEBUG messages of one sample type
+
+    The sampling decision is taken before the LogRecord is even created,
+    so a sampled-out call costs a level check and a random draw.
+    Warnings and errors go to the wrapped logger unsampled.
+    """
+
+    __slots__ = ('logger', 'sample_type')
+
+    def __init__(self, logger, sample_type):
+        self.logger = logger
+        self.sample_type = sample_type
+
+    def info(self, msg, *args):
+        if self.logger.isEnabledFor(logging.INFO) and _sampling.keep(self.sample_type):
+            self.logger.info(msg, *args, stacklevel=2)
+
+    def debug(self, msg, *args):
+        if self.logger.isEnabledFor(logging.DEBUG) and _sampling.keep(self.sample_type):
+            self.logger.debug(msg, *args, stacklevel=2)
+
+    def warning(self, msg, *args, **kwargs):
+        self.logger.warning(msg, *args, stacklevel=2, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self.logger.error(msg, *args, stacklevel=2, **kwargs)
+
+def sampled_logger(logger, sample_type):
+    """
+    Wrap a logger so its INFO/DEBUG messages follow LOG_SAMPLE_RATES
+
+    Args:
+        logger (logging.Logger): Module logger
+        sample_type (str): Key of LOG_SAMPLE_RATES (e.g. 'compat', 'lookup')
+
+    Returns:
+        SampledLogger: Wrapper
+    """
+    return SampledLogger(logger, sample_type)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never formats nor blocks in the calling thread"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener thread formats; only tracebacks must be captured now
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LoggingSetup:
+    """Installed handlers, with the queue listener to stop at exit"""
+
+    def __init__(self, handlers, sampling, queue_handler=None, listener=None):
+        self.handlers = handlers
+        self.sampling = sampling
+        self.queue_handler = queue_handler
+        self.listener = listener
+
+    def stop(self):
+        """Write out queued records and stop the listener thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def remove(self):
+        """Detach the handlers from the root logger, stop the listener and close the files"""
+        root = logging.getLogger()
+        for handler in [self.queue_handler] if self.queue_handler is not None else self.handlers:
+            root.removeHandler(handler)
+        self.stop()
+        for handler in self.handlers:
+            handler.close()
+
+    def stats(self):
+        """
+        Get logging statistics
+
+        Returns:
+            dict: Mode, sampled out and dropped record counts
+        """
+        return {
+            'async': self.queue_handler is not None,
+            'sampled_out': self.sampling.sampled_out,
+            'dropped': self.queue_handler.dropped if self.queue_handler is not None else 0,
+            'queued': self.queue_handler.queue.qsize() if self.queue_handler is not None else 0
+        }
+
+def configure_logging(config, base_dir):
+    """
+    Configure the root logger from the app configuration
+
+    Calling it again replaces the handlers (and listener) it installed
+    before, so records are never written twice.
+
+    Args:
+        config: Config object (LOG_LEVEL, LOG_FILE, LOG_ASYNC, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES)
+        base_dir (str): Directory a relative LOG_FILE is resolved against
+
+    Returns:
+        LoggingSetup: Installed handlers
+    """
+    global _sampling, _installed
+    if _installed is not None:
+        _installed.remove()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if config.LOG_FILE:
+        path = os.path.join(base_dir, config.LOG_FILE)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            handlers.append(logging.handlers.RotatingFileHandler(
+                path, maxBytes=config.LOG_FILE_MAX_BYTES, backupCount=config.LOG_FILE_BACKUPS, encoding='utf-8'
+            ))
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Log file disabled: {str(e)}")
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    sampling = _sampling = SamplingFilter(config.LOG_SAMPLE_RATES)
+    root = logging.getLogger()
+    root.setLevel(config.LOG_LEVEL)
+
+    if not config.LOG_ASYNC:
+        for handler in handlers:
+            handler.addFilter(sampling)
+            root.addHandler(handler)
+        _installed = LoggingSetup(handlers, sampling)
+        return _installed
+
+    queue_handler = DroppingQueueHandler(queue.Queue(config.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(sampling)
+    root.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _installed = LoggingSetup(handlers, sampling, queue_handler, listener)
+    return _installed
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Fuzzy model matching for the local bike catalog
+Version 1.0
+"""
+
+import re
+from collections import defaultdict
+
+from utils import normalize_bike_name
+
+NON_ALNUM = re.compile(r'[^a-z0-9]')
+DIGIT_RUNS = re.compile(r'\d+')
+
+def compact_model(model):
+    """
+    Reduce a model name to lowercase alphanumerics
+
+    "Domane SL 5" and "Domane SL5" both become "domanesl5".
+
+    Args:
+        model (str): Model name
+
+    Returns:
+        str: Compact model key
+    """
+    return NON_ALNUM.sub('', normalize_bike_name(model))
+
+def model_digits(model):
+    """
+    Get the digit groups of a model name (after normalization)
+
+    Args:
+        model (str): Model name
+
+    Returns:
+        frozenset: Digit groups, e.g. {'540'} for "Rockrider ST 540"
+    """
+    return frozenset(DIGIT_RUNS.findall(normalize_bike_name(model)))
+
+def trigrams(text):
+    """
+    Get the set of character trigrams of a string
+
+    Args:
+        text (str): Compact model key
+
+    Returns:
+        set: Trigrams (the whole string if shorter than 3 characters)
+    """
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class FuzzyMatcher:
+    """
+    Ranked fuzzy model matching over a precomputed trigram index
+
+    Candidates are the bikes of the same brand sharing at least one trigram
+    with the query, so matching cost scales with candidates rather than the
+    catalog size. Each candidate is scored as
+    0.6 * coverage (share of query trigrams found) + 0.4 * Dice coefficient.
+    Candidates missing a digit group of the query ("SL7" vs "SL6") are
+    rejected since digits usually identify a different model.
+    """
+
+    COVERAGE_WEIGHT = 0.6
+    MIN_QUERY_LENGTH = 4
+
+    def __init__(self, bikes, threshold=0.7):
+        self.bikes = bikes
+        self.threshold = threshold
+        self._postings = defaultdict(lambda: defaultdict(list))
+        self._trigram_counts = []
+        self._digits = []
+
+        for bike_id, bike in enumerate(bikes):
+            model = bike.get('model', '')
+            grams = trigrams(compact_model(model))
+            self._trigram_counts.append(len(grams))
+            self._digits.append(model_digits(model))
+            brand_postings = self._postings[bike.get('brand', '').lower()]
+            for gram in grams:
+                brand_postings[gram].append(bike_id)
+
+        self._postings = {brand: dict(postings) for brand, postings in self._postings.items()}
+
+    def state(self):
+        """
+        Get the index structures (everything but the bikes) for a snapshot
+
+        Returns:
+            dict: Picklable postings, trigram counts and digit groups
+        """
+        return {
+            'postings': self._postings,
+            'trigram_counts': self._trigram_counts,
+            'digits': self._digits
+        }
+
+    @classmethod
+    def from_state(cls, bikes, state, threshold=0.7):
+        """
+        Rebuild a matcher from state() output without re-indexing
+
+        Args:
+            bikes (sequence): Same bikes, in the same order, as when indexed
+            state (dict): Output of state()
+            threshold (float): Default acceptance threshold
+
+        Returns:
+            FuzzyMatcher: Matcher
+        """
+        matcher = cls.__new__(cls)
+        matcher.bikes = bikes
+        matcher.threshold = threshold
+        matcher._postings = state['postings']
+        matcher._trigram_counts = state['trigram_counts']
+        matcher._digits = state['digits']
+        return matcher
+
+    def rank(self, brand, model, limit=5):
+        """
+        Rank catalog bikes of a brand by similarity to a model name
+
+        Args:
+            brand (str): Brand name (case-insensitive)
+            model (str): Model name as typed by the user
+            limit (int): Maximum number of results
+
+        Returns:
+            list: (score, bike) tuples, best first
+        """
+        postings = self._postings.get(brand.lower().strip())
+        compact = compact_model(model)
+        if not postings or len(compact) < self.MIN_QUERY_LENGTH:
+            return []
+
+        query_grams = trigrams(compact)
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for bike_id in postings.get(gram, ()):
+                shared[bike_id] += 1
+
+        digits = model_digits(model)
+        ranked = []
+        for bike_id, count in shared.items():
+            if not digits <= self._digits[bike_id]:
+                continue
+            coverage = count / len(query_grams)
+            dice = 2 * count / (len(query_grams) + self._trigram_counts[bike_id])
+            score = self.COVERAGE_WEIGHT * coverage + (1 - self.COVERAGE_WEIGHT) * dice
+            ranked.append((-score, bike_id))
+
+        ranked.sort()
+        return [(round(-score, 3), self.bikes[bike_id]) for score, bike_id in ranked[:limit]]
+
+    def match(self, brand, model, threshold=None):
+        """
+        Find the best fuzzy match above the acceptance threshold
+
+        Args:
+            brand (str): Brand name (case-insensitive)
+            model (str): Model name as typed by the user
+            threshold (float): Minimum score, defaults to self.threshold
+
+        Returns:
+            tuple: (bike or None, best score)
+        """
+        threshold = self.threshold if threshold is None else threshold
+        ranked = self.rank(brand, model, limit=1)
+        if not ranked:
+            return None, 0.0
+        score, bike = ranked[0]
+        return (bike if score >= threshold else None), score
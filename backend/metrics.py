@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for Reebike Compatibility API
+Version 1.0
+
+Counters and histograms recorded on the request path keep one cell per
+thread: an observation is a bisect plus an increment in the calling
+thread's own dict, with no lock. The lock is only taken when a thread
+records its first value and when /api/metrics merges the cells. Cells of
+finished threads are folded into a retired total so per-request threads
+(development server) do not accumulate.
+
+Values that already exist elsewhere (cache, upstream client and catalog
+counters) are read from their stats() at scrape time by collectors
+registered with MetricsRegistry.collector().
+"""
+
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds: sub-millisecond local hits to upstream timeouts
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def format_labels(labelnames, labels, extra=()):
+    """
+    Render a label set
+
+    Args:
+        labelnames (tuple): Label names
+        labels (tuple): Values, in labelnames order
+        extra (tuple): Additional (name, value) pairs
+
+    Returns:
+        str: '{name="value",...}' or '' without labels
+    """
+    pairs = [*zip(labelnames, labels), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class _PerThreadMetric:
+    """Metric whose values live in one dict per recording thread"""
+
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (thread, cell) of every thread that recorded a value
+        self._cells = []
+        self._retired = {}
+
+    def _cell(self):
+        cell = getattr(self._local, 'cell', None)
+        if cell is None:
+            cell = self._local.cell = {}
+            with self._lock:
+                self._cells.append((threading.current_thread(), cell))
+        return cell
+
+    def _merged(self):
+        """Sum of all cells, folding those of finished threads into the retired total"""
+        with self._lock:
+            alive = []
+            for thread, cell in self._cells:
+                if thread.is_alive():
+                    alive.append((thread, cell))
+                else:
+                    self._merge(self._retired, cell.copy())
+            self._cells = alive
+            merged = {}
+            self._merge(merged, self._retired)
+            for _, cell in alive:
+                self._merge(merged, cell.copy())
+        return merged
+
+    def _merge(self, into, cell):
+        raise NotImplementedError
+
+    def samples(self):
+        raise NotImplementedError
+
+class Counter(_PerThreadMetric):
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        # Text format 0.0.4: the family is named like its samples
+        super().__init__(f"{name}_total", help_text, labelnames)
+
+    def inc(self, *labels, amount=1):
+        """
+        Add to the counter
+
+        Args:
+            *labels: Label values, in labelnames order
+            amount (float): Increment
+        """
+        cell = self._cell()
+        cell[labels] = cell.get(labels, 0) + amount
+
+    def _merge(self, into, cell):
+        for labels, value in cell.items():
+            into[labels] = into.get(labels, 0) + value
+
+    def samples(self):
+        """
+        Get the current values
+
+        Returns:
+            list: (suffix, label string, value) tuples
+        """
+        merged = self._merged()
+        if not merged and not self.labelnames:
+            merged[()] = 0
+        return [('', format_labels(self.labelnames, labels), value)
+                for labels, value in sorted(merged.items())]
+
+class Histogram(_PerThreadMetric):
+    """Histogram of observations with fixed buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        """
+        Record one observation
+
+        Args:
+            value (float): Observed value (seconds for latencies)
+            *labels: Label values, in labelnames order
+        """
+        cell = self._cell()
+        series = cell.get(labels)
+        if series is None:
+            # Per-bucket counts (last one is +Inf), then sum
+            series = cell[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _merge(self, into, cell):
+        for labels, series in cell.items():
+            series = list(series)
+            total = into.get(labels)
+            if total is None:
+                into[labels] = series
+            else:
+                for index, value in enumerate(series):
+                    total[index] += value
+
+    def samples(self):
+        """
+        Get cumulative buckets, sum and count per label set
+
+        Returns:
+            list: (suffix, label string, value) tuples
+        """
+        samples = []
+        bounds = [*self.buckets, float('inf')]
+        merged = self._merged()
+        if not merged and not self.labelnames:
+            merged[()] = [0] * (len(self.buckets) + 1) + [0.0]
+        for labels, series in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                samples.append(('_bucket', format_labels(self.labelnames, labels, (('le', format_value(bound)),)),
+                                cumulative))
+            samples.append(('_sum', format_labels(self.labelnames, labels), series[-1]))
+            samples.append(('_count', format_labels(self.labelnames, labels), cumulative))
+        return samples
+
+class MetricsRegistry:
+    """Recorded metrics plus scrape-time collectors, rendered in Prometheus text format"""
+
+    def __init__(self, prefix='reebike'):
+        self.prefix = prefix
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, labelnames=()):
+        """Create and register a Counter (name without prefix nor _total)"""
+        metric = Counter(f"{self.prefix}_{name}", help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        """Create and register a Histogram (name without prefix)"""
+        metric = Histogram(f"{self.prefix}_{name}", help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """
+        Register a scrape-time collector
+
+        Args:
+            fn (callable): Returns (name, kind, help, samples) families, name
+                without prefix, samples as (labels dict, value) pairs; counter
+                names get the _total suffix
+
+        Returns:
+            callable: fn, so this can be used as a decorator
+        """
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        """
+        Render every metric
+
+        Returns:
+            str: Prometheus text exposition format (version 0.0.4)
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{labels} {format_value(value)}")
+        for collect in self._collectors:
+            for name, kind, help_text, samples in collect():
+                name = f"{self.prefix}_{name}" + ('_total' if kind == 'counter' else '')
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    label_text = format_labels(tuple(labels), tuple(labels.values()))
+                    lines.append(f"{name}{label_text} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
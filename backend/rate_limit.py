@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Request rate limiting for Reebike Compatibility API
+Version 1.0
+
+Token buckets keyed by utils.rate_limit_key(): each client may burst up to
+`burst` requests and is then refilled at RATE_LIMIT requests per minute.
+A check is one dict operation under the lock of one of `shards` shards,
+so concurrent requests from different clients rarely contend. The key
+table is bounded: a bucket idle long enough to be full again is
+indistinguishable from a new one and is dropped first, then the least
+recently seen buckets when a shard is still over its share of max_keys.
+
+SharedRateLimiter keeps the buckets in a SQLite file (WAL mode) so the
+limit holds across all worker processes of a host, at the cost of one
+write per request. Any SQLite error lets the request through: the limiter
+must never take the API down.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class RateLimitDecision:
+    """Outcome of one rate limit check"""
+
+    __slots__ = ('allowed', 'limit', 'remaining', 'reset_after', 'retry_after')
+
+    def __init__(self, allowed, limit, remaining, reset_after, retry_after=0.0):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_after = reset_after
+        self.retry_after = retry_after
+
+    def headers(self):
+        """
+        Get the rate limit response headers
+
+        Returns:
+            list: (name, value) pairs, with Retry-After when refused
+        """
+        headers = [
+            ('RateLimit-Limit', str(self.limit)),
+            ('RateLimit-Remaining', str(max(0, int(self.remaining)))),
+            ('RateLimit-Reset', str(math.ceil(self.reset_after)))
+        ]
+        if not self.allowed:
+            headers.append(('Retry-After', str(max(1, math.ceil(self.retry_after)))))
+        return headers
+
+class _Shard:
+    __slots__ = ('lock', 'buckets', 'allowed', 'limited')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> (tokens, updated_at), least recently seen first
+        self.buckets = {}
+        self.allowed = 0
+        self.limited = 0
+
+class TokenBucketLimiter:
+    """In-process token bucket limiter with sharded locks and a bounded key table"""
+
+    def __init__(self, per_minute, burst=None, shards=16, max_keys=100000, clock=time.monotonic):
+        """
+        Args:
+            per_minute (float): Sustained requests per minute and per key
+            burst (int): Bucket capacity (defaults to per_minute)
+            shards (int): Number of independently locked key tables
+            max_keys (int): Maximum number of tracked keys
+            clock (callable): Monotonic time source in seconds
+        """
+        self.limit = int(burst if burst else per_minute)
+        self.rate = per_minute / 60.0
+        self.full_after = self.limit / self.rate
+        self.max_keys = max_keys
+        self.clock = clock
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._shard_max = max(1, max_keys // len(self._shards))
+
+    def hit(self, key, cost=1):
+        """
+        Take `cost` tokens from a key's bucket if it holds enough
+
+        Args:
+            key (str): Client key (see utils.rate_limit_key)
+            cost (int): Tokens taken by this request
+
+        Returns:
+            RateLimitDecision: Whether the request may proceed, with header values
+        """
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = self.clock()
+        with shard.lock:
+            buckets = shard.buckets
+            # Pop and re-insert to keep the table in least-recently-seen order
+            bucket = buckets.pop(key, None)
+            if bucket is None:
+                tokens = self.limit
+                if len(buckets) >= self._shard_max:
+                    self._evict(buckets, now)
+            else:
+                tokens = min(self.limit, bucket[0] + (now - bucket[1]) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+                shard.allowed += 1
+            else:
+                shard.limited += 1
+            buckets[key] = (tokens, now)
+        return self._decision(allowed, tokens, cost)
+
+    def _decision(self, allowed, tokens, cost):
+        retry_after = 0.0 if allowed else (cost - tokens) / self.rate
+        return RateLimitDecision(allowed, self.limit, tokens, (self.limit - tokens) / self.rate, retry_after)
+
+    def _evict(self, buckets, now):
+        """Make room in a full shard (lock held)"""
+        # Oldest entries first: drop those that have refilled completely
+        for _ in range(2):
+            oldest = next(iter(buckets))
+            if now - buckets[oldest][1] < self.full_after:
+                break
+            del buckets[oldest]
+        if len(buckets) >= self._shard_max:
+            del buckets[next(iter(buckets))]
+
+    def __len__(self):
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def stats(self):
+        """
+        Get limiter statistics
+
+        Returns:
+            dict: Allowed/limited counters, tracked keys and settings
+        """
+        return {
+            'backend': 'memory',
+            'allowed': sum(shard.allowed for shard in self._shards),
+            'limited': sum(shard.limited for shard in self._shards),
+            'tracked_keys': len(self),
+            'max_keys': self.max_keys,
+            'limit': self.limit,
+            'per_minute': self.rate * 60
+        }
+
+class SharedRateLimiter(TokenBucketLimiter):
+    """Token bucket limiter stored in SQLite, shared by every worker on the host"""
+
+    # One statement: refill, take the tokens if there are enough, record the outcome
+    _HIT_SQL = (
+        'INSERT INTO rate_limits (key, tokens, updated_at, allowed) '
+        'VALUES (:key, :limit - :cost, :now, 1) '
+        'ON CONFLICT(key) DO UPDATE SET '
+        'tokens = MIN(:limit, tokens + MAX(0, :now - updated_at) * :rate) '
+        '  - CASE WHEN MIN(:limit, tokens + MAX(0, :now - updated_at) * :rate) >= :cost THEN :cost ELSE 0 END, '
+        'allowed = MIN(:limit, tokens + MAX(0, :now - updated_at) * :rate) >= :cost, '
+        'updated_at = :now '
+        'RETURNING tokens, allowed'
+    )
+
+    def __init__(self, path, per_minute, burst=None, max_keys=100000, trim_interval=1000,
+                 busy_timeout_ms=50, clock=time.time):
+        """
+        Args:
+            path (str): SQLite database file
+            per_minute (float): Sustained requests per minute and per key
+            burst (int): Bucket capacity (defaults to per_minute)
+            max_keys (int): Maximum number of tracked keys
+            trim_interval (int): Checks between two expiry passes
+            busy_timeout_ms (int): Wait for another worker's write before failing open
+            clock (callable): Wall-clock time source (shared by all processes)
+        """
+        super().__init__(per_minute, burst=burst, shards=1, max_keys=max_keys, clock=clock)
+        self.path = path
+        self.trim_interval = trim_interval
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._checks = 0
+        self._stats = {'allowed': 0, 'limited': 0, 'errors': 0, 'evictions': 0}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection()
+
+    def _connection(self):
+        """Get this thread's connection, creating the schema on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')  # losing a few tokens on a crash is harmless
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limits ('
+                'key TEXT PRIMARY KEY, '
+                'tokens REAL NOT NULL, '
+                'updated_at REAL NOT NULL, '
+                'allowed INTEGER NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_rate_limits_updated ON rate_limits (updated_at)')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self._stats[stat] += amount
+            self._checks += 1
+            return self._checks % self.trim_interval == 0
+
+    def hit(self, key, cost=1):
+        """
+        Take `cost` tokens from a key's shared bucket if it holds enough
+
+        Args:
+            key (str): Client key (see utils.rate_limit_key)
+            cost (int): Tokens taken by this request
+
+        Returns:
+            RateLimitDecision: Whether the request may proceed, with header values
+        """
+        params = {'key': key, 'limit': self.limit, 'cost': cost, 'now': self.clock(), 'rate': self.rate}
+        try:
+            tokens, allowed = self._connection().execute(self._HIT_SQL, params).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Rate limiter check failed: {str(e)}")
+            self._count('errors')
+            return RateLimitDecision(True, self.limit, self.limit, 0.0)
+
+        allowed = bool(allowed)
+        if self._count('allowed' if allowed else 'limited'):
+            self.trim()
+        return self._decision(allowed, tokens, cost)
+
+    def trim(self):
+        """Drop buckets that are full again, then the least recently seen above max_keys"""
+        try:
+            conn = self._connection()
+            removed = conn.execute(
+                'DELETE FROM rate_limits WHERE updated_at <= ?', (self.clock() - self.full_after,)
+            ).rowcount
+            overflow = conn.execute('SELECT COUNT(*) FROM rate_limits').fetchone()[0] - self.max_keys
+            if overflow > 0:
+                removed += conn.execute(
+                    'DELETE FROM rate_limits WHERE rowid IN '
+                    '(SELECT rowid FROM rate_limits ORDER BY updated_at LIMIT ?)',
+                    (overflow,)
+                ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Rate limiter trim failed: {str(e)}")
+            with self._lock:
+                self._stats['errors'] += 1
+            return
+        with self._lock:
+            self._stats['evictions'] += removed
+
+    def __len__(self):
+        try:
+            return self._connection().execute('SELECT COUNT(*) FROM rate_limits').fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def stats(self):
+        """
+        Get limiter statistics
+
+        Returns:
+            dict: Allowed/limited/error counters, tracked keys and settings
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['backend'] = 'sqlite'
+        stats['path'] = self.path
+        stats['tracked_keys'] = len(self)
+        stats['max_keys'] = self.max_keys
+        stats['limit'] = self.limit
+        stats['per_minute'] = self.rate * 60
+        return stats
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Hot reload of the bike catalog file for Reebike Compatibility API
+Version 1.0
+
+The file is watched by polling its modification time and can be reloaded
+on demand with SIGHUP. Loading and index building run on a background
+thread; the caller's `on_change` swaps the finished catalog in with a
+single reference assignment, so requests never see a half-built index.
+"""
+
+import json
+import logging
+import os
+import signal
+import threading
+
+logger = logging.getLogger(__name__)
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class CatalogReloader:
+    """
+    Watch a catalog file and hand every new version to a callback
+
+    `loader(path)` reads the file (json.load by default); the app passes
+    the streaming catalog loader.
+    """
+
+    def __init__(self, path, on_change, interval=5.0, loader=None):
+        self.path = path
+        self.on_change = on_change
+        self.loader = loader or _load_json
+        self.interval = interval
+        self._signature = self._stat()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stats = {'reloads': 0, 'failures': 0}
+
+    def _stat(self):
+        """File signature (mtime, size), or None if it cannot be read"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def check(self):
+        """
+        Reload the catalog if the file changed since the last load
+
+        Returns:
+            bool: True if a new catalog was swapped in
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        return self.reload()
+
+    def reload(self):
+        """
+        Load the catalog file and pass it to on_change
+
+        A file that cannot be read or parsed is logged and ignored: the
+        current catalog keeps serving.
+
+        Returns:
+            bool: True if a new catalog was swapped in
+        """
+        with self._lock:
+            signature = self._stat()
+            try:
+                data = self.loader(self.path)
+                self.on_change(data)
+            except Exception as e:
+                logger.error(f"Catalog reload from {self.path} failed, keeping current catalog: {str(e)}")
+                self._stats['failures'] += 1
+                # Do not retry the same broken file on every poll
+                self._signature = signature
+                return False
+            self._signature = signature
+            self._stats['reloads'] += 1
+            logger.info(f"Catalog reloaded from {self.path}")
+            return True
+
+    def start(self):
+        """Start the background watcher thread (no-op if interval <= 0)"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='catalog-reloader', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        # Without polling the thread only serves signal-triggered reloads
+        timeout = self.interval if self.interval > 0 else None
+        while True:
+            requested = self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            try:
+                if requested:
+                    self.reload()
+                else:
+                    self.check()
+            except Exception as e:  # pragma: no cover - keep the watcher alive
+                logger.error(f"Catalog watcher error: {str(e)}")
+
+    def install_signal_handler(self, signum=getattr(signal, 'SIGHUP', None)):
+        """
+        Reload the catalog when the process receives a signal (SIGHUP)
+
+        The handler only wakes the watcher thread up; the reload itself
+        never runs inside the signal handler.
+
+        Returns:
+            bool: True if the handler was installed
+        """
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+
+        def handle(signum, frame):
+            self._wakeup.set()
+
+        signal.signal(signum, handle)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='catalog-reloader', daemon=True)
+            self._thread.start()
+        return True
+
+    def stats(self):
+        """
+        Get reload statistics
+
+        Returns:
+            dict: Reload and failure counters plus the watched path
+        """
+        stats = dict(self._stats)
+        stats['path'] = self.path
+        stats['interval'] = self.interval
+        return stats
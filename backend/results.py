@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Precomputed compatibility results for the local catalog
+Version 1.0
+
+The analysis of a catalog bike only depends on its specs, so every result
+(and its serialized JSON body) is computed once when the catalog is
+loaded. A local hit is then a dict lookup plus a write of ready bytes.
+"""
+
+import json
+import logging
+
+from http_cache import body_etag, compress_body
+
+try:
+    import orjson
+except ImportError:  # optional: faster encoder, same output
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Fields that describe where a record came from, not the bike itself
+VOLATILE_FIELDS = ('source',)
+
+def serialize_result(result):
+    """
+    Serialize an analysis result as a compact UTF-8 JSON body
+
+    Args:
+        result (dict): Analysis result
+
+    Returns:
+        bytes: JSON body
+    """
+    if orjson is not None:
+        return orjson.dumps(result)
+    return json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def bike_key(bike):
+    """
+    Get the table key of a catalog bike
+
+    Args:
+        bike (dict): Bike record
+
+    Returns:
+        tuple: (lowercased brand, lowercased model)
+    """
+    return (bike.get('brand', '').lower(), bike.get('model', '').lower())
+
+def spec_fingerprint(bike):
+    """
+    Get a stable fingerprint of a bike's specs
+
+    Args:
+        bike (dict): Bike record
+
+    Returns:
+        str: Canonical JSON of the specs (volatile fields excluded)
+    """
+    specs = {field: value for field, value in bike.items() if field not in VOLATILE_FIELDS}
+    return json.dumps(specs, sort_keys=True, default=str)
+
+class EncodedResponse:
+    """
+    Ready-to-send JSON body with its ETag and compressed variants
+
+    Variants are compressed on first use and kept, so a hot response is
+    encoded once and then only written out.
+    """
+
+    __slots__ = ('body', 'etag', '_variants')
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = body_etag(body)
+        self._variants = {}
+
+    def variant(self, encoding):
+        """
+        Get the body in a content coding
+
+        Args:
+            encoding (str): 'br', 'gzip' or None for identity
+
+        Returns:
+            bytes: Encoded body
+        """
+        if encoding is None:
+            return self.body
+        data = self._variants.get(encoding)
+        if data is None:
+            data = self._variants[encoding] = compress_body(self.body, encoding)
+        return data
+
+    def etag_for(self, encoding):
+        """Strong tag of a variant (each content coding is its own representation)"""
+        return self.etag if encoding is None else f"{self.etag}-{encoding}"
+
+class PrecomputedResult:
+    """Analysis result of one catalog bike with its serialized body"""
+
+    __slots__ = ('bike', 'fingerprint', 'result', 'body', '_response')
+
+    def __init__(self, bike, fingerprint, result, body=None):
+        self.bike = bike
+        self.fingerprint = fingerprint
+        self.result = result
+        self.body = serialize_result(result) if body is None else body
+        self._response = None
+
+    @property
+    def response(self):
+        """EncodedResponse of the body, built on the first request for this bike"""
+        if self._response is None:
+            self._response = EncodedResponse(self.body)
+        return self._response
+
+class ResultTable:
+    """
+    Catalog bike -> precomputed analysis result
+
+    `build()` is incremental: entries whose specs did not change keep
+    their result, so reloading a catalog only re-analyzes changed bikes.
+    Results are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, analyze_bike):
+        self._analyze_bike = analyze_bike
+        self._entries = {}
+        self.changed = set()
+        self.added = set()
+        self.removed = set()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def build(self, bikes):
+        """
+        (Re)build the table for a catalog
+
+        Args:
+            bikes (list): Catalog bike records, first record wins per key
+
+        Returns:
+            dict: Counts of added, updated, unchanged and removed entries
+            (the keys of the non-unchanged ones are kept in `changed`, those
+            of added and removed ones also in `added` and `removed`)
+        """
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        entries = {}
+        changed = set()
+        added = set()
+        for bike in bikes:
+            key = bike_key(bike)
+            if key in entries:
+                continue
+            fingerprint = spec_fingerprint(bike)
+            previous = self._entries.get(key)
+            if previous is not None and previous.fingerprint == fingerprint:
+                # New entry object: tables shared with in-flight requests stay intact
+                entries[key] = PrecomputedResult(bike, fingerprint, previous.result, previous.body)
+                counts['unchanged'] += 1
+                continue
+            entries[key] = PrecomputedResult(bike, fingerprint, self._analyze_bike(bike))
+            counts['updated' if previous is not None else 'added'] += 1
+            changed.add(key)
+            if previous is None:
+                added.add(key)
+
+        removed = self._entries.keys() - entries.keys()
+        counts['removed'] = len(removed)
+        self.changed = changed | removed
+        self.added = added
+        self.removed = removed
+        self._entries = entries
+        logger.info(
+            f"Precomputed results: {counts['added']} added, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['removed']} removed"
+        )
+        return counts
+
+    def derive(self, bikes, analyze_bike):
+        """
+        Build a new table for an updated catalog, reusing unchanged entries
+
+        This table is left untouched, so requests still using it are not
+        affected. Only valid when the analysis rules did not change.
+
+        Args:
+            bikes (list): New catalog bike records
+            analyze_bike (callable): Analysis function of the new catalog
+
+        Returns:
+            ResultTable: New table, with `changed` filled in
+        """
+        table = ResultTable(analyze_bike)
+        table._entries = self._entries
+        table.build(bikes)
+        return table
+
+    def get(self, bike):
+        """
+        Get the precomputed result of a catalog bike
+
+        Args:
+            bike (dict): Bike record returned by the catalog
+
+        Returns:
+            PrecomputedResult: Entry, or None if this record is not in the table
+        """
+        entry = self._entries.get(bike_key(bike))
+        if entry is None or entry.bike is not bike:
+            return None
+        return entry
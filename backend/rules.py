@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Compiled kit compatibility rules for Reebike Compatibility API
+Version 1.0
+
+Kit requirements are data (the `compatibility_matrix.kits` table of
+mock_bikes.json). They are compiled once into one predicate and one
+score function per kit, composed from closures over the `operator`
+comparisons, so evaluating a kit costs a single call and no requirement
+value is ever turned into source code.
+
+Requirement syntax:
+- "field": value         -> spec equals value (missing never matches)
+- "min_field": threshold -> spec >= threshold
+- "max_field": threshold -> spec <= threshold
+
+A field listed in FIELD_GROUPS stands for any of its member fields, e.g.
+"min_tube_length_mm" is met by the down tube OR the seat tube.
+"""
+
+import logging
+import math
+import operator
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Requirements used when the data file has no kits table
+DEFAULT_KITS = {
+    'Cosmopolit': {
+        'requirements': {
+            'wheel_axle_front': 'QR',
+            'fork_spacing_mm': 100
+        }
+    },
+    'Urban': {
+        'requirements': {
+            'wheel_axle_front': 'QR',
+            'fork_spacing_mm': 100,
+            'min_tube_length_mm': 300  # down_tube OR seat_tube
+        }
+    },
+    'Explorer': {
+        'requirements': {
+            'wheel_axle_front': 'QR',
+            'fork_spacing_mm': 100,
+            'min_tube_length_mm': 300  # down_tube OR seat_tube
+        }
+    }
+}
+
+FIELD_GROUPS = {
+    'tube_length_mm': ('down_tube_length_mm', 'seat_tube_length_mm')
+}
+
+FIELD_NAME = re.compile(r'^[a-z_][a-z0-9_]*$')
+COMPARISONS = {'min_': '>=', 'max_': '<='}
+OPERATORS = {'==': operator.eq, '>=': operator.ge, '<=': operator.le}
+
+class Requirement:
+    """Single requirement: fields (any of), operator and expected value"""
+
+    __slots__ = ('key', 'fields', 'operator', 'value')
+
+    def __init__(self, key, value):
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f"Unsupported requirement value for {key}: {value!r}")
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(f"Requirement {key} needs a finite value, got {value!r}")
+
+        operator = '=='
+        field = key
+        for prefix, comparison in COMPARISONS.items():
+            if key.startswith(prefix):
+                if isinstance(value, str):
+                    raise ValueError(f"{key} needs a numeric threshold, got {value!r}")
+                operator = comparison
+                field = key[len(prefix):]
+                break
+
+        fields = FIELD_GROUPS.get(field, (field,))
+        for name in fields:
+            if not FIELD_NAME.match(name):
+                raise ValueError(f"Invalid field name in requirement: {name!r}")
+
+        self.key = key
+        self.fields = fields
+        self.operator = operator
+        self.value = value
+
+    def predicate(self):
+        """Function telling whether bike specs (a dict) meet this requirement"""
+        fields = self.fields
+        value = self.value
+
+        if self.operator == '==':
+            if len(fields) == 1:
+                field = fields[0]
+                return lambda b: b.get(field) == value
+
+            def equals_any(b):
+                for field in fields:
+                    if b.get(field) == value:
+                        return True
+                return False
+            return equals_any
+
+        compare = OPERATORS[self.operator]
+
+        def compares_any(b):
+            for field in fields:
+                spec = b.get(field)
+                if spec is not None and compare(spec, value):
+                    return True
+            return False
+        return compares_any
+
+    def mask(self, columns):
+        """Boolean NumPy mask of this requirement over ColumnarSpecs"""
+        masks = []
+        for field in self.fields:
+            if self.operator == '==':
+                masks.append(columns.equals(field, self.value))
+            elif self.operator == '>=':
+                masks.append(columns.at_least(field, self.value))
+            else:
+                masks.append(columns.at_most(field, self.value))
+        result = masks[0]
+        for mask in masks[1:]:
+            result = result | mask
+        return result
+
+def _all_of(predicates):
+    """Predicate met when every predicate is (always met without any)"""
+    if not predicates:
+        return lambda b: True
+    if len(predicates) == 1:
+        return predicates[0]
+
+    def check(b):
+        for predicate in predicates:
+            if not predicate(b):
+                return False
+        return True
+    return check
+
+def _share_of(predicates):
+    """Score function: share of the predicates met (0.0 without any)"""
+    if not predicates:
+        return lambda b: 0.0
+    total = len(predicates)
+
+    def score(b):
+        met = 0
+        for predicate in predicates:
+            if predicate(b):
+                met += 1
+        return met / total
+    return score
+
+class CompiledKit:
+    """Compiled predicate and score function for one kit"""
+
+    __slots__ = ('name', 'requirements', 'parent', 'check', 'score', 'extra')
+
+    def __init__(self, name, requirements, candidates=()):
+        self.name = name
+        self.requirements = [Requirement(key, value) for key, value in requirements.items()]
+        self.parent = self._find_parent(candidates)
+
+        # With a parent kit, only the requirements it does not share are
+        # checked; the parent's result short-circuits the rest
+        inherited = set(self.parent.items()) if self.parent else set()
+        self.extra = [r for r in self.requirements if (r.key, r.value) not in inherited]
+
+        self.check = _all_of([r.predicate() for r in self.extra])
+        self.score = _share_of([r.predicate() for r in self.requirements])
+
+    def _find_parent(self, candidates):
+        """Latest earlier kit whose requirements are a subset of these"""
+        items = set(self.items())
+        for kit in reversed(candidates):
+            if kit.requirements and set(kit.items()) <= items:
+                return kit
+        return None
+
+    def items(self):
+        """(key, value) pairs of this kit's requirements"""
+        return [(r.key, r.value) for r in self.requirements]
+
+@lru_cache(maxsize=64)
+def _compile_requirements(items):
+    return CompiledKit('requirements', dict(items))
+
+def compile_requirements(requirements):
+    """
+    Compile a standalone requirements dict (cached per distinct dict)
+
+    Args:
+        requirements (dict): Requirement table of one kit
+
+    Returns:
+        CompiledKit: Compiled kit
+    """
+    return _compile_requirements(tuple(sorted(requirements.items())))
+
+class RuleSet:
+    """
+    Kit rules compiled from the compatibility matrix
+
+    Kits keep their declaration order, which is the order of the
+    compatible kit list (the first one is the recommended kit).
+    """
+
+    def __init__(self, kits=None):
+        self.kits = kits or DEFAULT_KITS
+        self.compiled = []
+        for name, kit in self.kits.items():
+            requirements = kit.get('requirements', {})
+            self.compiled.append(CompiledKit(name, requirements, self.compiled))
+        self.names = [kit.name for kit in self.compiled]
+        logger.info(f"Compiled compatibility rules for kits: {', '.join(self.names)}")
+
+    @classmethod
+    def from_data(cls, data):
+        """Build rules from a catalog document's compatibility_matrix.kits"""
+        kits = data.get('compatibility_matrix', {}).get('kits')
+        return cls(kits or None)
+
+    def compatible_kits(self, bike_specs):
+        """
+        List kits compatible with bike specs
+
+        Args:
+            bike_specs (dict): Bike specifications
+
+        Returns:
+            list: Kit names in declaration order
+        """
+        results = {}
+        compatible = []
+        for kit in self.compiled:
+            passed = (kit.parent is None or results[kit.parent.name]) and kit.check(bike_specs)
+            results[kit.name] = passed
+            if passed:
+                compatible.append(kit.name)
+        return compatible
+
+    def scores(self, bike_specs):
+        """
+        Share of each kit's requirements met by bike specs
+
+        Args:
+            bike_specs (dict): Bike specifications
+
+        Returns:
+            dict: Kit name -> score between 0.0 and 1.0
+        """
+        return {kit.name: kit.score(bike_specs) for kit in self.compiled}
+
+    def masks(self, columns):
+        """
+        Vectorized kit eligibility over ColumnarSpecs
+
+        Args:
+            columns (ColumnarSpecs): Columnar catalog specs
+
+        Returns:
+            dict: Kit name -> boolean array
+        """
+        results = {}
+        for kit in self.compiled:
+            mask = results[kit.parent.name] if kit.parent is not None else columns.all_rows()
+            for requirement in kit.extra:
+                mask = mask & requirement.mask(columns)
+            results[kit.name] = mask
+        return results
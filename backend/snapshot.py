@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Precompiled binary catalog snapshot for Reebike Compatibility API
+Version 1.0
+
+`compile_catalog.py` turns the JSON catalog into a single versioned file
+holding the bikes, their lookup indexes and the precomputed compatibility
+results. The API memory-maps it at startup instead of parsing JSON and
+rebuilding everything, so boot time barely depends on the catalog size
+and pre-forked workers share the data through the OS page cache.
+
+File layout (little endian, sections 8-byte aligned):
+
+    magic (8 bytes) | format version (u32) | meta length (u32) | meta JSON
+    records  fixed-width rows, one per bike (RECORD layout below)
+    models   UTF-8 model names, referenced by (offset, length)
+    bodies   precomputed /api/compat JSON bodies, referenced by (offset, length)
+    index    pickled CatalogIndex lookup structures
+
+Record rows, the model names and the result bodies are read straight
+from the mapping (shared pages). Numeric and categorical columns for
+vectorized evaluation are NumPy views on the record rows. Only the
+pickled index structures are materialized per worker. Snapshots are
+trusted build artifacts: never load one from an untrusted source.
+"""
+
+import json
+import logging
+import math
+import mmap
+import os
+import pickle
+import struct
+import time
+
+import columnar
+from catalog import CatalogIndex
+from records import BikeRecord, FIELDS
+from results import PrecomputedResult, ResultTable
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'RBKSNAP\x00'
+FORMAT_VERSION = 2
+PREAMBLE = struct.Struct('<8sII')
+
+# Low-cardinality text fields, stored as codes into a per-field vocabulary
+CATEGORICAL_FIELDS = ('brand', 'wheel_axle_front', 'brake_type', 'source')
+# Numeric fields, stored as float64 (NaN = not provided)
+NUMERIC_FIELDS = ('year', 'fork_spacing_mm', 'down_tube_length_mm', 'seat_tube_length_mm')
+
+# One row per bike: category codes (-1 = none), model name location,
+# numeric values, a bit per numeric field holding an int, result body location
+RECORD = struct.Struct('<4iQI4dBQI')
+RECORD_FIELDS = (
+    [(field, '<i4') for field in CATEGORICAL_FIELDS]
+    + [('model_offset', '<u8'), ('model_length', '<u4')]
+    + [(field, '<f8') for field in NUMERIC_FIELDS]
+    + [('int_flags', 'u1'), ('body_offset', '<u8'), ('body_length', '<u4')]
+)
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or of another version"""
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+def write_snapshot(path, catalog, results, data, source_path=None):
+    """
+    Write a catalog snapshot
+
+    The file is written next to its destination and renamed into place,
+    so running workers never map a partially written snapshot.
+
+    Args:
+        path (str): Output file
+        catalog (CatalogIndex): Indexed catalog bike records
+        results (ResultTable): Precomputed results of those bikes
+        data (dict): Catalog document (everything but the bikes is kept)
+        source_path (str): JSON file the snapshot was built from
+
+    Returns:
+        dict: Snapshot metadata
+    """
+    bikes = catalog.bikes
+    results_count = 0
+    vocab = {field: [] for field in CATEGORICAL_FIELDS}
+    codes = {field: {} for field in CATEGORICAL_FIELDS}
+    extras = {}
+    rows = bytearray()
+    models = bytearray()
+    bodies = bytearray()
+
+    for row, bike in enumerate(bikes):
+        values = []
+        extra = {}
+        for field in CATEGORICAL_FIELDS:
+            value = bike.get(field)
+            if value is None:
+                values.append(-1)
+            elif isinstance(value, str):
+                if value not in codes[field]:
+                    codes[field][value] = len(vocab[field])
+                    vocab[field].append(value)
+                values.append(codes[field][value])
+            else:
+                values.append(-1)
+                extra[field] = value
+
+        model = bike.get('model')
+        if model is not None and not isinstance(model, str):
+            extra['model'] = model
+            model = None
+        encoded = model.encode('utf-8') if model is not None else b''
+        values.extend((len(models), len(encoded) if model is not None else 0xFFFFFFFF))
+        models += encoded
+
+        int_flags = 0
+        for bit, field in enumerate(NUMERIC_FIELDS):
+            value = bike.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.append(float(value))
+                if isinstance(value, int):
+                    int_flags |= 1 << bit
+            else:
+                values.append(math.nan)
+                if value is not None:
+                    extra[field] = value
+        values.append(int_flags)
+
+        entry = results.get(bike)
+        body = entry.body if entry is not None else b''
+        results_count += bool(body)
+        values.extend((len(bodies), len(body)))
+        bodies += body
+
+        for field, value in bike.items():
+            if field not in FIELDS:
+                extra[field] = value
+        if extra:
+            extras[str(row)] = extra
+        rows += RECORD.pack(*values)
+
+    index = pickle.dumps(catalog.state(), protocol=pickle.HIGHEST_PROTOCOL)
+    document = {key: value for key, value in data.items() if key != 'bikes'}
+    source = None
+    if source_path is not None and os.path.exists(source_path):
+        stat = os.stat(source_path)
+        source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'created_at': time.time(),
+        'count': len(bikes),
+        'results_count': results_count,
+        'record_size': RECORD.size,
+        'source': source,
+        'document': document,
+        'vocab': vocab,
+        'extras': extras,
+        'sections': {}
+    }
+
+    # Section offsets depend on the meta length, which depends on the
+    # offsets: iterate until the encoded metadata stops growing
+    sections = [('records', rows), ('models', models), ('bodies', bodies), ('index', index)]
+    meta['sections'] = {name: [0, 0] for name, _ in sections}
+    encoded_meta = b''
+    while True:
+        offset = _align(PREAMBLE.size + len(encoded_meta))
+        for name, blob in sections:
+            meta['sections'][name] = [offset, len(blob)]
+            offset = _align(offset + len(blob))
+        encoded = json.dumps(meta).encode('utf-8')
+        if len(encoded) <= len(encoded_meta):
+            break
+        encoded_meta = encoded
+    encoded_meta = encoded.ljust(len(encoded_meta))
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded_meta)))
+        f.write(encoded_meta)
+        for name, blob in sections:
+            f.seek(meta['sections'][name][0])
+            f.write(blob)
+        f.truncate(_align(f.tell()))
+    os.replace(tmp_path, path)
+    logger.info(f"Catalog snapshot written to {path}: {len(bikes)} bikes, {os.path.getsize(path)} bytes")
+    return meta
+
+class MappedBikes:
+    """
+    Read-only sequence of BikeRecord views over the snapshot rows
+
+    Records are decoded on first access and kept, so the same row always
+    yields the same object (lookups rely on identity).
+    """
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+        self._records = {}
+        self._rows = {}
+
+    def __len__(self):
+        return self._snapshot.count
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        record = self._records.get(row)
+        if record is None:
+            if not 0 <= row < len(self):
+                raise IndexError(row)
+            record = self._snapshot.decode(row)
+            record = self._records.setdefault(row, record)
+            self._rows[id(record)] = row
+        return record
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def row_of(self, bike):
+        """Row of a record obtained from this sequence, or None"""
+        row = self._rows.get(id(bike))
+        if row is None or self._records.get(row) is not bike:
+            return None
+        return row
+
+class MappedResultTable:
+    """Precomputed results read from the snapshot bodies section"""
+
+    def __init__(self, snapshot, bikes):
+        self._snapshot = snapshot
+        self._bikes = bikes
+        self._entries = {}
+        self.changed = set()
+
+    def __len__(self):
+        return self._snapshot.results_count
+
+    def get(self, bike):
+        """
+        Get the precomputed result of a snapshot bike
+
+        Args:
+            bike (BikeRecord): Record returned by the snapshot's bikes
+
+        Returns:
+            PrecomputedResult: Entry, or None
+        """
+        row = self._bikes.row_of(bike)
+        if row is None:
+            return None
+        entry = self._entries.get(row)
+        if entry is None:
+            body = self._snapshot.body(row)
+            if not body:
+                return None
+            entry = PrecomputedResult(bike, None, json.loads(body), body)
+            entry = self._entries.setdefault(row, entry)
+        return entry
+
+    def derive(self, bikes, analyze_bike):
+        """Build a table for a reloaded catalog (everything is analyzed once)"""
+        table = ResultTable(analyze_bike)
+        table.build(bikes)
+        return table
+
+class CatalogSnapshot:
+    """Memory-mapped catalog snapshot"""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot {path}: {str(e)}")
+
+        if len(self._mmap) < PREAMBLE.size:
+            raise SnapshotError(f"Truncated snapshot: {path}")
+        magic, version, meta_length = PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"Not a catalog snapshot: {path}")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Snapshot format {version} not supported (expected {FORMAT_VERSION})")
+        try:
+            self.meta = json.loads(self._mmap[PREAMBLE.size:PREAMBLE.size + meta_length])
+        except ValueError as e:
+            raise SnapshotError(f"Corrupt snapshot metadata: {str(e)}")
+        for name, (offset, length) in self.meta['sections'].items():
+            if offset + length > len(self._mmap):
+                raise SnapshotError(f"Truncated snapshot section {name}: {path}")
+
+        self.count = self.meta['count']
+        self._vocab = self.meta['vocab']
+        self._extras = {int(row): extra for row, extra in self.meta['extras'].items()}
+        self._records_offset = self.meta['sections']['records'][0]
+        self._models_offset = self.meta['sections']['models'][0]
+        self._bodies_offset = self.meta['sections']['bodies'][0]
+        self.bikes = MappedBikes(self)
+        self.results_count = self.meta['results_count']
+
+    def _row(self, row):
+        return RECORD.unpack_from(self._mmap, self._records_offset + row * RECORD.size)
+
+    def decode(self, row):
+        """
+        Decode one bike record
+
+        Args:
+            row (int): Catalog row
+
+        Returns:
+            BikeRecord: Record
+        """
+        values = self._row(row)
+        fields = {}
+        for position, field in enumerate(CATEGORICAL_FIELDS):
+            code = values[position]
+            if code >= 0:
+                fields[field] = self._vocab[field][code]
+
+        model_offset, model_length = values[4], values[5]
+        if model_length != 0xFFFFFFFF:
+            start = self._models_offset + model_offset
+            fields['model'] = self._mmap[start:start + model_length].decode('utf-8')
+
+        int_flags = values[10]
+        for bit, field in enumerate(NUMERIC_FIELDS):
+            value = values[6 + bit]
+            if not math.isnan(value):
+                fields[field] = int(value) if int_flags & (1 << bit) else value
+
+        fields.update(self._extras.get(row, ()))
+        return BikeRecord(fields)
+
+    def body(self, row):
+        """Precomputed JSON body of a row (empty if none)"""
+        values = self._row(row)
+        start = self._bodies_offset + values[11]
+        return self._mmap[start:start + values[12]]
+
+    @property
+    def document(self):
+        """Catalog document with `bikes` as the mapped sequence"""
+        return dict(self.meta['document'], bikes=self.bikes)
+
+    def columns(self):
+        """
+        Columnar specs backed by the record rows (None without NumPy)
+
+        Returns:
+            ColumnarSpecs: Columnar specs
+        """
+        if not columnar.available():
+            return None
+        np = columnar.np
+        offset, length = self.meta['sections']['records']
+        dtype = np.dtype(RECORD_FIELDS)
+        rows = np.frombuffer(self._mmap, dtype=dtype, count=self.count, offset=offset)
+
+        numeric = {}
+        for field in NUMERIC_FIELDS:
+            values = rows[field]
+            missing = np.isnan(values)
+            valid = ~missing
+            for row, extra in self._extras.items():
+                if extra.get(field) is not None:
+                    missing[row] = False
+            numeric[field] = (values, valid, missing)
+
+        categorical = {}
+        for field in CATEGORICAL_FIELDS:
+            if any(field in extra for extra in self._extras.values()):
+                continue  # Non-text values: let ColumnarSpecs read the records
+            categorical[field] = (rows[field], list(self._vocab[field]))
+        return columnar.ColumnarSpecs.from_columns(self.count, numeric, categorical, bikes=self.bikes)
+
+    def catalog_index(self, fuzzy_threshold=0.7):
+        """
+        Catalog index over the mapped bikes, from the pickled structures
+
+        Args:
+            fuzzy_threshold (float): Fuzzy match acceptance threshold
+
+        Returns:
+            CatalogIndex: Index
+        """
+        offset, length = self.meta['sections']['index']
+        state = pickle.loads(self._mmap[offset:offset + length])
+        return CatalogIndex.from_state(self.bikes, state, self.columns(), fuzzy_threshold)
+
+    def results_table(self):
+        """
+        Precomputed results of the snapshot bikes
+
+        Returns:
+            MappedResultTable: Result table
+        """
+        return MappedResultTable(self, self.bikes)
+
+    def is_current(self, source_path):
+        """
+        Check that the snapshot was built from the current JSON file
+
+        Args:
+            source_path (str): JSON catalog file
+
+        Returns:
+            bool: True if the file is unchanged (or absent)
+        """
+        source = self.meta.get('source')
+        if not os.path.exists(source_path):
+            return True
+        if source is None:
+            return False
+        stat = os.stat(source_path)
+        return stat.st_size == source['size'] and stat.st_mtime_ns == source['mtime_ns']
+
+def open_snapshot(path, source_path=None):
+    """
+    Open a snapshot if it exists, is valid and is not stale
+
+    Args:
+        path (str): Snapshot file
+        source_path (str): JSON catalog file it must match
+
+    Returns:
+        CatalogSnapshot: Snapshot or None (caller falls back to JSON)
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        snapshot = CatalogSnapshot(path)
+    except SnapshotError as e:
+        logger.warning(f"Ignoring catalog snapshot: {str(e)}")
+        return None
+    if source_path is not None and not snapshot.is_current(source_path):
+        logger.warning(f"Catalog snapshot {path} is older than {source_path}, loading JSON instead")
+        return None
+    logger.info(f"Catalog snapshot mapped: {path} ({snapshot.count} bikes)")
+    return snapshot
@@ -6,7 +6,7 @@ Démarre automatiquement l'API avec la bonne configuration
 
 import os
 import sys
-from app import app
+from app import app, init_app
 
 def main():
     """Démarre l'API avec configuration automatique"""
@@ -24,6 +24,7 @@ def main():
     print("-" * 50)
     
     try:
+        init_app()
         app.run(
             debug=True,
             host='0.0.0.0',
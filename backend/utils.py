@@ -7,10 +7,13 @@ Version 1.0
 import json
 import logging
 import re
+import time
 from datetime import datetime
 from functools import wraps
 from flask import request, jsonify
 
+from rules import compile_requirements
+
 logger = logging.getLogger(__name__)
 
 def validate_bike_input(brand, model):
@@ -79,39 +82,50 @@ def normalize_bike_name(name):
     
     return normalized
 
-def log_compatibility_request(brand, model, result):
+def log_compatibility_request(pipeline, brand, model, result, remote_addr=None, user_agent=None):
     """
-    Log compatibility request for analytics
+    Queue a compatibility request event for analytics
+    
+    Only a tuple of raw fields is built here; formatting and shipping
+    happen on the analytics flusher thread (see analytics.py).
     
     Args:
+        pipeline (AnalyticsPipeline): Event queue
         brand (str): Bike brand
         model (str): Bike model
         result (dict): Compatibility result
+        remote_addr (str): Client address (defaults to the current Flask request's)
+        user_agent (str): Client User-Agent (defaults to the current Flask request's)
     """
     try:
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'brand': brand,
-            'model': model,
-            'status': result.get('status'),
-            'kits_count': len(result.get('kits', [])),
-            'ip': request.remote_addr,
-            'user_agent': request.headers.get('User-Agent', '')[:100]
-        }
-        
-        logger.info(f"Compatibility request: {json.dumps(log_entry)}")
+        if remote_addr is None:
+            remote_addr = request.remote_addr
+            user_agent = request.headers.get('User-Agent', '')
+        pipeline.emit((
+            time.time(),
+            brand,
+            model,
+            result.get('status'),
+            len(result.get('kits', ())),
+            result.get('data_source'),
+            remote_addr,
+            (user_agent or '')[:100]
+        ))
         
     except Exception as e:
         logger.error(f"Failed to log compatibility request: {str(e)}")
 
-def rate_limit_key():
+def rate_limit_key(remote_addr):
     """
     Generate rate limit key based on IP address
     
+    Args:
+        remote_addr (str): Client address, supplied by the caller ('unknown' when the server has none)
+    
     Returns:
         str: Rate limit key
     """
-    return f"rate_limit:{request.remote_addr}"
+    return f"rate_limit:{remote_addr}"
 
 def handle_api_error(func):
     """
@@ -241,19 +255,8 @@ def calculate_compatibility_score(bike_specs, kit_requirements):
     if not bike_specs or not kit_requirements:
         return 0.0
     
-    total_requirements = len(kit_requirements)
-    met_requirements = 0
-    
-    for req_key, req_value in kit_requirements.items():
-        bike_value = bike_specs.get(req_key)
-        
-        if bike_value is None:
-            continue
-        
-        if req_key.startswith('min_') and isinstance(req_value, (int, float)):
-            if bike_value >= req_value:
-                met_requirements += 1
-        elif bike_value == req_value:
-            met_requirements += 1
-    
-    return met_requirements / total_requirements if total_requirements > 0 else 0.0
\ No newline at end of file
+    try:
+        return compile_requirements(kit_requirements).score(bike_specs)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Cannot score kit requirements {kit_requirements}: {e}")
+        return 0.0
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Traffic-driven GeometryGeeks cache warmup for Reebike Compatibility API
+Version 1.0
+
+TrafficRecorder counts the normalized brand/model keys answered from
+GeometryGeeks (catalog bikes are precomputed and need no warmup) and can
+persist the counts so they survive a restart; workers sharing the file
+merge their counts into it. CacheWarmer prefetches the
+most requested keys into the lookup cache in a background thread, on
+startup and then periodically, at a bounded rate so a restart does not
+turn into a burst of upstream calls.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import normalize_bike_name
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are merged without a cross-process lock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+def _add_counts(counts, entries):
+    """Add [count, brand, model] entries to a counts dict"""
+    for count, brand, model in entries:
+        key = (normalize_bike_name(brand), normalize_bike_name(model))
+        entry = counts.setdefault(key, [0, brand, model])
+        entry[0] += count
+
+class TrafficRecorder:
+    """
+    Thread-safe request counts per normalized brand/model
+
+    With a path, counts recorded since the last save are kept apart and
+    added to the file on save(), so several workers (or a restart) sharing
+    the file accumulate their traffic instead of overwriting each other's.
+    """
+
+    def __init__(self, max_keys=10000, path=None):
+        self.max_keys = max_keys
+        self.path = path
+        # (normalized brand, normalized model) -> [count, brand, model]
+        self._counts = {}
+        self._unsaved = {}
+        self._lock = threading.Lock()
+
+    def record(self, brand, model):
+        """
+        Count one request for a bike
+
+        Args:
+            brand (str): Brand as requested
+            model (str): Model as requested
+        """
+        key = (normalize_bike_name(brand), normalize_bike_name(model))
+        with self._lock:
+            self._counts = self._count(self._counts, key, brand, model)
+            if self.path:
+                self._unsaved = self._count(self._unsaved, key, brand, model)
+
+    def _count(self, counts, key, brand, model):
+        """Count one request in counts, trimmed when it grows past max_keys (lock held)"""
+        entry = counts.get(key)
+        if entry is not None:
+            entry[0] += 1
+            return counts
+        counts[key] = [1, brand, model]
+        if len(counts) > self.max_keys * 5 // 4:
+            return self._trimmed(counts)
+        return counts
+
+    def _trimmed(self, counts):
+        """Keep the max_keys most requested keys of counts"""
+        kept = sorted(counts.items(), key=lambda item: item[1][0], reverse=True)[:self.max_keys]
+        return dict(kept)
+
+    def top(self, n):
+        """
+        Get the most requested bikes
+
+        Args:
+            n (int): Number of bikes
+
+        Returns:
+            list: (brand, model) pairs, most requested first
+        """
+        with self._lock:
+            entries = sorted(self._counts.values(), key=lambda entry: entry[0], reverse=True)[:n]
+        return [(brand, model) for _, brand, model in entries]
+
+    def __len__(self):
+        return len(self._counts)
+
+    def _read(self):
+        """Counts stored in the file, empty when it is missing or invalid"""
+        counts = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                _add_counts(counts, json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring traffic keys file {self.path}: {str(e)}")
+            return {}
+        return counts
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize read-merge-write cycles of workers sharing the file"""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self):
+        """Load counts saved by a previous run or other workers (missing or invalid file is ignored)"""
+        if not self.path:
+            return
+        counts = self._read()
+        with self._lock:
+            _add_counts(counts, self._counts.values())
+            self._counts = self._trimmed(counts)
+        if counts:
+            logger.info(f"Loaded {len(counts)} traffic keys from {self.path}")
+
+    def save(self):
+        """
+        Add the counts recorded since the last save to the file (no-op without a path)
+
+        The file is re-read under a lock and replaced atomically, so the
+        counts of other workers saved in the meantime are kept; they are
+        also taken into this recorder's counts.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with self._file_lock():
+                merged = self._read()
+                _add_counts(merged, unsaved.values())
+                merged = self._trimmed(merged)
+                entries = sorted(merged.values(), key=lambda entry: entry[0], reverse=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.traffic-')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save traffic keys to {self.path}: {str(e)}")
+            with self._lock:
+                _add_counts(self._unsaved, unsaved.values())
+            return
+
+        with self._lock:
+            # Requests recorded while saving are not in the file yet
+            counts = {key: list(entry) for key, entry in merged.items()}
+            _add_counts(counts, self._unsaved.values())
+            self._counts = self._trimmed(counts)
+
+class CacheWarmer:
+    """Prefetch the most requested bikes into the lookup cache in the background"""
+
+    def __init__(self, recorder, lookup, is_cached, top_n=200, rate=2.0, interval=900):
+        """
+        Args:
+            recorder (TrafficRecorder): Source of the keys to warm
+            lookup (callable): lookup(brand, model) loading one bike into the cache
+            is_cached (callable): is_cached(brand, model), True if a fresh entry exists
+            top_n (int): Number of keys warmed per run
+            rate (float): Maximum upstream lookups per second
+            interval (float): Seconds between runs, <= 0 for the startup run only
+        """
+        self.recorder = recorder
+        self.lookup = lookup
+        self.is_cached = is_cached
+        self.top_n = top_n
+        self.rate = rate
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'runs': 0, 'prefetched': 0, 'already_cached': 0, 'errors': 0, 'last_run': None}
+
+    def run_once(self):
+        """
+        Warm the current top keys, pacing upstream lookups to `rate`
+
+        Returns:
+            int: Number of keys prefetched
+        """
+        prefetched = 0
+        pause = 1.0 / self.rate if self.rate > 0 else 0
+        for brand, model in self.recorder.top(self.top_n):
+            if self._stop.is_set():
+                break
+            if self.is_cached(brand, model):
+                self._stats['already_cached'] += 1
+                continue
+            try:
+                self.lookup(brand, model)
+                prefetched += 1
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.warning(f"Cache warmup failed for {brand} {model}: {str(e)}")
+            if self._stop.wait(pause):
+                break
+        self._stats['runs'] += 1
+        self._stats['prefetched'] += prefetched
+        self._stats['last_run'] = time.time()
+        self.recorder.save()
+        if prefetched:
+            logger.info(f"Cache warmup: {prefetched} bikes prefetched")
+        return prefetched
+
+    def start(self):
+        """Start the background warmup thread (no-op if top_n <= 0)"""
+        if self.top_n <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='cache-warmer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread after the current lookup"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:  # pragma: no cover - keep the warmer alive
+                logger.error(f"Cache warmer error: {str(e)}")
+            if self.interval <= 0 or self._stop.wait(self.interval):
+                return
+
+    def stats(self):
+        """
+        Get warmup statistics
+
+        Returns:
+            dict: Run, prefetch and error counters plus the tracked key count
+        """
+        stats = dict(self._stats)
+        stats['tracked_keys'] = len(self.recorder)
+        stats['top_n'] = self.top_n
+        stats['rate'] = self.rate
+        return stats
@@ -3,7 +3,9 @@
 WSGI entry point for production deployment
 """
 
-from app import app
+from app import app, init_app
+
+init_app()
 
 if __name__ == "__main__":
     app.run()
\ No newline at end of file
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour la collecte des statistiques de requêtes
+Version 1.0
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module
+from analytics import EVENT_FIELDS, AnalyticsPipeline, HttpSink, JsonlSink
+
+def make_event(index=0):
+    return (time.time(), 'Trek', f'Domane {index}', 'compatible', 2, 'local', '127.0.0.1', 'tests')
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the analytics collector"""
+
+    batches = []
+    status = 200
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.batches.append(json.loads(body))
+        self.send_response(self.status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+class MemorySink:
+    """Sink keeping batches in memory"""
+
+    def __init__(self):
+        self.batches = []
+
+    def write(self, lines):
+        self.batches.append([json.loads(line) for line in lines])
+
+class FailingSink:
+    def write(self, lines):
+        raise OSError("disk full")
+
+class TestAnalyticsPipeline(unittest.TestCase):
+    """Test cases for the queue and the flusher"""
+
+    def test_batches_by_size(self):
+        """Test that a flush writes batches of at most batch_size events"""
+        sink = MemorySink()
+        pipeline = AnalyticsPipeline([sink], batch_size=4)
+        for index in range(10):
+            pipeline.emit(make_event(index))
+        self.assertEqual(pipeline.flush(), 10)
+        self.assertEqual([len(batch) for batch in sink.batches], [4, 4, 2])
+        self.assertEqual(sorted(sink.batches[0][0]), sorted(EVENT_FIELDS))
+        self.assertEqual(sink.batches[2][1]['model'], 'Domane 9')
+
+    def test_overflow_dropped_and_counted(self):
+        """Test that events beyond max_queue are dropped, not blocking"""
+        pipeline = AnalyticsPipeline([MemorySink()], max_queue=5)
+        for index in range(8):
+            pipeline.emit(make_event(index))
+        stats = pipeline.stats()
+        self.assertEqual(stats['queued'], 5)
+        self.assertEqual(stats['dropped'], 3)
+
+    def test_background_flush_on_interval(self):
+        """Test that the flusher writes queued events after flush_interval"""
+        sink = MemorySink()
+        pipeline = AnalyticsPipeline([sink], flush_interval=0.05)
+        pipeline.start()
+        try:
+            pipeline.emit(make_event())
+            deadline = time.monotonic() + 2
+            while not sink.batches and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            pipeline.stop()
+        self.assertEqual(len(sink.batches), 1)
+
+    def test_failing_sink_does_not_block_others(self):
+        """Test that a sink error is counted and the other sinks still get the batch"""
+        sink = MemorySink()
+        pipeline = AnalyticsPipeline([FailingSink(), sink])
+        pipeline.emit(make_event())
+        pipeline.flush()
+        self.assertEqual(len(sink.batches), 1)
+        self.assertEqual(pipeline.stats()['sink_errors'], 1)
+
+class TestSinks(unittest.TestCase):
+    """Test cases for the JSONL file and the HTTP collector"""
+
+    def test_jsonl_rotation(self):
+        """Test that the file is rotated once it would exceed max_bytes"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'analytics.jsonl')
+            sink = JsonlSink(path, max_bytes=200, backup_count=2)
+            for index in range(10):
+                sink.write([json.dumps({'index': index, 'padding': 'x' * 50})])
+            self.assertTrue(os.path.exists(path + '.1'))
+            self.assertTrue(os.path.exists(path + '.2'))
+            self.assertFalse(os.path.exists(path + '.3'))
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.loads(f.readlines()[-1])['index'], 9)
+
+    def test_http_collector(self):
+        """Test batches posted to a local stand-in collector"""
+        CollectorHandler.batches = []
+        server = ThreadingHTTPServer(('127.0.0.1', 0), CollectorHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/events"
+            pipeline = AnalyticsPipeline([HttpSink(url, timeout=2)], batch_size=3)
+            for index in range(5):
+                pipeline.emit(make_event(index))
+            pipeline.flush()
+
+            CollectorHandler.status = 503
+            pipeline.emit(make_event())
+            pipeline.flush()
+        finally:
+            CollectorHandler.status = 200
+            server.shutdown()
+            server.server_close()
+        self.assertEqual([len(batch) for batch in CollectorHandler.batches], [3, 2, 1])
+        self.assertEqual(CollectorHandler.batches[1][0]['brand'], 'Trek')
+        self.assertEqual(pipeline.stats()['sink_errors'], 1)
+
+class TestCompatRequestEvents(unittest.TestCase):
+    """Test cases for events queued by the compat route"""
+
+    def setUp(self):
+        self.original = app_module.analytics
+        self.pipeline = AnalyticsPipeline([MemorySink()])
+        app_module.analytics = self.pipeline
+
+    def tearDown(self):
+        app_module.analytics = self.original
+
+    def test_compat_request_queued(self):
+        """Test that a compat request queues one event without writing it"""
+        client = app_module.app.test_client()
+        client.get('/api/compat?brand=Trek&model=Domane SL 2023', headers={'User-Agent': 'widget'})
+        self.assertEqual(self.pipeline.stats()['queued'], 1)
+
+        sink = self.pipeline.sinks[0]
+        self.pipeline.flush()
+        event = sink.batches[0][0]
+        self.assertEqual(event['model'], 'Domane SL 2023')
+        self.assertEqual(event['source'], 'local')
+        self.assertEqual(event['user_agent'], 'widget')
+
+    def test_analytics_error_does_not_fail_request(self):
+        """Test that a broken pipeline never fails the request"""
+        def broken(event):
+            raise RuntimeError("broken")
+        self.pipeline.emit = broken
+        response = app_module.app.test_client().get('/api/compat?brand=Trek&model=Domane SL 2023')
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
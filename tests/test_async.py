@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour le client GeometryGeeks asyncio et les endpoints ASGI
+Version 1.0
+"""
+
+import unittest
+import asyncio
+import json
+import tempfile
+import threading
+import time
+import sys
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module
+from async_client import AsyncUpstreamClient
+from asgi import application
+from cache import LookupCache, PersistentCache
+from http_client import UpstreamUnavailable
+from warmup import TrafficRecorder
+
+class SlowStandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the GeometryGeeks API answering after a delay"""
+
+    protocol_version = 'HTTP/1.1'
+    delay = 0.0
+    # Status codes returned for successive requests, then 200
+    statuses = []
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        status = self.statuses.pop(0) if self.statuses else 200
+        query = parse_qs(urlparse(self.path).query)
+        body = json.dumps([{
+            'brand': query.get('brand', ['Ghost'])[0],
+            'model': query.get('model', ['Lanao'])[0],
+            'wheel_axle_front': 'QR',
+            'fork_spacing_mm': 100,
+            'down_tube_length_mm': 450
+        }]).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog sized for bursts of connections"""
+
+    request_queue_size = 512
+    daemon_threads = True
+
+class StandInServerTestCase(unittest.TestCase):
+    """Runs the stand-in server for the whole test class"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandInServer(('127.0.0.1', 0), SlowStandInHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        SlowStandInHandler.delay = 0.0
+        SlowStandInHandler.statuses = []
+
+class TestAsyncUpstreamClient(StandInServerTestCase):
+    """Test cases for the asyncio client against a local stand-in server"""
+
+    def test_concurrent_waits_share_one_thread(self):
+        """Test that many slow lookups wait concurrently on the event loop"""
+        SlowStandInHandler.delay = 0.3
+        client = AsyncUpstreamClient(self.base_url, timeout=5, pool_size=100, max_concurrent=1000)
+
+        async def run():
+            try:
+                return await asyncio.gather(*(client.get('/bikes', params={'model': str(i)}) for i in range(100)))
+            finally:
+                await client.aclose()
+
+        started = time.perf_counter()
+        responses = asyncio.run(run())
+        elapsed = time.perf_counter() - started
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        # Sequential waits would take 30 s
+        self.assertLess(elapsed, 3.0)
+        self.assertEqual(client.stats()['in_flight'], 0)
+
+    def test_retries_transient_errors(self):
+        """Test that a 503 is retried within the budget"""
+        SlowStandInHandler.statuses = [503]
+        client = AsyncUpstreamClient(self.base_url, timeout=2, backoff=0.01)
+
+        async def run():
+            try:
+                return await client.get('/bikes')
+            finally:
+                await client.aclose()
+
+        self.assertEqual(asyncio.run(run()).status_code, 200)
+        self.assertEqual(client.stats()['retries'], 1)
+
+    def test_session_closed_when_loop_changes(self):
+        """Test that the pool of a previous event loop is closed, not leaked"""
+        client = AsyncUpstreamClient(self.base_url, timeout=2)
+        sessions = []
+
+        async def run():
+            response = await client.get('/bikes')
+            sessions.append(client._session)
+            return response
+
+        # A loop still running in another thread closes its session itself
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(run(), loop).result(5)
+            asyncio.run(run())
+            for _ in range(100):
+                if sessions[0].is_closed:
+                    break
+                time.sleep(0.01)
+            self.assertTrue(sessions[0].is_closed)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(5)
+            loop.close()
+
+        # asyncio.run() closes the session before closing its loop
+        self.assertTrue(sessions[1].is_closed)
+        asyncio.run(run())
+        self.assertIsNot(sessions[2], sessions[1])
+        self.assertEqual(client.stats()['requests'], 3)
+
+    def test_open_breaker_refuses_calls(self):
+        """Test that an open breaker fails fast without network"""
+        client = AsyncUpstreamClient(self.base_url, timeout=2)
+        for _ in range(5):
+            client.breaker.record(False, 0.1)
+        with self.assertRaises(UpstreamUnavailable):
+            asyncio.run(client.get('/bikes'))
+        self.assertEqual(client.stats()['requests'], 0)
+
+class TestAsgiEndpoints(StandInServerTestCase):
+    """Test cases for the async compat endpoints"""
+
+    def setUp(self):
+        super().setUp()
+        self.original = app_module.analyzer.async_geometry_geeks
+        self.geometry_geeks = app_module.AsyncGeometryGeeksAPI(
+            cache=LookupCache(),
+            client=AsyncUpstreamClient(self.base_url, timeout=2, backoff=0.01)
+        )
+        app_module.analyzer.async_geometry_geeks = self.geometry_geeks
+        self.original_recorder = app_module.traffic_recorder
+        app_module.traffic_recorder = TrafficRecorder()
+
+    def tearDown(self):
+        app_module.analyzer.async_geometry_geeks = self.original
+        app_module.traffic_recorder = self.original_recorder
+
+    def request(self, method, url, **kwargs):
+        async def run():
+            transport = httpx.ASGITransport(app=application)
+            try:
+                async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                    return await client.request(method, url, **kwargs)
+            finally:
+                await self.geometry_geeks.client.aclose()
+        return asyncio.run(run())
+
+    def test_local_bike_matches_flask(self):
+        """Test that a catalog bike gets the same body as the Flask route"""
+        url = '/api/compat?brand=Trek&model=Domane SL 2023'
+        response = self.request('GET', url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, app_module.app.test_client().get(url).data)
+
+    def test_geometry_geeks_bike(self):
+        """Test that an unknown bike is looked up through the async client"""
+        response = self.request('GET', '/api/compat', params={'brand': 'Ghost', 'model': 'Lanao 9'})
+        data = response.json()
+        self.assertEqual(data['data_source'], 'geometrygeeks')
+        self.assertEqual(data['status'], 'compatible')
+        self.assertEqual(self.geometry_geeks.client.stats()['requests'], 1)
+
+    def test_concurrent_requests_coalesced(self):
+        """Test that a burst of identical requests makes one upstream call"""
+        SlowStandInHandler.delay = 0.2
+
+        async def run():
+            transport = httpx.ASGITransport(app=application)
+            try:
+                async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                    return await asyncio.gather(*(
+                        client.get('/api/compat', params={'brand': 'Ghost', 'model': 'Lanao 7'}) for _ in range(50)
+                    ))
+            finally:
+                await self.geometry_geeks.client.aclose()
+
+        responses = asyncio.run(run())
+        self.assertTrue(all(response.json()['data_source'] == 'geometrygeeks' for response in responses))
+        self.assertEqual(self.geometry_geeks.client.stats()['requests'], 1)
+        self.assertEqual(self.geometry_geeks.cache.stats()['coalesced'], 49)
+
+    def test_missing_parameters(self):
+        """Test that brand and model are required"""
+        response = self.request('GET', '/api/compat?brand=Trek')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_keeps_input_order(self):
+        """Test that batch results come back in input order"""
+        bikes = [{'brand': 'Ghost', 'model': f'Lanao {i}'} for i in range(20)]
+        bikes.insert(5, {'brand': 'Trek', 'model': 'Domane SL 2023'})
+        bikes.append({'brand': 'Trek'})
+        response = self.request('POST', '/api/compat/batch', json={'bikes': bikes})
+        data = response.json()
+        self.assertEqual(data['count'], 22)
+        self.assertEqual(data['results'][5]['data_source'], 'local')
+        self.assertEqual(data['results'][6]['model'], 'Lanao 5')
+        self.assertEqual(data['results'][6]['data_source'], 'geometrygeeks')
+        self.assertEqual(data['results'][21]['error'], 'Missing required parameters')
+
+    def test_batch_stream(self):
+        """Test that ?stream=true returns one JSON line per item"""
+        bikes = [{'brand': 'Ghost', 'model': 'Lanao 1'}, {'brand': 'Trek', 'model': 'Domane SL 2023'}]
+        response = self.request('POST', '/api/compat/batch?stream=true', json={'bikes': bikes})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(response.headers['content-type'], 'application/x-ndjson')
+        self.assertEqual(sorted(line['index'] for line in lines), [0, 1])
+
+    def test_persistent_cache_used_off_the_event_loop(self):
+        """Test that the async routes make their SQLite calls from worker threads"""
+        threads = []
+
+        class RecordingCache(PersistentCache):
+            def get(self, *args):
+                threads.append(threading.current_thread())
+                return super().get(*args)
+
+            def set(self, *args):
+                threads.append(threading.current_thread())
+                return super().set(*args)
+
+        analyzer = app_module.analyzer
+        original = analyzer.persistent_cache
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = RecordingCache(os.path.join(tmpdir, 'cache.sqlite3'))
+            analyzer.persistent_cache = self.geometry_geeks.persistent_cache = cache
+            try:
+                response = self.request('GET', '/api/compat', params={'brand': 'Ghost', 'model': 'Lanao 11'})
+                self.assertEqual(response.json()['data_source'], 'geometrygeeks')
+                bikes = [{'brand': 'Ghost', 'model': 'Lanao 11'}, {'brand': 'Ghost', 'model': 'Lanao 12'}]
+                response = self.request('POST', '/api/compat/batch', json={'bikes': bikes})
+                self.assertEqual([r['data_source'] for r in response.json()['results']], ['geometrygeeks'] * 2)
+            finally:
+                analyzer.persistent_cache = original
+        # analysis get/set, geometrygeeks get/set, then the batch's reads and writes
+        self.assertGreaterEqual(len(threads), 6)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_clients_share_upstream_health(self):
+        """Test that the sync and async clients share one breaker and retry budget"""
+        sync_client = app_module.analyzer.geometry_geeks.client
+        async_client = self.original.client
+        self.assertIsNot(async_client, sync_client)
+        self.assertIs(async_client.breaker, sync_client.breaker)
+        self.assertIs(async_client.retry_budget, sync_client.retry_budget)
+
+    def test_other_routes_served_by_flask(self):
+        """Test that the remaining routes go through the WSGI app"""
+        response = self.request('GET', '/api/health')
+        self.assertEqual(response.json()['status'], 'healthy')
+        self.assertIn('async_client', response.json()['geometrygeeks'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
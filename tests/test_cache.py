@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour les caches de l'API Reebike
+Version 1.0
+"""
+
+import unittest
+import asyncio
+import tempfile
+import threading
+import time
+import sys
+import os
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from cache import LookupCache, PersistentCache, MISSING
+from app import GeometryGeeksAPI, CompatibilityAnalyzer, mock_data
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+class TestLookupCache(unittest.TestCase):
+    """Test cases for the in-process lookup cache"""
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = LookupCache(max_entries=3, ttl=10, negative_ttl=2, stale_ttl=5, clock=self.clock)
+    
+    def test_hit_avoids_loader(self):
+        """Test that a fresh entry is served without calling the loader"""
+        calls = []
+        loader = lambda: calls.append(1) or {'model': 'Domane'}
+        self.assertEqual(self.cache.get_or_load('k', loader), {'model': 'Domane'})
+        self.assertEqual(self.cache.get_or_load('k', loader), {'model': 'Domane'})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+    
+    def test_negative_entries_use_short_ttl(self):
+        """Test that misses are cached for negative_ttl only"""
+        self.cache.get_or_load('k', lambda: None)
+        self.assertIsNone(self.cache.get('k'))
+        self.clock.now += 3
+        self.assertIs(self.cache.get('k'), MISSING)
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, key)
+        self.cache.get('a')
+        self.cache.set('d', 'd')
+        self.assertIs(self.cache.get('b'), MISSING)
+        self.assertEqual(self.cache.get('a'), 'a')
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+    
+    def test_stale_while_revalidate(self):
+        """Test that stale entries are served while refreshed in background"""
+        self.cache.set('k', 'old')
+        self.clock.now += 12
+        refreshed = threading.Event()
+        
+        def loader():
+            refreshed.set()
+            return 'new'
+        
+        self.assertEqual(self.cache.get_or_load('k', loader), 'old')
+        self.assertTrue(refreshed.wait(2))
+        for _ in range(100):
+            if self.cache.get('k') == 'new':
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(self.cache.get('k'), 'new')
+        self.assertEqual(self.cache.stats()['stale_hits'], 1)
+    
+    def test_expired_beyond_stale_window_reloads(self):
+        """Test that entries past the stale window are reloaded synchronously"""
+        self.cache.set('k', 'old')
+        self.clock.now += 20
+        self.assertEqual(self.cache.get_or_load('k', lambda: 'new'), 'new')
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for coalescing concurrent misses"""
+    
+    def setUp(self):
+        self.cache = LookupCache()
+        self.release = threading.Event()
+        self.calls = []
+    
+    def run_concurrently(self, loader, count=20):
+        outcomes = [None] * count
+        
+        def lookup(index):
+            try:
+                outcomes[index] = self.cache.get_or_load('k', loader)
+            except Exception as e:
+                outcomes[index] = e
+        
+        threads = [threading.Thread(target=lookup, args=(index,)) for index in range(count)]
+        for thread in threads:
+            thread.start()
+        # Let every caller join the in-flight call before it completes
+        for _ in range(200):
+            if self.cache.stats()['coalesced'] == count - 1:
+                break
+            threading.Event().wait(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join(2)
+        return outcomes
+    
+    def test_concurrent_misses_share_one_load(self):
+        """Test that identical concurrent misses trigger a single loader call"""
+        def loader():
+            self.calls.append(1)
+            self.release.wait(2)
+            return {'model': 'Domane'}
+        
+        outcomes = self.run_concurrently(loader)
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(all(outcome is outcomes[0] for outcome in outcomes))
+        stats = self.cache.stats()
+        self.assertEqual((stats['misses'], stats['coalesced'], stats['loads_in_flight']), (1, 19, 0))
+    
+    def test_error_shared_and_not_cached(self):
+        """Test that waiters share the loader's exception and the next miss retries"""
+        def loader():
+            self.calls.append(1)
+            self.release.wait(2)
+            raise ConnectionError("upstream down")
+        
+        outcomes = self.run_concurrently(loader)
+        self.assertEqual(len(self.calls), 1)
+        self.assertTrue(all(isinstance(outcome, ConnectionError) for outcome in outcomes))
+        self.assertEqual(self.cache.get_or_load('k', lambda: 'ok'), 'ok')
+    
+    def test_async_misses_share_one_load(self):
+        """Test coalescing of concurrent coroutine lookups"""
+        async def loader():
+            self.calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'Domane'
+        
+        async def run():
+            return await asyncio.gather(*(self.cache.get_or_load_async('k', loader) for _ in range(50)))
+        
+        self.assertEqual(asyncio.run(run()), ['Domane'] * 50)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.cache.stats()['coalesced'], 49)
+    
+    def test_thread_and_coroutine_share_one_load(self):
+        """Test that a blocking load and async lookups of the same key coalesce both ways"""
+        def blocking_loader():
+            self.calls.append('thread')
+            self.release.wait(2)
+            return 'Domane'
+        
+        async def async_loader():
+            self.calls.append('async')
+            return 'Madone'
+        
+        thread = threading.Thread(target=lambda: self.cache.get_or_load('k', blocking_loader))
+        thread.start()
+        while not self.calls:
+            threading.Event().wait(0.01)
+        
+        async def run():
+            waiters = asyncio.gather(*(self.cache.get_or_load_async('k', async_loader) for _ in range(5)))
+            await asyncio.sleep(0.05)
+            self.release.set()
+            return await waiters
+        
+        self.assertEqual(asyncio.run(run()), ['Domane'] * 5)
+        thread.join(2)
+        self.assertEqual(self.calls, ['thread'])
+        
+        # And a thread joins a load started by a coroutine
+        outcome = []
+        
+        async def slow_loader():
+            self.calls.append('async')
+            await asyncio.sleep(0.1)
+            return 'Madone'
+        
+        async def run_async_first():
+            lookup = asyncio.ensure_future(self.cache.get_or_load_async('j', slow_loader))
+            await asyncio.sleep(0.01)
+            waiter = threading.Thread(target=lambda: outcome.append(self.cache.get_or_load('j', blocking_loader)))
+            waiter.start()
+            result = await lookup
+            await asyncio.to_thread(waiter.join, 2)
+            return result
+        
+        self.assertEqual(asyncio.run(run_async_first()), 'Madone')
+        self.assertEqual(outcome, ['Madone'])
+        self.assertEqual(self.calls, ['thread', 'async'])
+        self.assertEqual(self.cache.stats()['coalesced'], 6)
+
+class TestGeometryGeeksCache(unittest.TestCase):
+    """Test cases for the GeometryGeeks lookup cache"""
+    
+    def test_search_bike_keyed_on_normalized_name(self):
+        """Test that equivalent names share a single upstream lookup"""
+        api = GeometryGeeksAPI(cache=LookupCache())
+        calls = []
+        api.fetch_bike = lambda brand, model: calls.append((brand, model)) or None
+        
+        api.search_bike('Trek', 'Domane SL 2023')
+        api.search_bike(' trek ', 'domane  sl')
+        self.assertEqual(len(calls), 1)
+
+class TestPersistentCache(unittest.TestCase):
+    """Test cases for the shared SQLite cache"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'cache.sqlite3')
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_shared_between_instances(self):
+        """Test that a value written by one worker is read by another"""
+        writer = PersistentCache(self.path)
+        reader = PersistentCache(self.path)
+        writer.set('geometrygeeks', ['trek', 'domane sl'], {'model': 'Domane SL'}, ttl=60)
+        self.assertEqual(reader.get('geometrygeeks', ['trek', 'domane sl']), {'model': 'Domane SL'})
+        self.assertIs(reader.get('analysis', ['trek', 'domane sl']), MISSING)
+    
+    def test_wal_mode(self):
+        """Test that the database is opened in WAL mode"""
+        cache = PersistentCache(self.path)
+        mode = cache._connection().execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+    
+    def test_expired_entries_are_misses(self):
+        """Test TTL expiry and negative entries"""
+        cache = PersistentCache(self.path)
+        cache.set('ns', 'gone', 'value', ttl=-1)
+        cache.set('ns', 'negative', None, ttl=60)
+        self.assertIs(cache.get('ns', 'gone'), MISSING)
+        self.assertIsNone(cache.get('ns', 'negative'))
+    
+    def test_trim_bounds_size(self):
+        """Test size-bounded eviction"""
+        cache = PersistentCache(self.path, max_entries=5, trim_interval=1000)
+        for i in range(10):
+            cache.set('ns', i, i, ttl=60 + i)
+        cache.trim()
+        count = cache._connection().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+        self.assertEqual(count, 5)
+        self.assertIs(cache.get('ns', 0), MISSING)
+        self.assertEqual(cache.get('ns', 9), 9)
+    
+    def test_analysis_shared_across_analyzers(self):
+        """Test that an outcome computed by one worker is reused by another"""
+        bike = {'brand': 'Cube', 'model': 'Nuroad Race', 'wheel_axle_front': 'QR',
+                'fork_spacing_mm': 100, 'down_tube_length_mm': 320, 'source': 'geometrygeeks'}
+        first = CompatibilityAnalyzer(mock_data, persistent_cache=PersistentCache(self.path))
+        first.geometry_geeks.available = lambda: True
+        first.geometry_geeks.fetch_bike = lambda brand, model: bike
+        result = first.evaluate('Cube', 'Nuroad Race')
+        self.assertEqual(result['data_source'], 'geometrygeeks')
+        
+        second = CompatibilityAnalyzer(mock_data, persistent_cache=PersistentCache(self.path))
+        second.resolve_bike = None  # Must not be called
+        self.assertEqual(second.evaluate('cube', 'nuroad race'), result)
+    
+    def test_deadline_miss_not_persisted(self):
+        """Test that a lookup answered after the deadline serves the next request"""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        bike = {'brand': 'Ghost', 'model': 'Lanao 7', 'wheel_axle_front': 'QR',
+                'fork_spacing_mm': 100, 'down_tube_length_mm': 450}
+        
+        def slow_fetch(brand, model):
+            release.wait(2)
+            return bike
+        
+        cache = PersistentCache(self.path)
+        analyzer = CompatibilityAnalyzer(mock_data, persistent_cache=cache)
+        analyzer.deadline = 0.05
+        analyzer.geometry_geeks.available = lambda: True
+        analyzer.geometry_geeks.fetch_bike = slow_fetch
+        first, _ = analyzer.evaluate_response('Ghost', 'Lanao 7')
+        self.assertEqual((first['status'], first['data_source']), ('unknown', 'not_found'))
+        self.assertIs(cache.get('analysis', GeometryGeeksAPI.cache_key('Ghost', 'Lanao 7')), MISSING)
+        
+        release.set()
+        key = GeometryGeeksAPI.cache_key('Ghost', 'Lanao 7')
+        for _ in range(200):
+            if analyzer.geometry_geeks.cache.get(key) is not MISSING:
+                break
+            time.sleep(0.01)
+        second, _ = analyzer.evaluate_response('Ghost', 'Lanao 7')
+        self.assertEqual((second['status'], second['data_source']), ('compatible', 'geometrygeeks'))
+    
+    def test_refused_lookup_not_persisted(self):
+        """Test that a miss with the breaker open is not shared with other workers"""
+        cache = PersistentCache(self.path)
+        analyzer = CompatibilityAnalyzer(mock_data, persistent_cache=cache)
+        analyzer.geometry_geeks.available = lambda: False
+        result = analyzer.evaluate('Ghost', 'Lanao 8')
+        self.assertEqual(result['data_source'], 'not_found')
+        self.assertIs(cache.get('analysis', GeometryGeeksAPI.cache_key('Ghost', 'Lanao 8')), MISSING)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
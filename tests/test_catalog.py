@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour le catalogue local indexé
+Version 1.0
+"""
+
+import unittest
+import sys
+import os
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from catalog import CatalogIndex, PrefixIndex
+from matching import FuzzyMatcher, compact_model
+from app import mock_data
+
+def linear_find(bikes, brand, model):
+    """Reference implementation: the original linear scan"""
+    brand_lower = brand.lower().strip()
+    model_lower = model.lower().strip()
+    for bike in bikes:
+        if bike.get('brand', '').lower() == brand_lower and model_lower in bike.get('model', '').lower():
+            return bike
+    return None
+
+class TestCatalogIndex(unittest.TestCase):
+    """Test cases for the catalog index"""
+    
+    def setUp(self):
+        self.bikes = [
+            {'brand': 'Trek', 'model': 'Domane SL 2023'},
+            {'brand': 'Trek', 'model': 'Domane SLR 2023'},
+            {'brand': 'Trek', 'model': 'Madone SLR 2023'},
+            {'brand': 'Specialized', 'model': 'Tarmac SL6 2022'},
+            {'brand': 'Decathlon', 'model': 'Rockrider ST 540'}
+        ]
+        self.catalog = CatalogIndex(self.bikes)
+    
+    def test_matches_linear_scan(self):
+        """Test that indexed lookups return exactly what the linear scan returns"""
+        queries = [
+            ('Trek', 'Domane'), ('trek', 'domane slr'), ('Trek', 'SLR'), ('Trek', 'ane S'),
+            ('Trek', 'sl 2023'), ('Trek', 'Domane  SL'), ('Trek', 'Fuel'), ('Specialized', 'sl6'),
+            ('Decathlon', 'st 540'), ('Decathlon', 'ST540'), ('Unknown', 'Domane'), (' Trek ', ' madone '),
+            ('Trek', 'domane slr 2023'), ('Trek', 'ne sl 20'), ('Trek', 'ne s 20'), ('Trek', 'e'), ('Trek', 'r 2')
+        ]
+        for brand, model in queries:
+            self.assertIs(self.catalog.find(brand, model), linear_find(self.bikes, brand, model), (brand, model))
+    
+    def test_matches_linear_scan_on_mock_catalog(self):
+        """Test equivalence on every substring of the shipped catalog models"""
+        bikes = mock_data['bikes']
+        catalog = CatalogIndex(bikes)
+        for bike in bikes:
+            model = bike['model']
+            for start in range(0, len(model), 3):
+                query = model[start:start + 7]
+                self.assertIs(catalog.find(bike['brand'], query), linear_find(bikes, bike['brand'], query))
+    
+    def test_lookup_does_not_scan_token_vocabulary(self):
+        """Test that candidates come from the indexes, not from a pass over the brand's tokens"""
+        class NoScanDict(dict):
+            def __iter__(self):
+                raise AssertionError("token vocabulary scanned")
+            
+            def items(self):
+                raise AssertionError("token vocabulary scanned")
+        
+        bikes = [{'brand': 'Trek', 'model': f'Model {index} X{index}'} for index in range(200)]
+        catalog = CatalogIndex(bikes)
+        catalog._brand_tokens['trek'] = NoScanDict(catalog._brand_tokens['trek'])
+        self.assertIs(catalog.find('Trek', 'x150'), bikes[150])
+        self.assertIs(catalog.find('Trek', '99 X9'), bikes[99])
+        self.assertIs(catalog.find('Trek', 'model 7 x7'), bikes[7])
+        self.assertEqual(catalog._candidates('trek', ['x199']), [199])
+    
+    def test_brands(self):
+        """Test precomputed brand list and brand lookups"""
+        self.assertEqual(self.catalog.brands, ['Decathlon', 'Specialized', 'Trek'])
+        self.assertTrue(self.catalog.has_brand('TREK'))
+        self.assertFalse(self.catalog.has_brand('Giant'))
+        self.assertEqual(len(self.catalog.brand_bikes('trek')), 3)
+
+class TestPrefixIndex(unittest.TestCase):
+    """Test cases for the sorted-array prefix index"""
+    
+    def test_search_range_and_limit(self):
+        """Test prefix range, key ordering, deduplication and limit"""
+        index = PrefixIndex([('domane sl', 1), ('sl', 1), ('madone slr', 2), ('slr', 2), ('emonda', 3)])
+        self.assertEqual(index.search('sl'), [1, 2])
+        self.assertEqual(index.search('sl', limit=1), [1])
+        self.assertEqual(index.search('x'), [])
+        self.assertEqual(index.search(''), [1, 3, 2])
+
+class TestFuzzyMatcher(unittest.TestCase):
+    """Test cases for fuzzy model matching"""
+    
+    def setUp(self):
+        self.bikes = [
+            {'brand': 'Trek', 'model': 'Domane SL 5'},
+            {'brand': 'Trek', 'model': 'Madone SLR 2023'},
+            {'brand': 'Specialized', 'model': 'Tarmac SL6 2022'},
+            {'brand': 'Decathlon', 'model': 'Rockrider ST 540'}
+        ]
+        self.matcher = FuzzyMatcher(self.bikes, threshold=0.7)
+    
+    def test_compact_model(self):
+        """Test that spacing and year do not affect the compact key"""
+        self.assertEqual(compact_model('Domane SL 5'), compact_model('domane sl5'))
+        self.assertEqual(compact_model('Tarmac SL6 2022'), 'tarmacsl6')
+    
+    def test_spacing_variants_match(self):
+        """Test that spacing variants resolve with full confidence"""
+        bike, score = self.matcher.match('Trek', 'Domane SL5')
+        self.assertIs(bike, self.bikes[0])
+        self.assertEqual(score, 1.0)
+    
+    def test_partial_model_matches(self):
+        """Test that a contained model code is accepted"""
+        bike, score = self.matcher.match('Decathlon', 'ST540')
+        self.assertIs(bike, self.bikes[3])
+        self.assertGreaterEqual(score, 0.7)
+    
+    def test_different_digits_rejected(self):
+        """Test that a different model number is never matched"""
+        bike, _ = self.matcher.match('Specialized', 'Tarmac SL7')
+        self.assertIsNone(bike)
+    
+    def test_threshold(self):
+        """Test that low-scoring candidates are rejected"""
+        bike, score = self.matcher.match('Trek', 'Emonda ALR')
+        self.assertIsNone(bike)
+        self.assertLess(score, 0.7)
+        self.assertIsNone(self.matcher.match('Trek', 'Domane SL5', threshold=1.1)[0])
+    
+    def test_other_brand_not_considered(self):
+        """Test that only bikes of the requested brand are candidates"""
+        self.assertEqual(self.matcher.rank('Giant', 'Domane SL5'), [])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
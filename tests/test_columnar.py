@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour l'évaluation vectorisée du catalogue
+Version 1.0
+"""
+
+import unittest
+import json
+import random
+import sys
+import os
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import columnar
+from app import app, analyzer, REQUIRED_FIELDS, TUBE_FIELDS
+
+def random_specs(rng, count):
+    """Generate specs covering missing, float and out-of-range values"""
+    axles = ['QR', 'Thru-axle', 'qr', None]
+    forks = [100, 100.0, 110, 130, None]
+    tubes = [None, 250, 299, 299.5, 300, 300.0, 350]
+    return [{
+        'brand': 'Test',
+        'model': f'Bike {i}',
+        'wheel_axle_front': rng.choice(axles),
+        'fork_spacing_mm': rng.choice(forks),
+        'down_tube_length_mm': rng.choice(tubes),
+        'seat_tube_length_mm': rng.choice(tubes)
+    } for i in range(count)]
+
+@unittest.skipUnless(columnar.available(), "NumPy not installed")
+class TestColumnarSpecs(unittest.TestCase):
+    """Test cases for vectorized kit eligibility"""
+    
+    def setUp(self):
+        self.bikes = random_specs(random.Random(42), 2000)
+        self.columns = columnar.ColumnarSpecs(self.bikes)
+    
+    def test_kits_match_per_bike_path(self):
+        """Test that vectorized eligibility equals check_compatibility for every bike"""
+        eligibility = self.columns.kit_eligibility(analyzer.rules)
+        for row, bike in enumerate(self.bikes):
+            expected = analyzer.check_compatibility(bike)
+            actual = [kit for kit in ('Cosmopolit', 'Urban', 'Explorer') if eligibility[kit][row]]
+            self.assertEqual(actual, expected, bike)
+    
+    def test_missing_mask_matches_analyzer(self):
+        """Test that the vectorized missing-data mask equals _has_missing_data"""
+        missing = self.columns.missing_data_mask(REQUIRED_FIELDS, TUBE_FIELDS)
+        for row, bike in enumerate(self.bikes):
+            self.assertEqual(bool(missing[row]), analyzer._has_missing_data(bike), bike)
+    
+    def test_malformed_values_never_qualify(self):
+        """Test that non-numeric measurements are treated as not qualifying"""
+        columns = columnar.ColumnarSpecs([
+            {'wheel_axle_front': 'QR', 'fork_spacing_mm': '100', 'down_tube_length_mm': 320},
+            {'wheel_axle_front': 'QR', 'fork_spacing_mm': 100, 'down_tube_length_mm': 'long'}
+        ])
+        self.assertEqual(list(columns.equals('fork_spacing_mm', 100)), [False, True])
+        self.assertEqual(list(columns.at_least('down_tube_length_mm', 300)), [True, False])
+
+class TestCatalogReportAPI(unittest.TestCase):
+    """Test cases for catalog-wide endpoints"""
+    
+    def setUp(self):
+        self.app = app.test_client()
+    
+    def test_catalog_report(self):
+        """Test status and kit counts for the shipped catalog"""
+        data = json.loads(self.app.get('/api/catalog/report').data)
+        self.assertEqual(sum(data['statuses'].values()), data['bikes_count'])
+        self.assertLessEqual(data['kits']['Urban'], data['kits']['Cosmopolit'])
+    
+    def test_kit_bikes(self):
+        """Test listing bikes compatible with a kit"""
+        data = json.loads(self.app.get('/api/kits/urban/bikes').data)
+        self.assertEqual(data['kit'], 'Urban')
+        self.assertIn({'brand': 'Trek', 'model': 'Domane SL 2023'}, data['bikes'])
+        self.assertNotIn({'brand': 'Trek', 'model': 'Madone SLR 2023'}, data['bikes'])
+        self.assertEqual(self.app.get('/api/kits/unknown/bikes').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -8,11 +8,15 @@ import unittest
 import json
 import sys
 import os
+import threading
+import time
+from unittest import mock
 
 # Add backend directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
-from app import app, analyzer
+from app import app, analyzer, CompatibilityAnalyzer, mock_data
+from cache import LookupCache
 
 class TestCompatibilityAPI(unittest.TestCase):
     """Test cases for the compatibility API"""
@@ -89,6 +93,60 @@ class TestCompatibilityAPI(unittest.TestCase):
         self.assertIsInstance(data['brands'], list)
         self.assertGreater(data['count'], 0)
     
+    def test_compatibility_resolves_bike_once(self):
+        """Test that each request performs a single upstream lookup"""
+        analyzer.geometry_geeks.cache.clear()
+        with mock.patch.object(analyzer.geometry_geeks, 'available', return_value=True), \
+                mock.patch.object(analyzer.geometry_geeks, 'search_bike', return_value=None) as search:
+            response = self.app.get('/api/compat?brand=Trek&model=Fuel EX 2023')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(search.call_count, 1)
+        data = json.loads(response.data)
+        self.assertEqual(data['data_source'], 'not_found')
+    
+    def test_catalog_hit_stable_across_requests(self):
+        """Test that a catalog bike keeps its answer and never calls upstream"""
+        analyzer.geometry_geeks.cache.clear()
+        upstream_bike = {'brand': 'Trek', 'model': 'Domane SL 2023', 'wheel_axle_front': 'Thru-axle',
+                         'fork_spacing_mm': 100, 'down_tube_length_mm': 340, 'source': 'geometrygeeks'}
+        with mock.patch.object(analyzer.geometry_geeks, 'available', return_value=True), \
+                mock.patch.object(analyzer.geometry_geeks, 'fetch_bike', return_value=upstream_bike) as fetch:
+            answers = []
+            for _ in range(2):
+                data = json.loads(self.app.get('/api/compat?brand=Trek&model=Domane SL 2023').data)
+                answers.append((data['data_source'], data['status']))
+        
+        self.assertEqual(answers, [('local', 'compatible')] * 2)
+        self.assertEqual(fetch.call_count, 0)
+    
+    def test_brands_prefix_search(self):
+        """Test brand autocomplete by prefix"""
+        response = self.app.get('/api/brands?prefix=sp')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['brands'], ['Specialized'])
+    
+    def test_models_autocomplete(self):
+        """Test model autocomplete for a brand"""
+        response = self.app.get('/api/models?brand=trek&prefix=dom')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['models'], [{'brand': 'Trek', 'model': 'Domane SL 2023'}])
+        
+        # Word starts inside the model name also match
+        data = json.loads(self.app.get('/api/models?brand=Trek&prefix=slr').data)
+        self.assertEqual([m['model'] for m in data['models']], ['Madone SLR 2023'])
+    
+    def test_models_autocomplete_validation(self):
+        """Test autocomplete parameter validation"""
+        self.assertEqual(self.app.get('/api/models?prefix=dom').status_code, 400)
+        self.assertEqual(self.app.get('/api/models?brand=Trek&limit=0').status_code, 400)
+        self.assertEqual(self.app.get('/api/brands?prefix=t&limit=abc').status_code, 400)
+        
+        data = json.loads(self.app.get('/api/models?brand=Trek&limit=2').data)
+        self.assertEqual(data['count'], 2)
+    
     def test_404_endpoint(self):
         """Test 404 handling"""
         response = self.app.get('/api/nonexistent')
@@ -113,6 +171,18 @@ class TestCompatibilityAnalyzer(unittest.TestCase):
         self.assertIsNotNone(bike)
         self.assertEqual(bike['brand'], 'Trek')
     
+    def test_resolve_bike_metadata(self):
+        """Test resolved bike carries spec, source and timings"""
+        resolved = analyzer.resolve_bike('Trek', 'Domane SL 2023')
+        self.assertTrue(resolved.found)
+        self.assertEqual(resolved.source, 'local')
+        self.assertEqual(resolved.bike['brand'], 'Trek')
+        self.assertGreaterEqual(resolved.elapsed_ms, 0)
+        
+        missing = analyzer.resolve_bike('NonExistent', 'Model')
+        self.assertFalse(missing.found)
+        self.assertEqual(missing.source, 'not_found')
+    
     def test_find_bike_not_found(self):
         """Test finding non-existent bike"""
         bike = analyzer.find_bike('NonExistent', 'Model')
@@ -177,6 +247,134 @@ class TestCompatibilityAnalyzer(unittest.TestCase):
         self.assertEqual(result['status'], 'unknown')
         self.assertEqual(result['notes'], 'Certaines données sont manquantes, contactez notre équipe.')
 
+class TestBatchCompatibilityAPI(unittest.TestCase):
+    """Test cases for the batch compatibility endpoint"""
+    
+    def setUp(self):
+        self.app = app.test_client()
+        analyzer.geometry_geeks.cache.clear()
+        # Earlier tests may have opened the breaker against the real upstream
+        patcher = mock.patch.object(analyzer.geometry_geeks, 'available', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def post_batch(self, bikes, **kwargs):
+        return self.app.post('/api/compat/batch', data=json.dumps({'bikes': bikes}),
+                             content_type='application/json', **kwargs)
+    
+    def test_batch_results_in_input_order(self):
+        """Test per-item results keep the /api/compat shape and input order"""
+        with mock.patch.object(analyzer.geometry_geeks, 'search_bike', return_value=None) as search:
+            response = self.post_batch([
+                {'brand': 'Trek', 'model': 'Domane SL 2023'},
+                {'brand': 'Trek', 'model': 'Madone SLR 2023'},
+                {'brand': 'Trek', 'model': 'Fuel EX 2023'},
+                {'brand': 'Trek'}
+            ])
+        
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data)['results']
+        self.assertEqual([r.get('status') for r in results], ['compatible', 'incompatible', 'unknown', None])
+        self.assertEqual(results[0]['data_source'], 'local')
+        self.assertEqual(results[0]['model'], 'Domane SL 2023')
+        self.assertIn('error', results[3])
+        # Local hits are answered without upstream calls
+        self.assertEqual(search.call_count, 1)
+    
+    def test_batch_deduplicates_keys(self):
+        """Test identical bikes are looked up once"""
+        bikes = [{'brand': 'Trek', 'model': 'Fuel EX'}, {'brand': ' trek', 'model': 'fuel  ex '}] * 3
+        with mock.patch.object(analyzer.geometry_geeks, 'search_bike', return_value=None) as search:
+            response = self.post_batch(bikes)
+        
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual(json.loads(response.data)['count'], 6)
+    
+    def test_batch_deduplicates_on_cache_key(self):
+        """Test pairs sharing a lookup cache key are resolved once"""
+        bikes = [{'brand': 'Trek', 'model': 'Fuel EX 2023'}, {'brand': 'Trek', 'model': 'Fuel EX bike'}]
+        with mock.patch.object(analyzer.geometry_geeks, 'search_bike', return_value=None) as search:
+            response = self.post_batch(bikes)
+        
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual(json.loads(response.data)['count'], 2)
+    
+    def test_batch_deadline(self):
+        """Test lookups still pending at the batch deadline answer unknown"""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        
+        def slow_search(brand, model):
+            release.wait(2)
+            return None
+        
+        with mock.patch.object(analyzer.geometry_geeks, 'search_bike', side_effect=slow_search):
+            started = time.perf_counter()
+            results = {index: result for index, _, result in analyzer.evaluate_batch(
+                [('Trek', 'Fuel EX'), ('Trek', 'Domane SL 2023')], deadline=0.05)}
+        
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual((results[0]['status'], results[0]['data_source']), ('unknown', 'not_found'))
+        self.assertEqual(results[1]['data_source'], 'local')
+    
+    def test_batch_streaming_ndjson(self):
+        """Test NDJSON streaming with input indexes"""
+        with mock.patch.object(analyzer.geometry_geeks, 'search_bike', return_value=None):
+            response = self.post_batch([
+                {'brand': 'Trek', 'model': 'Fuel EX'},
+                {'brand': 'Giant', 'model': 'Defy Advanced 2023'}
+            ], query_string={'stream': 'true'})
+        
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        self.assertEqual(sorted(line['index'] for line in lines), [0, 1])
+        by_index = {line['index']: line for line in lines}
+        self.assertEqual(by_index[1]['status'], 'compatible')
+    
+    def test_batch_validation(self):
+        """Test invalid batch bodies"""
+        self.assertEqual(self.post_batch([]).status_code, 400)
+        response = self.app.post('/api/compat/batch', data='nope', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+class TestDeadlineResolution(unittest.TestCase):
+    """Test cases for concurrent local/GeometryGeeks resolution"""
+    
+    def setUp(self):
+        self.analyzer = CompatibilityAnalyzer(mock_data)
+        self.analyzer.geometry_geeks.cache = LookupCache()
+        self.analyzer.deadline = 0.05
+        self.release = threading.Event()
+        
+        def slow_fetch(brand, model):
+            self.release.wait(2)
+            return {'brand': brand, 'model': model, 'source': 'geometrygeeks'}
+        
+        self.analyzer.geometry_geeks.fetch_bike = slow_fetch
+    
+    def tearDown(self):
+        self.release.set()
+    
+    def test_local_hit_does_not_wait_for_upstream(self):
+        """Test that a local hit answers while upstream is still in flight"""
+        started = time.perf_counter()
+        resolved = self.analyzer.resolve_bike('Trek', 'Domane SL 2023')
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(resolved.source, 'local')
+    
+    def test_deadline_bounds_upstream_wait(self):
+        """Test that a slow upstream is abandoned at the deadline and cached later"""
+        started = time.perf_counter()
+        resolved = self.analyzer.resolve_bike('Trek', 'Fuel EX 2023')
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(resolved.source, 'not_found')
+        self.assertTrue(resolved.timings['deadline_exceeded'])
+        
+        self.release.set()
+        self.analyzer._executor.shutdown(wait=True)
+        cached = self.analyzer.geometry_geeks.search_cached('Trek', 'Fuel EX 2023')
+        self.assertEqual(cached['source'], 'geometrygeeks')
+
 if __name__ == '__main__':
     # Run tests
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour les en-têtes de cache HTTP (ETag, Cache-Control, 304)
+Version 1.0
+"""
+
+import unittest
+import asyncio
+import gzip
+import os
+import sys
+
+import httpx
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module
+from asgi import application
+from http_cache import (CachePolicy, body_etag, brotli, cache_control, compress_body, etag_matches,
+                        negotiate_encoding)
+from records import BikeRecord
+from results import EncodedResponse
+
+class TestCacheHelpers(unittest.TestCase):
+    """Test cases for the caching helpers"""
+
+    def test_cache_control_values(self):
+        """Test Cache-Control formatting"""
+        self.assertEqual(cache_control(60, 600), 'public, max-age=60, stale-while-revalidate=600')
+        self.assertEqual(cache_control(60), 'public, max-age=60')
+        self.assertEqual(cache_control(0, 600), 'no-cache')
+
+    def test_unknown_status_shorter(self):
+        """Test that unknown answers get the shorter lifetime"""
+        policy = CachePolicy(compat_max_age=3600, unknown_max_age=300, stale_while_revalidate=86400)
+        self.assertEqual(policy.compat('compatible'), 'public, max-age=3600, stale-while-revalidate=86400')
+        self.assertEqual(policy.compat('unknown'), 'public, max-age=300, stale-while-revalidate=300')
+
+    def test_etag_matching(self):
+        """Test If-None-Match comparison"""
+        etag = body_etag(b'{}')
+        self.assertTrue(etag_matches(f'"other", "{etag}"', etag))
+        self.assertTrue(etag_matches(f'W/"{etag}"', etag))
+        self.assertTrue(etag_matches('*', etag))
+        self.assertFalse(etag_matches('"other"', etag))
+        self.assertFalse(etag_matches('', etag))
+
+    def test_encoding_negotiation(self):
+        """Test Accept-Encoding handling and the size threshold"""
+        self.assertEqual(negotiate_encoding('gzip, deflate', 1000), 'gzip')
+        self.assertIsNone(negotiate_encoding('gzip', 100))
+        self.assertIsNone(negotiate_encoding('gzip;q=0, deflate', 1000))
+        self.assertIsNone(negotiate_encoding('', 1000))
+
+    @unittest.skipUnless(brotli, "brotli not installed")
+    def test_brotli_preferred(self):
+        """Test that br is picked over gzip when both are accepted"""
+        self.assertEqual(negotiate_encoding('gzip, br', 1000), 'br')
+
+    def test_variants_compressed_once(self):
+        """Test that a variant is compressed on first use and then reused"""
+        encoded = EncodedResponse(b'{"brands":[]}' * 100)
+        gzipped = encoded.variant('gzip')
+        self.assertIs(encoded.variant('gzip'), gzipped)
+        self.assertEqual(gzip.decompress(gzipped), encoded.body)
+        self.assertEqual(compress_body(encoded.body, 'gzip'), gzipped)
+        self.assertNotEqual(encoded.etag_for('gzip'), encoded.etag_for(None))
+
+class TestConditionalRequests(unittest.TestCase):
+    """Test cases for validators on the Flask routes"""
+
+    def setUp(self):
+        self.client = app_module.app.test_client()
+
+    def test_compat_etag_and_304(self):
+        """Test that a repeated compat request with the tag gets a 304"""
+        url = '/api/compat?brand=Trek&model=Domane SL 2023'
+        response = self.client.get(url)
+        etag = response.headers['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertIn('max-age=3600', response.headers['Cache-Control'])
+
+        again = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.data, b'')
+        self.assertEqual(again.headers['ETag'], etag)
+
+        # Same bike, differently typed: same body, same tag
+        self.assertEqual(self.client.get('/api/compat?brand=trek&model=Domane SL 2023').headers['ETag'], etag)
+
+    def test_unknown_status_short_lifetime(self):
+        """Test the shorter Cache-Control of unknown answers"""
+        geometry_geeks = app_module.analyzer.geometry_geeks
+        geometry_geeks.available = lambda: False
+        try:
+            response = self.client.get('/api/compat?brand=Nobody&model=Nothing 1')
+        finally:
+            del geometry_geeks.available
+        self.assertEqual(response.get_json()['status'], 'unknown')
+        self.assertIn('max-age=300', response.headers['Cache-Control'])
+
+    def test_errors_not_cacheable(self):
+        """Test that error responses carry no validators"""
+        response = self.client.get('/api/compat?brand=Trek')
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('ETag', response.headers)
+
+    def test_brands_etag_per_query(self):
+        """Test brand list validators"""
+        response = self.client.get('/api/brands')
+        etag = response.headers['ETag']
+        self.assertEqual(self.client.get('/api/brands', headers={'If-None-Match': etag}).status_code, 304)
+        self.assertNotEqual(self.client.get('/api/brands?prefix=tr').headers['ETag'], etag)
+
+class TestEncodedResponseReuse(unittest.TestCase):
+    """Test cases for keeping encoded GeometryGeeks answers"""
+
+    def test_reused_while_record_unchanged(self):
+        """Test that the encoded answer follows the cached GeometryGeeks record"""
+        analyzer = app_module.analyzer
+        api = analyzer.geometry_geeks
+        key = api.cache_key('Ghost', 'Kato 4')
+        specs = {'brand': 'Ghost', 'model': 'Kato 4', 'wheel_axle_front': 'QR',
+                 'fork_spacing_mm': 100, 'down_tube_length_mm': 450, 'source': 'geometrygeeks'}
+        api.cache.set(key, BikeRecord(specs))
+        try:
+            _, first = analyzer.evaluate_response('Ghost', 'Kato 4')
+            self.assertIs(analyzer.evaluate_response('ghost', 'kato 4')[1], first)
+
+            api.cache.set(key, BikeRecord(dict(specs, fork_spacing_mm=135)))
+            result, refreshed = analyzer.evaluate_response('Ghost', 'Kato 4')
+            self.assertIsNot(refreshed, first)
+            self.assertEqual(result['data_source'], 'geometrygeeks')
+        finally:
+            api.cache.invalidate(key)
+            analyzer.responses.invalidate(key)
+
+class TestCompressedResponses(unittest.TestCase):
+    """Test cases for compressed variants on the Flask routes"""
+
+    def setUp(self):
+        self.threshold = app_module.app_config.RESPONSE_COMPRESS_MIN_BYTES
+        app_module.app_config.RESPONSE_COMPRESS_MIN_BYTES = 0
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        app_module.app_config.RESPONSE_COMPRESS_MIN_BYTES = self.threshold
+
+    def test_gzip_variant(self):
+        """Test that a gzip client gets the same body compressed, with its own tag"""
+        url = '/api/compat?brand=Trek&model=Domane SL 2023'
+        plain = self.client.get(url)
+        compressed = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(compressed.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(compressed.data), plain.data)
+        self.assertNotEqual(compressed.headers['ETag'], plain.headers['ETag'])
+
+    def test_304_per_variant(self):
+        """Test that a tag only validates the variant it was sent with"""
+        etag = self.client.get('/api/brands', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+        again = self.client.get('/api/brands', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(again.status_code, 304)
+        plain = self.client.get('/api/brands', headers={'If-None-Match': etag})
+        self.assertEqual(plain.status_code, 200)
+        self.assertNotIn('Content-Encoding', plain.headers)
+
+class TestAsgiConditionalRequests(unittest.TestCase):
+    """Test cases for validators on the async compat endpoint"""
+
+    def test_same_tag_and_304(self):
+        """Test that the ASGI endpoint sends the Flask tag and honours it"""
+        url = '/api/compat?brand=Trek&model=Domane SL 2023'
+        etag = app_module.app.test_client().get(url).headers['ETag']
+
+        async def run():
+            transport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                first = await client.get(url)
+                second = await client.get(url, headers={'If-None-Match': etag})
+                return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first.headers['etag'], etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertIn('max-age', second.headers['cache-control'])
+
+    def test_gzip_variant(self):
+        """Test that the ASGI endpoint compresses like the Flask route"""
+        url = '/api/compat?brand=Trek&model=Domane SL 2023'
+        threshold = app_module.app_config.RESPONSE_COMPRESS_MIN_BYTES
+        app_module.app_config.RESPONSE_COMPRESS_MIN_BYTES = 0
+        try:
+            expected = app_module.app.test_client().get(url, headers={'Accept-Encoding': 'gzip'})
+
+            async def run():
+                transport = httpx.ASGITransport(app=application)
+                async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                    return await client.get(url, headers={'Accept-Encoding': 'gzip'})
+
+            response = asyncio.run(run())
+        finally:
+            app_module.app_config.RESPONSE_COMPRESS_MIN_BYTES = threshold
+        self.assertEqual(response.headers['content-encoding'], 'gzip')
+        self.assertEqual(response.headers['etag'], expected.headers['ETag'])
+        self.assertEqual(response.content, gzip.decompress(expected.data))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour le client HTTP GeometryGeeks
+Version 1.0
+"""
+
+import unittest
+import json
+import threading
+import sys
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from http_client import CircuitBreaker, RetryBudget, UpstreamClient, UpstreamUnavailable
+from cache import LookupCache
+from app import app, GeometryGeeksAPI
+
+class FakeClock:
+    """Manually advanced clock"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the GeometryGeeks API"""
+    
+    protocol_version = 'HTTP/1.1'
+    # Status codes returned for successive requests, then 200
+    statuses = []
+    
+    def do_GET(self):
+        status = self.statuses.pop(0) if self.statuses else 200
+        body = json.dumps([{
+            'brand': 'Trek',
+            'model': 'Domane SL 2023',
+            'wheel_axle_front': 'QR',
+            'fork_spacing_mm': 100
+        }]).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for the circuit breaker"""
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(window=4, min_calls=4, failure_threshold=0.5,
+                                      latency_threshold=1.0, cooldown=10, clock=self.clock)
+    
+    def test_opens_on_error_rate(self):
+        """Test that the breaker opens once the failure rate crosses the threshold"""
+        for success in (True, True, False, False):
+            self.breaker.record(success, 0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+    
+    def test_opens_on_latency(self):
+        """Test that slow successful calls count as failures"""
+        for _ in range(4):
+            self.breaker.record(True, 2.0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+    
+    def test_half_open_probe(self):
+        """Test single probe after cooldown, closing on success"""
+        for _ in range(4):
+            self.breaker.record(False, 0.1)
+        self.clock.now += 11
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record(True, 0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+    
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe re-opens the breaker"""
+        for _ in range(4):
+            self.breaker.record(False, 0.1)
+        self.clock.now += 11
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(False, 0.1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+class TestRetryBudget(unittest.TestCase):
+    """Test cases for the retry budget"""
+    
+    def test_budget_limits_retries(self):
+        """Test that retries are bounded by deposited tokens"""
+        budget = RetryBudget(ratio=0.5, max_tokens=1, initial_tokens=0)
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+
+class TestUpstreamClient(unittest.TestCase):
+    """Test cases for the pooled client against a local stand-in server"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        StandInHandler.statuses = []
+        self.client = UpstreamClient(self.base_url, timeout=2, backoff=0.01)
+    
+    def test_keep_alive_reuses_connection(self):
+        """Test that successive calls share one pooled connection"""
+        for _ in range(3):
+            self.assertEqual(self.client.get('/bikes').status_code, 200)
+        pool = self.client.pool_stats()
+        self.assertEqual(pool['connections_opened'], 1)
+        self.assertEqual(pool['requests_sent'], 3)
+    
+    def test_retries_transient_errors(self):
+        """Test that a 503 is retried within the budget"""
+        StandInHandler.statuses = [503]
+        self.assertEqual(self.client.get('/bikes').status_code, 200)
+        self.assertEqual(self.client.stats()['retries'], 1)
+    
+    def test_open_breaker_refuses_calls(self):
+        """Test that an open breaker fails fast without network"""
+        for _ in range(5):
+            self.client.breaker.record(False, 0.1)
+        with self.assertRaises(UpstreamUnavailable):
+            self.client.get('/bikes')
+        self.assertEqual(self.client.stats()['requests'], 0)
+    
+    def test_geometry_geeks_parses_stand_in(self):
+        """Test GeometryGeeks lookups through the pooled client"""
+        api = GeometryGeeksAPI(cache=LookupCache(), client=self.client)
+        bike = api.search_bike('Trek', 'Domane SL 2023')
+        self.assertEqual(bike['source'], 'geometrygeeks')
+    
+    def test_local_only_when_breaker_open(self):
+        """Test that an open breaker skips GeometryGeeks and caches nothing"""
+        api = GeometryGeeksAPI(cache=LookupCache(), client=self.client)
+        for _ in range(5):
+            self.client.breaker.record(False, 0.1)
+        self.assertIsNone(api.search_bike('Trek', 'Domane SL 2023'))
+        self.assertEqual(len(api.cache), 0)
+
+class TestHealthEndpoint(unittest.TestCase):
+    """Test cases for upstream stats in the health endpoint"""
+    
+    def test_health_reports_breaker_and_pool(self):
+        """Test that breaker state and pool stats are exposed"""
+        response = app.test_client().get('/api/health')
+        data = json.loads(response.data)
+        self.assertIn(data['geometrygeeks']['client']['breaker']['state'],
+                      (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN))
+        self.assertIn('pool', data['geometrygeeks']['client'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour l'ingestion en flux des catalogues
+Version 1.0
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module
+import ingest
+from ingest import IngestError, InvalidRecord, iter_chunks, load_catalog, normalize_bike
+from records import BikeRecord
+
+BIKES = [
+    {'brand': 'Trek', 'model': 'FX 3', 'wheel_axle_front': 'QR', 'fork_spacing_mm': 100},
+    {'brand': 'Giant', 'model': 'Escape 2', 'down_tube_length_mm': 480.5},
+    {'brand': 'Cube', 'model': 'Nature', 'year': 2023}
+]
+
+class TestNormalizeBike(unittest.TestCase):
+    """Test cases for per-record normalization"""
+
+    def test_normalizes_text_and_numbers(self):
+        """Test that text is stripped and numeric strings are converted"""
+        bike = normalize_bike({'brand': ' Trek ', 'model': 'FX 3', 'fork_spacing_mm': '100',
+                               'down_tube_length_mm': ' 480.5', 'brake_type': ''})
+        self.assertIsInstance(bike, BikeRecord)
+        self.assertEqual(bike['brand'], 'Trek')
+        self.assertEqual(bike['fork_spacing_mm'], 100)
+        self.assertEqual(bike['down_tube_length_mm'], 480.5)
+        self.assertNotIn('brake_type', bike)
+
+    def test_rejects_invalid_records(self):
+        """Test that unusable records are rejected"""
+        for raw in (['Trek'], {'model': 'FX 3'}, {'brand': 'Trek', 'model': '  '},
+                    {'brand': 'Trek', 'model': 'FX 3', 'fork_spacing_mm': 'wide'},
+                    {'brand': 'Trek', 'model': 'FX 3', 'year': True}):
+            with self.assertRaises(InvalidRecord):
+                normalize_bike(raw)
+
+class TestStreamingLoad(unittest.TestCase):
+    """Test cases for streaming catalog files"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_catalog_document(self):
+        """Test that bikes are streamed and the other keys are kept"""
+        matrix = {'kits': {'Urban': {'requirements': {'wheel_axle_front': 'QR'}}}}
+        path = self.write('bikes.json', json.dumps({'version': 2, 'bikes': BIKES, 'compatibility_matrix': matrix}))
+        data, report = load_catalog(path)
+        self.assertEqual([bike['model'] for bike in data['bikes']], ['FX 3', 'Escape 2', 'Nature'])
+        self.assertEqual(data['compatibility_matrix'], matrix)
+        self.assertEqual(data['version'], 2)
+        self.assertEqual((report.records, report.bad), (3, 0))
+
+    def test_json_array_across_reads(self):
+        """Test that values split between reads are decoded whole"""
+        bikes = [dict(BIKES[0], model=f'FX {i}', fork_spacing_mm=100 + i) for i in range(200)]
+        path = self.write('bikes.json', json.dumps(bikes, indent=2))
+        original = ingest.READ_SIZE
+        ingest.READ_SIZE = 7
+        try:
+            data, report = load_catalog(path)
+        finally:
+            ingest.READ_SIZE = original
+        self.assertEqual(report.records, 200)
+        self.assertEqual(data['bikes'][123]['fork_spacing_mm'], 223)
+
+    def test_json_lines_skips_bad_records(self):
+        """Test that bad lines are counted without aborting the load"""
+        lines = [json.dumps({'compatibility_matrix': {'kits': {}}}), json.dumps(BIKES[0]), '{"brand": "Trek",',
+                 '', json.dumps({'brand': 'Trek'}), json.dumps(BIKES[1])]
+        path = self.write('bikes.jsonl', '\n'.join(lines) + '\n')
+        data, report = load_catalog(path)
+        self.assertEqual([bike['model'] for bike in data['bikes']], ['FX 3', 'Escape 2'])
+        self.assertEqual(data['compatibility_matrix'], {'kits': {}})
+        self.assertEqual(report.bad, 2)
+        self.assertEqual([error['position'] for error in report.errors], [3, 5])
+
+    def test_chunks_and_progress(self):
+        """Test that records are handed out in bounded chunks with progress"""
+        path = self.write('bikes.json', json.dumps(BIKES * 3))
+        progress = []
+        chunks = list(iter_chunks(path, chunk_size=4, on_progress=lambda report: progress.append(report.records)))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 1])
+        self.assertEqual(progress, [4, 8, 9])
+
+    def test_broken_document_raises(self):
+        """Test that a truncated JSON document stops the load"""
+        path = self.write('bikes.json', '{"bikes": [' + json.dumps(BIKES[0]) + ',')
+        with self.assertRaises(IngestError):
+            load_catalog(path)
+
+    def test_app_falls_back_on_broken_catalog(self):
+        """Test that the app starts on the fallback data when the catalog cannot be parsed"""
+        path = self.write('bikes.json', '{"bikes": [' + json.dumps(BIKES[0]) + ',')
+        with self.assertLogs('app', 'ERROR'):
+            data = app_module.load_mock_data(path)
+        self.assertEqual(data['bikes'], [])
+        self.assertIn('default_rules', data['compatibility_matrix'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour la journalisation asynchrone et échantillonnée
+Version 1.0
+"""
+
+import unittest
+import importlib
+import logging
+import os
+import queue
+import sys
+import tempfile
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import config
+import logging_setup
+from logging_setup import DroppingQueueHandler, SamplingFilter, configure_logging, sampled_logger
+
+class CountingArg:
+    """Log argument counting how often it is formatted"""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return 'arg'
+
+def make_record(level=logging.INFO, sample_type=None, args=()):
+    record = logging.LogRecord('tests', level, __file__, 1, 'message %s', args, None)
+    if sample_type is not None:
+        record.sample_type = sample_type
+    return record
+
+class TestSamplingFilter(unittest.TestCase):
+    """Test cases for per-type sampling"""
+
+    def test_fraction_of_sampled_type_kept(self):
+        """Test that 1 record in 100 of a 1% type is kept"""
+        values = iter([index / 100 for index in range(100)])
+        sampling = SamplingFilter({'compat': 0.01}, random_fn=lambda: next(values))
+        kept = sum(sampling.filter(make_record(sample_type='compat')) for _ in range(100))
+        self.assertEqual(kept, 1)
+        self.assertEqual(sampling.sampled_out, 99)
+
+    def test_errors_and_other_types_always_kept(self):
+        """Test that warnings, errors and unsampled types pass"""
+        sampling = SamplingFilter({'compat': 0.0})
+        self.assertTrue(sampling.filter(make_record(logging.ERROR, sample_type='compat')))
+        self.assertTrue(sampling.filter(make_record(logging.WARNING, sample_type='compat')))
+        self.assertTrue(sampling.filter(make_record(sample_type='lookup')))
+        self.assertTrue(sampling.filter(make_record()))
+        self.assertFalse(sampling.filter(make_record(sample_type='compat')))
+
+    def test_sampled_logger_skips_record_creation(self):
+        """Test that a sampled-out call never builds a record"""
+        original = logging_setup._sampling
+        logging_setup._sampling = SamplingFilter({'compat': 0.0})
+        handler = DroppingQueueHandler(queue.Queue())
+        logger = logging.getLogger('tests.sampled')
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            compat_log = sampled_logger(logger, 'compat')
+            arg = CountingArg()
+            compat_log.info("Compatibility check: %s", arg)
+            compat_log.error("Upstream failed: %s", arg)
+            sampled_logger(logger, 'other').info("Catalog reloaded")
+        finally:
+            logger.removeHandler(handler)
+            logging_setup._sampling = original
+        messages = [handler.queue.get_nowait() for _ in range(handler.queue.qsize())]
+        self.assertEqual([record.getMessage() for record in messages], ['Upstream failed: arg', 'Catalog reloaded'])
+        self.assertEqual(messages[0].funcName, 'test_sampled_logger_skips_record_creation')
+
+class TestDroppingQueueHandler(unittest.TestCase):
+    """Test cases for the non-blocking queue handler"""
+
+    def test_not_formatted_in_calling_thread(self):
+        """Test that queued records keep their arguments unformatted"""
+        handler = DroppingQueueHandler(queue.Queue())
+        arg = CountingArg()
+        handler.handle(make_record(args=(arg,)))
+        record = handler.queue.get_nowait()
+        self.assertEqual(arg.formatted, 0)
+        self.assertEqual(record.getMessage(), 'message arg')
+
+    def test_full_queue_drops(self):
+        """Test that records are dropped and counted when the queue is full"""
+        handler = DroppingQueueHandler(queue.Queue(2))
+        for _ in range(5):
+            handler.handle(make_record())
+        self.assertEqual(handler.queue.qsize(), 2)
+        self.assertEqual(handler.dropped, 3)
+
+class LogConfig:
+    LOG_LEVEL = 'INFO'
+    LOG_FILE = 'logs/test.log'
+    LOG_FILE_MAX_BYTES = 1024 * 1024
+    LOG_FILE_BACKUPS = 1
+    LOG_ASYNC = True
+    LOG_QUEUE_SIZE = 100
+    LOG_SAMPLE_RATES = {'compat': 0.0}
+
+class TestConfigureLogging(unittest.TestCase):
+    """Test cases for the configured handlers"""
+
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.handlers = list(self.root.handlers)
+        self.level = self.root.level
+        self.sampling = logging_setup._sampling
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        for handler in self.root.handlers[:]:
+            if handler not in self.handlers:
+                self.root.removeHandler(handler)
+        self.root.setLevel(self.level)
+        logging_setup._sampling = self.sampling
+        logging_setup._installed = None
+        self.tmpdir.cleanup()
+
+    def run_logging(self, config):
+        setup = configure_logging(config, self.tmpdir.name)
+        logger = logging.getLogger('tests.logging')
+        sampled_logger(logger, 'compat').info("Compatibility check: %s %s", 'Trek', 'Domane')
+        logger.info("Catalog reloaded")
+        logger.error("Upstream failed")
+        setup.stop()
+        for handler in setup.handlers:
+            handler.close()
+        with open(os.path.join(self.tmpdir.name, 'logs', 'test.log'), encoding='utf-8') as f:
+            return f.read(), setup
+
+    def test_async_file_logging(self):
+        """Test that the listener writes kept records to LOG_FILE"""
+        content, setup = self.run_logging(LogConfig)
+        self.assertIn('Catalog reloaded', content)
+        self.assertIn('ERROR tests.logging: Upstream failed', content)
+        self.assertNotIn('Compatibility check', content)
+        self.assertEqual(setup.stats()['sampled_out'], 1)
+        self.assertTrue(setup.stats()['async'])
+
+    def test_synchronous_mode(self):
+        """Test that LOG_ASYNC=False writes directly with the same sampling"""
+        class SyncConfig(LogConfig):
+            LOG_ASYNC = False
+
+        content, setup = self.run_logging(SyncConfig)
+        self.assertIn('Catalog reloaded', content)
+        self.assertNotIn('Compatibility check', content)
+        self.assertFalse(setup.stats()['async'])
+
+    def test_reconfiguring_replaces_handlers(self):
+        """Test that a second configuration stops the first one instead of doubling every record"""
+        first = configure_logging(LogConfig, self.tmpdir.name)
+        listener_thread = first.listener._thread
+        content, second = self.run_logging(LogConfig)
+        self.assertIsNone(first.listener)
+        self.assertFalse(listener_thread.is_alive())
+        self.assertNotIn(first.queue_handler, self.root.handlers)
+        self.assertEqual(content.count('Catalog reloaded'), 1)
+        second.remove()
+        self.assertNotIn(second.queue_handler, self.root.handlers)
+
+class TestLogLevelSettings(unittest.TestCase):
+    """Test cases for LOG_LEVEL in the environment configurations"""
+
+    def load_config(self, **environ):
+        """Reload the config module with environment variables set (None unsets them)"""
+        previous = {name: os.environ.get(name) for name in environ}
+        try:
+            self.set_environ(environ)
+            reloaded = importlib.reload(config)
+            return {name: reloaded.config[name] for name in ('development', 'production', 'testing')}
+        finally:
+            self.set_environ(previous)
+            importlib.reload(config)
+
+    @staticmethod
+    def set_environ(environ):
+        for name, value in environ.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    def test_env_overrides_every_environment(self):
+        """Test that LOG_LEVEL from the environment wins over the per-environment defaults"""
+        configs = self.load_config(LOG_LEVEL='ERROR')
+        for name, env_config in configs.items():
+            self.assertEqual(env_config.LOG_LEVEL, 'ERROR', name)
+
+    def test_production_keeps_sampled_info(self):
+        """Test that production logs INFO, so its INFO sample rates apply"""
+        configs = self.load_config(LOG_LEVEL=None)
+        self.assertEqual(configs['development'].LOG_LEVEL, 'DEBUG')
+        self.assertEqual(configs['production'].LOG_LEVEL, 'INFO')
+        self.assertEqual(configs['production'].LOG_SAMPLE_RATES['compat'], 0.01)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour l'endpoint de métriques Prometheus
+Version 1.0
+"""
+
+import unittest
+import asyncio
+import os
+import re
+import sys
+import threading
+
+import httpx
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module
+from asgi import application
+from metrics import MetricsRegistry
+
+SAMPLE_LINE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{[^}]*\})? [-+0-9.eInf]+$')
+
+def sample_value(text, name):
+    for line in text.splitlines():
+        if line.startswith(name + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for recording and rendering"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry(prefix='test')
+
+    def test_counter_labels(self):
+        """Test labelled counter samples"""
+        counter = self.registry.counter('requests', 'Requests', ('status',))
+        counter.inc('ok')
+        counter.inc('ok')
+        counter.inc('fail', amount=3)
+        text = self.registry.render()
+        self.assertIn('# TYPE test_requests_total counter', text)
+        self.assertIn('test_requests_total{status="ok"} 2', text)
+        self.assertIn('test_requests_total{status="fail"} 3', text)
+
+    def test_histogram_buckets(self):
+        """Test cumulative buckets, sum and count"""
+        histogram = self.registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        text = self.registry.render()
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="1"} 3', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 4', text)
+        self.assertEqual(sample_value(text, 'test_latency_seconds_sum'), 3.65)
+        self.assertEqual(sample_value(text, 'test_latency_seconds_count'), 4)
+
+    def test_unlabelled_metrics_start_at_zero(self):
+        """Test that unlabelled metrics are exported before any observation"""
+        self.registry.counter('errors', 'Errors')
+        self.registry.histogram('latency_seconds', 'Latency', buckets=(1.0,))
+        text = self.registry.render()
+        self.assertEqual(sample_value(text, 'test_errors_total'), 0)
+        self.assertEqual(sample_value(text, 'test_latency_seconds_count'), 0)
+
+    def test_threads_merged(self):
+        """Test that values recorded by many threads, finished or not, add up"""
+        counter = self.registry.counter('requests', 'Requests')
+        histogram = self.registry.histogram('latency_seconds', 'Latency', ('stage',))
+
+        def worker():
+            for _ in range(1000):
+                counter.inc()
+                histogram.observe(0.001, 'analysis')
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc()
+        text = self.registry.render()
+        self.assertEqual(sample_value(text, 'test_requests_total'), 8001)
+        self.assertEqual(sample_value(text, 'test_latency_seconds_count{stage="analysis"}'), 8000)
+        # Finished threads are folded into one retired total
+        self.assertEqual(len(counter._cells), 1)
+        self.assertEqual(sample_value(self.registry.render(), 'test_requests_total'), 8001)
+
+    def test_collector_families(self):
+        """Test scrape-time collectors"""
+        @self.registry.collector
+        def collect():
+            yield 'cache_hits', 'counter', 'Hits', [({'cache': 'lookup'}, 5)]
+            yield 'bikes', 'gauge', 'Bikes', [({}, 15)]
+
+        text = self.registry.render()
+        self.assertIn('# TYPE test_cache_hits_total counter', text)
+        self.assertIn('test_cache_hits_total{cache="lookup"} 5', text)
+        self.assertIn('test_bikes 15', text)
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Test cases for /api/metrics"""
+
+    def setUp(self):
+        self.client = app_module.app.test_client()
+
+    def scrape(self):
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.get_data(as_text=True)
+
+    def test_compat_request_recorded(self):
+        """Test that a compat request updates the counters and histograms"""
+        name = 'reebike_compat_requests_total{status="compatible",data_source="local"}'
+        before = sample_value(self.scrape(), name) or 0
+        self.client.get('/api/compat?brand=Trek&model=Domane SL 2023')
+        text = self.scrape()
+        self.assertEqual(sample_value(text, name), before + 1)
+        self.assertGreaterEqual(sample_value(text, 'reebike_compat_request_duration_seconds_count'), 1)
+        self.assertGreaterEqual(
+            sample_value(text, 'reebike_compat_stage_duration_seconds_count{stage="local_lookup"}'), 1)
+        self.assertEqual(sample_value(text, 'reebike_catalog_bikes'), len(app_module.analyzer.catalog))
+
+    def test_asgi_request_recorded(self):
+        """Test that the async endpoint records into the same metrics"""
+        name = 'reebike_compat_requests_total{status="compatible",data_source="local"}'
+        before = sample_value(self.scrape(), name) or 0
+
+        async def run():
+            transport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                await client.get('/api/compat?brand=Trek&model=Domane SL 2023')
+
+        asyncio.run(run())
+        self.assertEqual(sample_value(self.scrape(), name), before + 1)
+
+    def test_text_format(self):
+        """Test that every line is a comment or a valid sample"""
+        self.client.get('/api/compat?brand=Trek&model=Domane SL 2023')
+        text = self.scrape()
+        for line in text.strip().splitlines():
+            if not line.startswith('#'):
+                self.assertRegex(line, SAMPLE_LINE)
+        for family in ('reebike_cache_hits_total', 'reebike_upstream_errors_total', 'reebike_upstream_timeouts_total'):
+            self.assertIn(f'# TYPE {family} counter', text)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour la limitation de débit par client
+Version 1.0
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+
+import httpx
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module
+from asgi import application
+from rate_limit import SharedRateLimiter, TokenBucketLimiter
+
+class FakeClock:
+    """Manually advanced time source"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestTokenBucketLimiter(unittest.TestCase):
+    """Test cases for the in-process limiter"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = TokenBucketLimiter(60, burst=3, clock=self.clock)
+
+    def test_burst_then_refill(self):
+        """Test that a client gets its burst, then one request per refill period"""
+        self.assertEqual([self.limiter.hit('a').allowed for _ in range(4)], [True, True, True, False])
+        self.assertTrue(self.limiter.hit('b').allowed)
+
+        self.clock.now += 1.0
+        self.assertTrue(self.limiter.hit('a').allowed)
+        self.assertFalse(self.limiter.hit('a').allowed)
+
+    def test_decision_headers(self):
+        """Test the rate limit headers of allowed and refused requests"""
+        headers = dict(self.limiter.hit('a').headers())
+        self.assertEqual(headers['RateLimit-Limit'], '3')
+        self.assertEqual(headers['RateLimit-Remaining'], '2')
+        self.assertNotIn('Retry-After', headers)
+
+        self.limiter.hit('a')
+        self.limiter.hit('a')
+        refused = dict(self.limiter.hit('a').headers())
+        self.assertEqual(refused['RateLimit-Remaining'], '0')
+        self.assertEqual(refused['Retry-After'], '1')
+
+    def test_key_table_bounded(self):
+        """Test that the key table never grows past max_keys"""
+        limiter = TokenBucketLimiter(60, shards=4, max_keys=100, clock=self.clock)
+        for index in range(1000):
+            limiter.hit(f'client-{index}')
+        self.assertLessEqual(len(limiter), 100)
+
+    def test_recent_client_kept_over_idle_ones(self):
+        """Test that refilled buckets are evicted before active ones"""
+        limiter = TokenBucketLimiter(60, burst=2, shards=1, max_keys=3, clock=self.clock)
+        limiter.hit('idle-1')
+        limiter.hit('idle-2')
+        self.clock.now += 10.0
+        limiter.hit('busy')
+        limiter.hit('busy')
+        limiter.hit('new')
+        self.assertFalse(limiter.hit('busy').allowed)
+
+    def test_concurrent_hits_counted_once(self):
+        """Test that concurrent threads never take more than the burst"""
+        limiter = TokenBucketLimiter(60, burst=100, clock=self.clock)
+        allowed = []
+
+        def worker():
+            allowed.extend(limiter.hit('a').allowed for _ in range(50))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(allowed), 100)
+        self.assertEqual(limiter.stats()['limited'], 300)
+
+class TestSharedRateLimiter(unittest.TestCase):
+    """Test cases for the SQLite limiter shared by workers"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'rate_limits.db')
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_limit_shared_between_instances(self):
+        """Test that two limiters on one file (two workers) share the buckets"""
+        first = SharedRateLimiter(self.path, 60, burst=2, clock=self.clock)
+        second = SharedRateLimiter(self.path, 60, burst=2, clock=self.clock)
+        self.assertTrue(first.hit('a').allowed)
+        self.assertTrue(second.hit('a').allowed)
+        self.assertFalse(first.hit('a').allowed)
+        self.assertEqual(second.hit('a').retry_after, 1.0)
+
+        self.clock.now += 1.0
+        self.assertTrue(second.hit('a').allowed)
+
+    def test_full_buckets_trimmed(self):
+        """Test that buckets idle long enough to be full are dropped"""
+        limiter = SharedRateLimiter(self.path, 60, burst=2, clock=self.clock)
+        limiter.hit('a')
+        self.clock.now += 5.0
+        limiter.hit('b')
+        limiter.trim()
+        self.assertEqual(len(limiter), 1)
+        self.assertEqual(limiter.stats()['evictions'], 1)
+
+class TestRateLimitedRoutes(unittest.TestCase):
+    """Test cases for 429 responses on the Flask and ASGI routes"""
+
+    def setUp(self):
+        self.original = app_module.rate_limiter
+        app_module.rate_limiter = TokenBucketLimiter(60, burst=2)
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        app_module.rate_limiter = self.original
+
+    def test_flask_429(self):
+        """Test that the third request of a burst of two is refused"""
+        url = '/api/compat?brand=Trek&model=Domane SL 2023'
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.client.get(url)
+        refused = self.client.get(url)
+        self.assertEqual(refused.status_code, 429)
+        self.assertEqual(refused.get_json()['error'], 'Too many requests')
+        self.assertEqual(refused.headers['RateLimit-Remaining'], '0')
+        self.assertIn('Retry-After', refused.headers)
+
+    def test_no_quota_headers_on_public_responses(self):
+        """Test that CDN-cacheable answers do not carry one client's quota"""
+        response = self.client.get('/api/compat?brand=Trek&model=Domane SL 2023')
+        self.assertIn('public', response.headers['Cache-Control'])
+        self.assertNotIn('RateLimit-Limit', response.headers)
+        response = self.client.get('/api/kits/Cosmopolit/bikes')
+        self.assertEqual(response.headers['RateLimit-Remaining'], '0')
+
+    def test_exempt_routes_not_limited(self):
+        """Test that health checks and the autocomplete lists do not use the quota"""
+        for url in ('/api/health', '/api/brands', '/api/models?brand=Trek'):
+            for _ in range(5):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, url)
+                self.assertNotIn('RateLimit-Limit', response.headers)
+
+    def test_batch_charged_per_item(self):
+        """Test that a batch takes one token per item"""
+        app_module.rate_limiter = TokenBucketLimiter(60, burst=5)
+        bikes = [{'brand': 'Trek', 'model': 'Domane SL 2023'}] * 3
+        response = self.client.post('/api/compat/batch', json={'bikes': bikes})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['RateLimit-Remaining'], '2')
+        refused = self.client.post('/api/compat/batch', json={'bikes': bikes})
+        self.assertEqual(refused.status_code, 429)
+
+    def test_batch_larger_than_bucket_refused(self):
+        """Test that a batch needing more tokens than a full bucket is refused up front"""
+        app_module.rate_limiter = TokenBucketLimiter(60, burst=5)
+        bikes = [{'brand': 'Trek', 'model': 'Domane SL 2023'}] * 6
+        response = self.client.post('/api/compat/batch', json={'bikes': bikes})
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('at most 5 bikes', response.get_json()['message'])
+        # Charged as a single request, the client can still send a batch that fits
+        self.assertEqual(response.headers['RateLimit-Remaining'], '4')
+        response = self.client.post('/api/compat/batch', json={'bikes': bikes[:4]})
+        self.assertEqual(response.status_code, 200)
+
+        app_module.rate_limiter = TokenBucketLimiter(60, burst=5)
+
+        async def run():
+            transport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                return await client.post('/api/compat/batch', json={'bikes': bikes})
+
+        self.assertEqual(asyncio.run(run()).status_code, 413)
+
+    def test_asgi_429(self):
+        """Test that the async endpoint shares the limiter"""
+        url = '/api/compat?brand=Trek&model=Domane SL 2023'
+
+        async def run():
+            transport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                return [await client.get(url) for _ in range(3)]
+
+        responses = asyncio.run(run())
+        self.assertEqual([response.status_code for response in responses], [200, 200, 429])
+        self.assertNotIn('ratelimit-limit', responses[0].headers)
+        self.assertEqual(responses[2].headers['ratelimit-limit'], '2')
+        self.assertIn('retry-after', responses[2].headers)
+
+    def test_asgi_batch_charged_per_item(self):
+        """Test that the async batch endpoint charges its items"""
+        bikes = [{'brand': 'Trek', 'model': 'Domane SL 2023'}] * 2
+
+        async def run():
+            transport = httpx.ASGITransport(app=application)
+            async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                return [await client.post('/api/compat/batch', json={'bikes': bikes}) for _ in range(2)]
+
+        first, refused = asyncio.run(run())
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers['ratelimit-remaining'], '0')
+        self.assertEqual(refused.status_code, 429)
+
+    def test_asgi_without_client_address(self):
+        """Test that a server giving no client address is limited under one shared key"""
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/compat', 'headers': [],
+                 'query_string': b'brand=Trek&model=Domane%20SL%202023'}
+        for _ in range(3):
+            asyncio.run(application(scope, receive, send))
+        statuses = [message['status'] for message in messages if message['type'] == 'http.response.start']
+        self.assertEqual(statuses, [200, 200, 429])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
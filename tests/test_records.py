@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour les enregistrements compacts de vélos
+Version 1.0
+"""
+
+import unittest
+import copy
+import pickle
+import sys
+import os
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from records import BikeRecord, as_record, to_records
+from app import analyzer, mock_data
+
+class TestBikeRecord(unittest.TestCase):
+    """Test cases for BikeRecord"""
+    
+    def setUp(self):
+        self.data = {
+            'brand': 'Trek', 'model': 'Domane SL 2023', 'wheel_axle_front': 'QR',
+            'fork_spacing_mm': 100, 'down_tube_length_mm': None, 'seat_tube_length_mm': 350,
+            'brake_type': 'Rim', 'weight_kg': 9.5
+        }
+        self.record = BikeRecord.from_dict(self.data)
+    
+    def test_mapping_interface(self):
+        """Test that a record reads like the dict it was built from"""
+        self.assertEqual(self.record['model'], 'Domane SL 2023')
+        self.assertEqual(self.record.get('weight_kg'), 9.5)
+        self.assertIsNone(self.record.get('down_tube_length_mm'))
+        self.assertEqual(self.record.get('year', 'n/a'), 'n/a')
+        self.assertNotIn('down_tube_length_mm', self.record)
+        with self.assertRaises(KeyError):
+            self.record['year']
+        expected = {k: v for k, v in self.data.items() if v is not None}
+        self.assertEqual(dict(self.record), expected)
+        self.assertEqual(self.record.to_dict(), expected)
+    
+    def test_immutable(self):
+        """Test that records cannot be modified"""
+        with self.assertRaises(AttributeError):
+            self.record.fork_spacing_mm = 110
+        with self.assertRaises(TypeError):
+            self.record['source'] = 'local'
+        with self.assertRaises(AttributeError):
+            self.record.extra_field = 1
+    
+    def test_shared_values(self):
+        """Test that repeated strings and numbers share one object"""
+        other = BikeRecord.from_dict(dict((k, ''.join(v) if isinstance(v, str) else v) for k, v in self.data.items()))
+        self.assertIs(other.brand, self.record.brand)
+        self.assertIs(other.wheel_axle_front, self.record.wheel_axle_front)
+        self.assertIs(other.seat_tube_length_mm, self.record.seat_tube_length_mm)
+        self.assertIsInstance(BikeRecord.from_dict({'fork_spacing_mm': 100.0}).fork_spacing_mm, float)
+    
+    def test_copy_and_pickle(self):
+        """Test that records survive copy and pickle"""
+        for clone in (copy.deepcopy(self.record), pickle.loads(pickle.dumps(self.record))):
+            self.assertEqual(clone.to_dict(), self.record.to_dict())
+    
+    def test_conversion_helpers(self):
+        """Test that conversion is idempotent"""
+        self.assertIs(as_record(self.record), self.record)
+        self.assertIsNone(as_record(None))
+        self.assertEqual(to_records([self.data])[0].to_dict(), self.record.to_dict())
+
+class TestCatalogRecords(unittest.TestCase):
+    """Test cases for the records used by the analyzer"""
+    
+    def test_catalog_uses_records(self):
+        """Test that catalog bikes are records and lookups do not mutate them"""
+        self.assertTrue(all(isinstance(bike, BikeRecord) for bike in mock_data['bikes']))
+        bike = analyzer.find_bike('Trek', 'Domane SL 2023')
+        self.assertIsInstance(bike, BikeRecord)
+        self.assertNotIn('source', bike)
+        self.assertEqual(analyzer.check_compatibility(bike), ['Cosmopolit', 'Urban', 'Explorer'])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
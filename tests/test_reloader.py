@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour le rechargement à chaud du catalogue
+Version 1.0
+"""
+
+import unittest
+import copy
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module
+from cache import PersistentCache, MISSING
+from reloader import CatalogReloader
+
+class TestCatalogReloader(unittest.TestCase):
+    """Test cases for the catalog file watcher"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'bikes.json')
+        self.write({'bikes': []})
+        self.loaded = []
+        self.reloader = CatalogReloader(self.path, self.loaded.append, interval=0)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def write(self, data, mtime=None):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+    
+    def test_reloads_only_on_change(self):
+        """Test that an unchanged file is not reloaded"""
+        self.assertFalse(self.reloader.check())
+        self.write({'bikes': [{'brand': 'Trek', 'model': 'FX 3'}]}, mtime=1_000_000)
+        self.assertTrue(self.reloader.check())
+        self.assertFalse(self.reloader.check())
+        self.assertEqual(len(self.loaded), 1)
+        self.assertEqual(self.loaded[0]['bikes'][0]['model'], 'FX 3')
+    
+    def test_broken_file_keeps_current_catalog(self):
+        """Test that an invalid file is reported once and not applied"""
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{"bikes": [')
+        self.assertFalse(self.reloader.check())
+        self.assertFalse(self.reloader.check())
+        self.assertEqual(self.loaded, [])
+        self.assertEqual(self.reloader.stats()['failures'], 1)
+    
+    @unittest.skipUnless(hasattr(signal, 'SIGHUP'), "SIGHUP not available")
+    def test_sighup_triggers_reload(self):
+        """Test that SIGHUP reloads the file from the watcher thread"""
+        reloaded = threading.Event()
+        reloader = CatalogReloader(self.path, lambda data: reloaded.set(), interval=0)
+        previous = signal.getsignal(signal.SIGHUP)
+        try:
+            self.assertTrue(reloader.install_signal_handler())
+            os.kill(os.getpid(), signal.SIGHUP)
+            self.assertTrue(reloaded.wait(2))
+        finally:
+            signal.signal(signal.SIGHUP, previous)
+    
+    @unittest.skipUnless(hasattr(signal, 'SIGHUP'), "SIGHUP not available")
+    def test_app_leaves_sighup_alone(self):
+        """Test that the app only takes SIGHUP over when enabled, from init_app()"""
+        self.assertFalse(app_module.app_config.CATALOG_RELOAD_ON_SIGHUP)
+        self.assertEqual(signal.getsignal(signal.SIGHUP), signal.SIG_DFL)
+
+class TestCatalogSwap(unittest.TestCase):
+    """Test cases for swapping a new catalog version in"""
+    
+    def setUp(self):
+        self.original = app_module.analyzer
+        self.original_data = app_module.mock_data
+        self.client = app_module.app.test_client()
+    
+    def tearDown(self):
+        app_module.analyzer = self.original
+        app_module.mock_data = self.original_data
+    
+    def changed_catalog(self):
+        data = copy.deepcopy(self.original_data)
+        data['bikes'] = [
+            dict(bike, fork_spacing_mm=110) if bike['model'] == 'Domane SL 2023' else bike
+            for bike in data['bikes']
+        ]
+        data['bikes'].append({'brand': 'Reebike', 'model': 'Prototype X', 'wheel_axle_front': 'QR',
+                              'fork_spacing_mm': 100, 'down_tube_length_mm': 400})
+        return data
+    
+    def test_swap_reanalyzes_changed_bikes_only(self):
+        """Test that unchanged results are reused and the old analyzer is untouched"""
+        old = app_module.analyzer
+        new = app_module.swap_catalog(self.changed_catalog())
+        
+        self.assertIs(app_module.analyzer, new)
+        self.assertIs(new.geometry_geeks, old.geometry_geeks)
+        self.assertEqual(new.results.changed, {('trek', 'domane sl 2023'), ('reebike', 'prototype x')})
+        
+        unchanged = next(b for b in new.catalog.bikes if b['model'] == 'Madone SLR 2023')
+        previous = next(b for b in old.catalog.bikes if b['model'] == 'Madone SLR 2023')
+        self.assertIs(new.results.get(unchanged).result, old.results.get(previous).result)
+        self.assertIsNotNone(old.results.get(previous))
+        
+        new.geometry_geeks.available = lambda: False
+        try:
+            data = json.loads(self.client.get('/api/compat?brand=Trek&model=Domane SL 2023').data)
+            self.assertEqual(data['status'], 'incompatible')
+            data = json.loads(self.client.get('/api/compat?brand=Reebike&model=Prototype X').data)
+            self.assertEqual(data['status'], 'compatible')
+        finally:
+            del new.geometry_geeks.available
+    
+    def test_swap_invalidates_changed_analyses(self):
+        """Test that only persisted analyses of changed bikes are dropped"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = PersistentCache(os.path.join(tmpdir, 'cache.sqlite3'))
+            original_cache = app_module.persistent_cache
+            app_module.persistent_cache = cache
+            try:
+                for name in (('Trek', 'Domane SL 2023'), ('Trek', 'Madone SLR 2023')):
+                    cache.set('analysis', app_module.GeometryGeeksAPI.cache_key(*name), {'status': 'x'}, ttl=60)
+                app_module.swap_catalog(self.changed_catalog())
+                
+                key = app_module.GeometryGeeksAPI.cache_key
+                self.assertIs(cache.get('analysis', key('Trek', 'Domane SL 2023')), MISSING)
+                self.assertEqual(cache.get('analysis', key('Trek', 'Madone SLR 2023')), {'status': 'x'})
+                
+                data = self.changed_catalog()
+                data['compatibility_matrix']['kits']['Urban']['requirements']['min_tube_length_mm'] = 320
+                app_module.swap_catalog(data)
+                self.assertIs(cache.get('analysis', key('Trek', 'Madone SLR 2023')), MISSING)
+            finally:
+                app_module.persistent_cache = original_cache
+    
+    def test_swap_drops_not_found_analyses_when_bikes_added(self):
+        """Test that not_found outcomes go when a bike is added, and stay on spec-only changes"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = PersistentCache(os.path.join(tmpdir, 'cache.sqlite3'))
+            original_cache = app_module.persistent_cache
+            app_module.persistent_cache = cache
+            try:
+                key = app_module.GeometryGeeksAPI.cache_key
+                not_found = {'status': 'unknown', 'data_source': 'not_found'}
+                cache.set('analysis', key('Reebike', 'Prototype'), not_found, ttl=60)
+                cache.set('analysis', key('Trek', 'Madone SLR 2023'), {'data_source': 'local'}, ttl=60)
+                app_module.swap_catalog(self.changed_catalog())
+                self.assertIs(cache.get('analysis', key('Reebike', 'Prototype')), MISSING)
+                self.assertEqual(cache.get('analysis', key('Trek', 'Madone SLR 2023')), {'data_source': 'local'})
+                
+                cache.set('analysis', key('Reebike', 'Prototype'), not_found, ttl=60)
+                data = self.changed_catalog()
+                data['bikes'][-1]['down_tube_length_mm'] = 420
+                app_module.swap_catalog(data)
+                self.assertEqual(cache.get('analysis', key('Reebike', 'Prototype')), not_found)
+            finally:
+                app_module.persistent_cache = original_cache
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour la table de résultats précalculés
+Version 1.0
+"""
+
+import unittest
+import json
+import sys
+import os
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from results import ResultTable
+from app import app, analyzer, ResolvedBike
+
+class TestResultTable(unittest.TestCase):
+    """Test cases for precomputed catalog results"""
+    
+    def test_every_catalog_bike_precomputed(self):
+        """Test that table entries equal a fresh analysis of each bike"""
+        self.assertGreater(len(analyzer.results), 0)
+        for bike in analyzer.catalog.bikes:
+            entry = analyzer.results.get(bike)
+            if entry is None:
+                continue  # Later duplicate of an earlier brand/model
+            resolved = ResolvedBike(bike['brand'], bike['model'], bike, 'local', 0.0)
+            expected = dict(analyzer.analyze(bike['brand'], bike['model'], resolved=resolved), data_source='local')
+            self.assertEqual(entry.result, expected)
+            self.assertEqual(json.loads(entry.body), expected)
+    
+    def test_incremental_rebuild(self):
+        """Test that only added or changed bikes are analyzed again"""
+        calls = []
+        table = ResultTable(lambda bike: calls.append(bike['model']) or {'model': bike['model']})
+        bikes = [{'brand': 'A', 'model': 'One', 'fork_spacing_mm': 100},
+                 {'brand': 'A', 'model': 'Two', 'fork_spacing_mm': 100}]
+        self.assertEqual(table.build(bikes)['added'], 2)
+        
+        bikes = [{'brand': 'A', 'model': 'One', 'fork_spacing_mm': 100, 'source': 'local'},
+                 {'brand': 'A', 'model': 'Two', 'fork_spacing_mm': 110},
+                 {'brand': 'B', 'model': 'Three'}]
+        calls.clear()
+        counts = table.build(bikes)
+        self.assertEqual(calls, ['Two', 'Three'])
+        self.assertEqual(counts, {'added': 1, 'updated': 1, 'unchanged': 1, 'removed': 0})
+        self.assertIs(table.get(bikes[0]).bike, bikes[0])
+        
+        self.assertEqual(table.build(bikes[:1])['removed'], 2)
+        self.assertIsNone(table.get(bikes[1]))
+    
+    def test_only_same_record_hits(self):
+        """Test that an equal-named record that is not in the table misses"""
+        bike = analyzer.catalog.bikes[0]
+        self.assertIsNone(analyzer.results.get(dict(bike)))
+
+class TestPrecomputedAPI(unittest.TestCase):
+    """Test cases for serving precomputed results"""
+    
+    def setUp(self):
+        self.app = app.test_client()
+    
+    def test_local_hit_serves_precomputed_body(self):
+        """Test that a catalog hit returns the precomputed bytes unchanged"""
+        analyzer.geometry_geeks.available = lambda: False
+        try:
+            response = self.app.get('/api/compat?brand=Trek&model=Domane SL 2023')
+        finally:
+            del analyzer.geometry_geeks.available
+        bike = analyzer.catalog.find('Trek', 'Domane SL 2023')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.data, analyzer.results.get(bike).body)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour les règles de compatibilité compilées
+Version 1.0
+"""
+
+import unittest
+import json
+import random
+import sys
+import os
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import columnar
+from rules import RuleSet, DEFAULT_KITS, compile_requirements
+from utils import calculate_compatibility_score
+
+def legacy_compatible_kits(bike):
+    """Hand-written rules the compiled rule set replaced"""
+    if bike.get('wheel_axle_front') != 'QR' or bike.get('fork_spacing_mm') != 100:
+        return []
+    down_tube = bike.get('down_tube_length_mm')
+    seat_tube = bike.get('seat_tube_length_mm')
+    if (down_tube is not None and down_tube >= 300) or (seat_tube is not None and seat_tube >= 300):
+        return ['Cosmopolit', 'Urban', 'Explorer']
+    return ['Cosmopolit']
+
+def random_specs(rng, count):
+    """Generate specs covering missing, float and out-of-range values"""
+    return [{
+        'wheel_axle_front': rng.choice(['QR', 'Thru-axle', None]),
+        'fork_spacing_mm': rng.choice([100, 100.0, 110, None]),
+        'down_tube_length_mm': rng.choice([None, 250, 299.5, 300, 350]),
+        'seat_tube_length_mm': rng.choice([None, 250, 300.0, 420]),
+        'weight_kg': rng.choice([None, 9.5, 14, 18])
+    } for _ in range(count)]
+
+class TestRuleSet(unittest.TestCase):
+    """Test cases for compiled kit rules"""
+    
+    def setUp(self):
+        self.rules = RuleSet(DEFAULT_KITS)
+        self.bikes = random_specs(random.Random(7), 1000)
+    
+    def test_matches_legacy_rules(self):
+        """Test that compiled rules give the same kits as the hand-written ones"""
+        for bike in self.bikes:
+            self.assertEqual(self.rules.compatible_kits(bike), legacy_compatible_kits(bike), bike)
+    
+    def test_parent_kit_short_circuits(self):
+        """Test that a kit extending another only checks its extra requirements"""
+        cosmopolit, urban, explorer = self.rules.compiled
+        self.assertIsNone(cosmopolit.parent)
+        self.assertIs(urban.parent, cosmopolit)
+        self.assertIs(explorer.parent, urban)
+        self.assertEqual(explorer.extra, [])
+    
+    def test_new_kit_from_data(self):
+        """Test that a kit added to the matrix needs no code change"""
+        kits = dict(DEFAULT_KITS)
+        kits['Cargo'] = {'requirements': {
+            'wheel_axle_front': 'QR',
+            'fork_spacing_mm': 100,
+            'max_weight_kg': 15
+        }}
+        rules = RuleSet(kits)
+        bike = {'wheel_axle_front': 'QR', 'fork_spacing_mm': 100, 'down_tube_length_mm': 280, 'weight_kg': 14}
+        self.assertEqual(rules.compatible_kits(bike), ['Cosmopolit', 'Cargo'])
+        bike['weight_kg'] = 16
+        self.assertEqual(rules.compatible_kits(bike), ['Cosmopolit'])
+        self.assertEqual(rules.compatible_kits(dict(bike, weight_kg=None)), ['Cosmopolit'])
+    
+    def test_scores(self):
+        """Test that scores count met requirements, tube groups included"""
+        bike = {'wheel_axle_front': 'QR', 'fork_spacing_mm': 110, 'seat_tube_length_mm': 320}
+        self.assertEqual(self.rules.scores(bike), {'Cosmopolit': 0.5, 'Urban': 2 / 3, 'Explorer': 2 / 3})
+        self.assertAlmostEqual(calculate_compatibility_score(bike, DEFAULT_KITS['Urban']['requirements']), 2 / 3)
+        self.assertEqual(calculate_compatibility_score(bike, {}), 0.0)
+    
+    def test_invalid_requirements(self):
+        """Test that malformed requirements are rejected at compile time"""
+        with self.assertRaises(ValueError):
+            compile_requirements({'min_fork_spacing_mm': 'wide'})
+        with self.assertRaises(ValueError):
+            compile_requirements({'fork spacing); import os': 100})
+        with self.assertRaises(ValueError):
+            RuleSet({'Broken': {'requirements': {'wheel_axle_front': ['QR']}}})
+        self.assertEqual(calculate_compatibility_score({'fork_spacing_mm': 100}, {'min_fork_spacing_mm': 'wide'}), 0.0)
+    
+    def test_non_finite_thresholds_rejected(self):
+        """Test that NaN and infinite values (accepted by json) are rejected at load time"""
+        kits = json.loads('{"Broken": {"requirements": {"min_tube_length_mm": NaN}}}')
+        with self.assertRaises(ValueError):
+            RuleSet(kits)
+        for value in (float('inf'), float('-inf')):
+            with self.assertRaises(ValueError):
+                compile_requirements({'max_weight_kg': value})
+    
+    @unittest.skipUnless(columnar.available(), "NumPy not installed")
+    def test_masks_match_compiled_rules(self):
+        """Test that vectorized masks agree with per-bike evaluation"""
+        kits = dict(DEFAULT_KITS, Cargo={'requirements': {'max_weight_kg': 15, 'wheel_axle_front': 'QR'}})
+        rules = RuleSet(kits)
+        masks = rules.masks(columnar.ColumnarSpecs(self.bikes))
+        for row, bike in enumerate(self.bikes):
+            expected = rules.compatible_kits(bike)
+            self.assertEqual([name for name in rules.names if masks[name][row]], expected, bike)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour le snapshot binaire du catalogue
+Version 1.0
+"""
+
+import unittest
+import contextlib
+import io
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from unittest import mock
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module
+import columnar
+import compile_catalog
+import snapshot
+from app import CompatibilityAnalyzer, REQUIRED_FIELDS, TUBE_FIELDS, catalog_path, load_mock_data
+
+class TestCatalogSnapshot(unittest.TestCase):
+    """Test cases for compiling and mapping a catalog snapshot"""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmpdir.name, 'bikes.json')
+        self.path = os.path.join(self.tmpdir.name, 'catalog.snapshot')
+        shutil.copy(catalog_path(), self.source)
+        self.data = load_mock_data(self.source)
+        self.analyzer = CompatibilityAnalyzer(self.data)
+        self.analyzer.geometry_geeks.available = lambda: False
+        snapshot.write_snapshot(self.path, self.analyzer.catalog, self.analyzer.results,
+                                self.data, source_path=self.source)
+        self.snapshot = snapshot.open_snapshot(self.path, self.source)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_records_round_trip(self):
+        """Test that every bike decodes to the same specs"""
+        self.assertEqual(len(self.snapshot.bikes), len(self.data['bikes']))
+        for original, mapped in zip(self.data['bikes'], self.snapshot.bikes):
+            self.assertEqual(mapped.to_dict(), original.to_dict())
+        self.assertIs(self.snapshot.bikes[0], self.snapshot.bikes[0])
+    
+    def test_unusual_values_round_trip(self):
+        """Test missing, float, malformed and unknown fields"""
+        bikes = [
+            {'brand': 'Test', 'model': 'Été 1', 'fork_spacing_mm': 100.0, 'weight_kg': 12.5},
+            {'brand': 'Test', 'model': 'Two', 'fork_spacing_mm': '100', 'down_tube_length_mm': 300},
+            {'model': 'Three', 'wheel_axle_front': 'QR', 'seat_tube_length_mm': None}
+        ]
+        data = load_mock_data(self.source)
+        data['bikes'] = bikes
+        analyzer = CompatibilityAnalyzer(data)
+        snapshot.write_snapshot(self.path, analyzer.catalog, analyzer.results, data)
+        mapped = snapshot.CatalogSnapshot(self.path)
+        for original, record in zip(analyzer.catalog.bikes, mapped.bikes):
+            self.assertEqual(record.to_dict(), original.to_dict())
+        self.assertIsInstance(mapped.bikes[0]['fork_spacing_mm'], float)
+        self.assertIsInstance(mapped.bikes[1]['down_tube_length_mm'], int)
+    
+    def test_analyzer_from_snapshot_matches_json(self):
+        """Test that a snapshot-backed analyzer answers exactly like the JSON one"""
+        mapped = CompatibilityAnalyzer(None, snapshot=self.snapshot)
+        mapped.geometry_geeks = self.analyzer.geometry_geeks
+        for bike in self.data['bikes']:
+            for model in (bike['model'], bike['model'].lower()[:6], bike['model'].replace(' ', '')):
+                self.assertEqual(mapped.evaluate_serialized(bike['brand'], model),
+                                 self.analyzer.evaluate_serialized(bike['brand'], model), model)
+        self.assertEqual(mapped.catalog.brands, self.analyzer.catalog.brands)
+        self.assertEqual(mapped.catalog.suggest_models('trek', 'd'), [
+            mapped.catalog.bikes[self.data['bikes'].index(bike)]
+            for bike in self.analyzer.catalog.suggest_models('trek', 'd')
+        ])
+        self.assertEqual(mapped.catalog_report(), self.analyzer.catalog_report())
+    
+    @unittest.skipUnless(columnar.available(), "NumPy not installed")
+    def test_columns_are_views(self):
+        """Test that snapshot columns match columns built from the records"""
+        columns = self.snapshot.columns()
+        built = columnar.ColumnarSpecs(self.data['bikes'])
+        self.assertFalse(columns.numeric('fork_spacing_mm')[0].flags.owndata)
+        for field in ('wheel_axle_front', 'fork_spacing_mm', 'down_tube_length_mm'):
+            for value in ('QR', 100, 300):
+                self.assertEqual(list(columns.equals(field, value)), list(built.equals(field, value)))
+        self.assertEqual(list(columns.missing_data_mask(REQUIRED_FIELDS, TUBE_FIELDS)),
+                         list(built.missing_data_mask(REQUIRED_FIELDS, TUBE_FIELDS)))
+    
+    def test_stale_or_invalid_snapshot_falls_back(self):
+        """Test that stale, corrupt or foreign-version snapshots are ignored"""
+        self.assertIsNotNone(self.snapshot)
+        stat = os.stat(self.source)
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNone(snapshot.open_snapshot(self.path, self.source))
+        self.assertIsNotNone(snapshot.open_snapshot(self.path, os.path.join(self.tmpdir.name, 'none.json')))
+        
+        with open(self.path, 'r+b') as f:
+            f.write(struct.pack('<8sI', snapshot.MAGIC, snapshot.FORMAT_VERSION + 1))
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.CatalogSnapshot(self.path)
+        with open(self.path, 'wb') as f:
+            f.write(b'{"bikes": []}')
+        self.assertIsNone(snapshot.open_snapshot(self.path))
+        self.assertIsNone(snapshot.open_snapshot(os.path.join(self.tmpdir.name, 'missing.snapshot')))
+
+class TestCompileCatalog(unittest.TestCase):
+    """Test cases for the offline snapshot compiler"""
+    
+    def test_compiles_without_starting_the_app(self):
+        """Test that a build writes the snapshot without the server's background work"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.path.join(tmpdir, 'catalog.snapshot')
+            argv = ['compile_catalog.py', catalog_path(), output]
+            with mock.patch.object(sys, 'argv', argv), contextlib.redirect_stdout(io.StringIO()):
+                compile_catalog.main()
+            self.assertEqual(snapshot.CatalogSnapshot(output).count, len(load_mock_data()['bikes']))
+        
+        self.assertIsNone(app_module.catalog_reloader._thread)
+        self.assertIsNone(app_module.cache_warmer._thread)
+        self.assertIsNone(app_module.logging_setup)
+        self.assertIsNone(app_module.rate_limiter)
+        self.assertIsNone(app_module.analytics)
+    
+    def test_broken_catalog_not_compiled(self):
+        """Test that a truncated catalog fails the build instead of giving an empty snapshot"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, 'bikes.json')
+            output = os.path.join(tmpdir, 'catalog.snapshot')
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write('{"bikes": [{"brand": "Trek",')
+            argv = ['compile_catalog.py', source, output]
+            with mock.patch.object(sys, 'argv', argv), contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    compile_catalog.main()
+            self.assertFalse(os.path.exists(output))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
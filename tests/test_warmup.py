@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests unitaires pour le préchauffage du cache GeometryGeeks
+Version 1.0
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as app_module
+from records import BikeRecord
+from warmup import CacheWarmer, TrafficRecorder
+
+class TestTrafficRecorder(unittest.TestCase):
+    """Test cases for request counting"""
+
+    def test_top_keys_on_normalized_names(self):
+        """Test that equivalent spellings are counted together"""
+        recorder = TrafficRecorder()
+        for _ in range(3):
+            recorder.record('Ghost', 'Lanao 9')
+        recorder.record(' ghost ', 'LANAO  9')
+        recorder.record('Cube', 'Nature')
+        self.assertEqual(recorder.top(1), [('Ghost', 'Lanao 9')])
+        self.assertEqual(len(recorder), 2)
+
+    def test_bounded_key_count(self):
+        """Test that rarely requested keys are dropped beyond max_keys"""
+        recorder = TrafficRecorder(max_keys=4)
+        recorder.record('Ghost', 'Lanao 9')
+        recorder.record('Ghost', 'Lanao 9')
+        for index in range(10):
+            recorder.record('Cube', f'Model {index}')
+        self.assertLessEqual(len(recorder), 5)
+        self.assertEqual(recorder.top(1), [('Ghost', 'Lanao 9')])
+
+    def test_counts_survive_restart(self):
+        """Test that saved counts are loaded by the next recorder"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'traffic.json')
+            recorder = TrafficRecorder(path=path)
+            recorder.record('Cube', 'Nature')
+            recorder.record('Ghost', 'Lanao 9')
+            recorder.record('Ghost', 'Lanao 9')
+            recorder.save()
+
+            restarted = TrafficRecorder(path=path)
+            restarted.load()
+            self.assertEqual(restarted.top(2), [('Ghost', 'Lanao 9'), ('Cube', 'Nature')])
+
+    def test_workers_merge_counts(self):
+        """Test that recorders sharing the file add up their counts instead of overwriting them"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'traffic.json')
+            first, second = TrafficRecorder(path=path), TrafficRecorder(path=path)
+            first.load()
+            second.load()
+            for _ in range(3):
+                first.record('Cube', 'Nature')
+            second.record('Ghost', 'Lanao 9')
+            second.record('Ghost', 'Lanao 9')
+            first.save()
+            second.save()
+            # Saving again without new traffic must not count anything twice
+            first.save()
+            second.record('Cube', 'Nature')
+            second.save()
+            self.assertEqual(second.top(2), [('Cube', 'Nature'), ('Ghost', 'Lanao 9')])
+
+            restarted = TrafficRecorder(path=path)
+            restarted.load()
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.load(f), [[4, 'Cube', 'Nature'], [2, 'Ghost', 'Lanao 9']])
+            self.assertEqual(restarted.top(2), [('Cube', 'Nature'), ('Ghost', 'Lanao 9')])
+
+    def test_invalid_file_ignored(self):
+        """Test that a corrupt counts file does not prevent startup"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'traffic.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{not json')
+            recorder = TrafficRecorder(path=path)
+            recorder.load()
+            self.assertEqual(len(recorder), 0)
+
+class TestCacheWarmer(unittest.TestCase):
+    """Test cases for the background prefetch"""
+
+    def setUp(self):
+        self.recorder = TrafficRecorder()
+        for index in range(4):
+            for _ in range(10 - index):
+                self.recorder.record('Ghost', f'Lanao {index}')
+        self.cached = {('Ghost', 'Lanao 1')}
+        self.lookups = []
+
+    def lookup(self, brand, model):
+        self.lookups.append((brand, model, time.monotonic()))
+        self.cached.add((brand, model))
+
+    def test_prefetches_uncached_top_keys(self):
+        """Test that only the most requested uncached keys are looked up"""
+        warmer = CacheWarmer(self.recorder, self.lookup, lambda b, m: (b, m) in self.cached, top_n=3, rate=1000)
+        self.assertEqual(warmer.run_once(), 2)
+        self.assertEqual([model for _, model, _ in self.lookups], ['Lanao 0', 'Lanao 2'])
+        self.assertEqual(warmer.stats()['already_cached'], 1)
+
+        self.assertEqual(warmer.run_once(), 0)
+
+    def test_rate_is_bounded(self):
+        """Test that upstream lookups are spaced by 1/rate"""
+        warmer = CacheWarmer(self.recorder, self.lookup, lambda b, m: False, top_n=4, rate=20)
+        warmer.run_once()
+        gaps = [b[2] - a[2] for a, b in zip(self.lookups, self.lookups[1:])]
+        self.assertEqual(len(self.lookups), 4)
+        self.assertTrue(all(gap >= 0.04 for gap in gaps))
+
+    def test_failed_lookup_counted(self):
+        """Test that an error is counted without stopping the run"""
+        def lookup(brand, model):
+            raise ConnectionError("upstream down")
+        warmer = CacheWarmer(self.recorder, lookup, lambda b, m: False, top_n=2, rate=1000)
+        self.assertEqual(warmer.run_once(), 0)
+        self.assertEqual(warmer.stats()['errors'], 2)
+
+class TestTrafficRecording(unittest.TestCase):
+    """Test cases for recording compat requests"""
+
+    def setUp(self):
+        self.original = app_module.traffic_recorder
+        app_module.traffic_recorder = TrafficRecorder()
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        app_module.traffic_recorder = self.original
+
+    def test_records_geometry_geeks_bikes_only(self):
+        """Test that only bikes answered from GeometryGeeks are recorded"""
+        api = app_module.analyzer.geometry_geeks
+        bike = BikeRecord({'brand': 'Ghost', 'model': 'Lanao 9', 'wheel_axle_front': 'QR',
+                           'fork_spacing_mm': 100, 'down_tube_length_mm': 450, 'source': 'geometrygeeks'})
+        api.cache.set(api.cache_key('Ghost', 'Lanao 9'), bike)
+        try:
+            response = self.client.get('/api/compat?brand=Ghost&model=Lanao 9')
+            self.assertEqual(json.loads(response.data)['data_source'], 'geometrygeeks')
+            self.client.get('/api/compat?brand=Trek&model=Domane SL 2023')
+        finally:
+            api.cache.invalidate(api.cache_key('Ghost', 'Lanao 9'))
+        self.assertEqual(app_module.traffic_recorder.top(5), [('Ghost', 'Lanao 9')])
+
+    def test_nothing_started_on_import(self):
+        """Test that importing the app neither starts the warmer nor persists traffic"""
+        self.assertIsNone(self.original.path)
+        self.assertIsNone(app_module.cache_warmer._thread)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)